@@ -1,18 +1,25 @@
-"""Advent of Code Runner package initialization"""
-
-# Advent of Code Runner libraries
-from .config import (
-    __version__,
-    AOC_DOMAIN,
-    AOC_RUNNER_AUTH_DIR,
-    AOC_RUNNER_DIR,
-    AOC_RUNNER_CACHE_DIR,
-    AOC_RUNNER_PROJECT_HOME,
-    AOC_RUNNER_USERS_DIR,
-    AOC_TZ,
-)
-from .httpclient import http_client
-from .utils import color, colored
+"""Advent of Code Runner package initialization.  The exports are imported
+on first use so that importing the package stays cheap.
+"""
+
+# System libraries
+from importlib import import_module
+
+
+# Map each export to the module providing it
+_EXPORTS = {
+    "__version__": "config",
+    "AOC_DOMAIN": "config",
+    "AOC_RUNNER_AUTH_DIR": "config",
+    "AOC_RUNNER_DIR": "config",
+    "AOC_RUNNER_CACHE_DIR": "config",
+    "AOC_RUNNER_PROJECT_HOME": "config",
+    "AOC_RUNNER_USERS_DIR": "config",
+    "AOC_TZ": "config",
+    "color": "utils",
+    "colored": "utils",
+    "http_client": "httpclient",
+}
 
 
 __all__ = [
@@ -28,3 +35,19 @@ __all__ = [
     "colored",
     "http_client",
 ]
+
+
+def __getattr__(
+    name: str,
+):
+    """Import the requested export from its module"""
+
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+
+
+def __dir__() -> list[str]:
+    """List the package attributes including the lazy exports"""
+
+    return sorted(set(globals()) | set(__all__))
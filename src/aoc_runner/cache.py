@@ -0,0 +1,267 @@
+"""Provide an on-disk cache of the responses received from the
+Advent of Code servers.  Cached pages are revalidated with conditional
+requests so that unchanged pages are served from disk.
+"""
+
+# System libraries
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from hashlib import sha256
+from io import BytesIO
+import json
+import logging
+from pathlib import Path
+import re
+import time
+from urllib.parse import urlsplit
+
+# Third-party libraries
+import urllib3
+from urllib3 import HTTPHeaderDict
+
+# Advent of Code Runner libraries
+from .config import get_config
+from .utils import write_atomic
+
+
+log = logging.getLogger(__name__)
+
+
+"""Define how long, in seconds, a cached page is used without being
+revalidated.  The first pattern matching the URL path is used, a TTL of
+None never expires and a TTL of 0 revalidates on every request.
+"""
+DEFAULT_TTLS: list[tuple[str, float | None]] = [
+    (r"^/\d{4}/day/\d{1,2}/input$", None),  # Puzzle inputs never change
+    (r"^/\d{4}/day/\d{1,2}$", 0),  # Puzzle prose grows as parts are solved
+    (r"^/\d{4}/leaderboard", 15 * 60),  # Leaderboards are rebuilt every 15 minutes
+    (r"^/\d{4}/?$", 5 * 60),  # Calendar pages
+    (r"^/settings$", 0),
+]
+
+
+@dataclass
+class CacheEntry:
+    """Define the data retained about a cached response.  The headers are
+    looked up regardless of case, as they are in a live response.
+    """
+
+    url: str
+    status: int
+    headers: HTTPHeaderDict
+    stored: float
+    body_path: Path
+    meta_path: Path
+
+    @property
+    def etag(
+        self,
+    ) -> str | None:
+        """Return the entity tag supplied by the server"""
+
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(
+        self,
+    ) -> str | None:
+        """Return the last modified date supplied by the server"""
+
+        return self.headers.get("Last-Modified")
+
+    def conditional_headers(
+        self,
+    ) -> dict[str, str]:
+        """Return the headers needed to revalidate the entry"""
+
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def response(
+        self,
+    ) -> urllib3.HTTPResponse:
+        """Rebuild the cached response"""
+
+        return urllib3.HTTPResponse(
+            body=BytesIO(self.body_path.read_bytes()),
+            headers=self.headers,
+            status=self.status,
+            preload_content=True,
+            request_url=self.url,
+        )
+
+
+class ResponseCache:
+    """Manage the cached responses.  Anonymous pages are stored under
+    AOC_RUNNER_CACHE_DIR while pages requested with a session token are
+    stored under the owning user's directory in AOC_RUNNER_USERS_DIR.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        users_dir: Path | None = None,
+        ttls: Iterable[tuple[str, float | None]] = DEFAULT_TTLS,
+        default_ttl: float | None = 0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the response cache.  The directories default to those
+        of the configuration in effect when the cache is created.
+        """
+
+        config = get_config()
+        self._cache_dir = config.cache_dir if cache_dir is None else cache_dir
+        self._users_dir = config.users_dir if users_dir is None else users_dir
+        self._ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self._default_ttl = default_ttl
+        self._clock = clock
+
+    def _entry_dir(
+        self,
+        token: str | None,
+        user_id: str | None,
+    ) -> Path:
+        """Return the directory holding the entries for the requester"""
+
+        if user_id is not None:
+            return self._users_dir / user_id / "http"
+        if token is not None:
+            # Without a user id keep each token's pages apart
+            digest = sha256(token.encode()).hexdigest()[:16]
+            return self._users_dir / f"token-{digest}" / "http"
+        return self._cache_dir / "http"
+
+    def _paths(
+        self,
+        url: str,
+        token: str | None,
+        user_id: str | None,
+    ) -> tuple[Path, Path]:
+        """Return the metadata and body paths of an entry"""
+
+        entry_dir = self._entry_dir(token=token, user_id=user_id)
+        key = sha256(url.encode()).hexdigest()[:32]
+        return entry_dir / f"{key}.json", entry_dir / f"{key}.body"
+
+    def ttl(
+        self,
+        url: str,
+    ) -> float | None:
+        """Return the time to live for the specified URL"""
+
+        path = urlsplit(url).path or "/"
+        for pattern, ttl in self._ttls:
+            if pattern.search(path):
+                return ttl
+        return self._default_ttl
+
+    def is_fresh(
+        self,
+        entry: CacheEntry,
+    ) -> bool:
+        """Return whether the entry may be used without revalidation"""
+
+        ttl = self.ttl(entry.url)
+        if ttl is None:
+            return True
+        return self._clock() - entry.stored < ttl
+
+    def lookup(
+        self,
+        url: str,
+        token: str | None = None,
+        user_id: str | None = None,
+    ) -> CacheEntry | None:
+        """Return the cached entry for the URL if there is one"""
+
+        meta_path, body_path = self._paths(url=url, token=token, user_id=user_id)
+        if not (meta_path.exists() and body_path.exists()):
+            return None
+
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except ValueError:
+            log.warning("Ignoring unreadable cache entry %s", meta_path)
+            return None
+
+        return CacheEntry(
+            url=meta["url"],
+            status=meta["status"],
+            headers=HTTPHeaderDict(meta["headers"]),
+            stored=meta["stored"],
+            body_path=body_path,
+            meta_path=meta_path,
+        )
+
+    def store(
+        self,
+        url: str,
+        response: urllib3.BaseHTTPResponse,
+        token: str | None = None,
+        user_id: str | None = None,
+    ) -> CacheEntry | None:
+        """Cache a successful response.  Responses that can be neither
+        reused nor revalidated are not stored.
+        """
+
+        headers = HTTPHeaderDict(
+            {
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in ("connection", "keep-alive", "transfer-encoding")
+            }
+        )
+        cacheable = (
+            response.status == 200
+            and "no-store" not in headers.get("Cache-Control", "")
+            and (self.ttl(url) != 0 or "ETag" in headers or "Last-Modified" in headers)
+        )
+        if not cacheable:
+            return None
+
+        meta_path, body_path = self._paths(url=url, token=token, user_id=user_id)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        entry = CacheEntry(
+            url=url,
+            status=response.status,
+            headers=headers,
+            stored=self._clock(),
+            body_path=body_path,
+            meta_path=meta_path,
+        )
+        write_atomic(body_path, response.data or b"")
+        self._write_meta(entry)
+        log.debug("Cached response for %s in %s", url, meta_path.parent)
+        return entry
+
+    def refresh(
+        self,
+        entry: CacheEntry,
+        response: urllib3.BaseHTTPResponse,
+    ) -> None:
+        """Record a successful revalidation of an entry"""
+
+        for header in ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date"):
+            if header in response.headers:
+                entry.headers[header] = response.headers[header]
+        entry.stored = self._clock()
+        self._write_meta(entry)
+
+    @staticmethod
+    def _write_meta(
+        entry: CacheEntry,
+    ) -> None:
+        """Save the metadata of an entry"""
+
+        meta = {
+            "url": entry.url,
+            "status": entry.status,
+            "headers": dict(entry.headers),
+            "stored": entry.stored,
+        }
+        write_atomic(entry.meta_path, json.dumps(meta).encode("utf-8"))
+
@@ -1,12 +1,30 @@
-"""Advent of Code Runner configuration definitions"""
+"""Advent of Code Runner configuration definitions.  The configuration is
+resolved on first use rather than on import, and the directories are only
+created when they are needed.
+
+Each setting is taken from the first of these layers to supply it:
+
+1. The overrides passed to RunnerConfig or configure()
+2. The environment, either the historical variable for the setting or
+   AOC_RUNNER_<SECTION>_<SETTING> such as AOC_RUNNER_LIMITER_RATE
+3. The config.toml file in AOC_RUNNER_DIR, or the file named by
+   AOC_RUNNER_CONFIG, with one table per section
+4. The defaults defined by the section dataclasses below
+"""
 
 # System libraries
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from functools import cached_property
 import logging
 from os import environ
 from pathlib import Path
+from types import UnionType
+from typing import Any, get_args
 from zoneinfo import ZoneInfo
 
 # Advent of Code Runner libraries
+from .exceptions import AocValueError
 from .utils import _ensure_path_exists
 
 log = logging.getLogger(__name__)
@@ -17,57 +35,473 @@ __version__ = "0.0.1"
 """Defined the various environment variables used"""
 RUNNER_AUTH: str = "AOC_RUNNER_AUTH_DIR"
 RUNNER_CACHE: str = "AOC_RUNNER_CACHE_DIR"
+RUNNER_CASSETTE: str = "AOC_RUNNER_CASSETTE"
+RUNNER_CONFIG: str = "AOC_RUNNER_CONFIG"
 RUNNER_DIR: str = "AOC_RUNNER_DIR"
+RUNNER_DOMAIN: str = "AOC_RUNNER_DOMAIN"
 RUNNER_HOME: str = "AOC_RUNNER_PROJECT_HOME"
+RUNNER_HTTP_CACHE: str = "AOC_RUNNER_HTTP_CACHE"
+RUNNER_LIMITER: str = "AOC_RUNNER_LIMITER"
+RUNNER_METRICS_LOG: str = "AOC_RUNNER_METRICS_LOG"
+RUNNER_TRANSPORT: str = "AOC_RUNNER_TRANSPORT"
 RUNNER_USERS: str = "AOC_RUNNER_USERS_DIR"
 
 
-# Set the default location for the Advent of Code Runner to store
-# the various directories required
-if RUNNER_DIR not in environ:
-    if RUNNER_HOME in environ:
-        AOC_RUNNER_DIR = Path(environ.get(RUNNER_HOME), ".config", ".aoc_runner")
+@dataclass(frozen=True)
+class PathsConfig:
+    """Define the files and directories used.  Directories which are not
+    set are placed under AOC_RUNNER_DIR.
+    """
+
+    project_home: Path | None = None
+    users_dir: Path | None = None
+    cache_dir: Path | None = None
+    auth_dir: Path | None = None
+    cassette: Path | None = None
+    metrics_log: Path | None = None
+
+
+@dataclass(frozen=True)
+class LimiterConfig:
+    """Define the rate limiting of requests to the Advent of Code servers.
+    The "local" backend limits the requests of this process only while
+    "shared" draws every process on the host from a single budget kept
+    under AOC_RUNNER_DIR.
+    """
+
+    backend: str = "local"
+    rate: float = 4 / 3.0
+    burst: int = 4
+    cool_off: float = 0.25
+    max_cool_off: float = 30.0
+    decay_after: float = 60.0
+
+
+@dataclass(frozen=True)
+class HttpConfig:
+    """Define how requests reach the Advent of Code servers.  The "network"
+    transport sends them, "record" sends them and saves each exchange to
+    the cassette and "replay" answers them from the cassette without
+    network access.  The domain is only changed to point at a local stand
+    in server such as aoc_runner.localserver.
+    """
+
+    domain: str = "https://adventofcode.com"
+    transport: str = "network"
+    cache: bool = False
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 60.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """Define the sizes of the in-memory caches and how long, in seconds,
+    the checks of live and dead session tokens are remembered
+    """
+
+    soup_size: int = 128
+    soup_bytes: int = 64 * 1024 * 1024
+    metrics_size: int = 1000
+    liveness_ttl: float = 24 * 60 * 60
+    dead_token_ttl: float = 60 * 60
+
+
+@dataclass(frozen=True)
+class ParserConfig:
+    """Define how pages are parsed.  The backend is the Beautiful Soup tree
+    builder, html.parser, lxml, html5lib or auto for the fastest installed,
+    and extractors selects the streaming extractors for the known pages.
+    """
+
+    backend: str = "html.parser"
+    extractors: bool = True
+
+
+@dataclass(frozen=True)
+class StoreConfig:
+    """Define where the managed users are kept.  The "json" backend keeps
+    them in the tokens.json file, "journal" appends the changes to
+    tokens.journal and folds them into tokens.json once the journal passes
+    journal_bytes, while "sqlite" keeps a row per user in tokens.sqlite3,
+    importing tokens.json when the database is created.
+    """
+
+    backend: str = "json"
+    journal_bytes: int = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class WorkersConfig:
+    """Define the number of threads used for concurrent requests"""
+
+    max_workers: int = 4
+
+
+SECTIONS: dict[str, type] = {
+    "paths": PathsConfig,
+    "limiter": LimiterConfig,
+    "http": HttpConfig,
+    "cache": CacheConfig,
+    "parser": ParserConfig,
+    "store": StoreConfig,
+    "workers": WorkersConfig,
+}
+
+# Map the historical environment variables to their settings
+ENVIRONMENT: dict[str, tuple[str, str]] = {
+    RUNNER_AUTH: ("paths", "auth_dir"),
+    RUNNER_CACHE: ("paths", "cache_dir"),
+    RUNNER_CASSETTE: ("paths", "cassette"),
+    RUNNER_DOMAIN: ("http", "domain"),
+    RUNNER_HOME: ("paths", "project_home"),
+    RUNNER_HTTP_CACHE: ("http", "cache"),
+    RUNNER_LIMITER: ("limiter", "backend"),
+    RUNNER_METRICS_LOG: ("paths", "metrics_log"),
+    RUNNER_TRANSPORT: ("http", "transport"),
+    RUNNER_USERS: ("paths", "users_dir"),
+}
+
+
+def _coerce(
+    section: str,
+    name: str,
+    value: Any,
+) -> Any:
+    """Convert a setting to the type declared by its section"""
+
+    kind = next(field.type for field in fields(SECTIONS[section]) if field.name == name)
+    if isinstance(kind, UnionType):
+        kind = next(arg for arg in get_args(kind) if arg is not type(None))
+
+    try:
+        if kind is bool and isinstance(value, str):
+            if value.lower() not in ("1", "on", "true", "yes", "0", "off", "false", "no", ""):
+                raise ValueError(value)
+            return value.lower() in ("1", "on", "true", "yes")
+        if kind is Path:
+            return Path(value).expanduser()
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            return float(value)
+        if isinstance(value, str) and kind is not str:
+            return kind(value)
+    except (TypeError, ValueError):
+        pass
     else:
-        AOC_RUNNER_DIR = Path("~", ".config", ".aoc_runner").expanduser()
-else:
-    AOC_RUNNER_DIR = Path(environ.get(RUNNER_DIR))
-_ensure_path_exists(path_name=RUNNER_DIR, path=AOC_RUNNER_DIR, create=True)
+        if isinstance(value, kind) and not (isinstance(value, bool) and kind is not bool):
+            return value
+
+    log.error("Setting %s.%s must be a %s not %r", section, name, kind.__name__, value)
+    raise AocValueError(f"Setting {section}.{name} must be a {kind.__name__} not {value!r}")
+
+
+class RunnerConfig:
+    """Define the Advent of Code Runner configuration.  The layers are
+    read and merged once, the first time a setting is used.
+    """
+
+    def __init__(
+        self,
+        env: Mapping[str, str] | None = None,
+        overrides: Mapping[str, Mapping[str, Any]] | None = None,
+    ) -> None:
+        """Initialize the configuration from the environment"""
+
+        self._env = environ if env is None else env
+        self._overrides = {} if overrides is None else overrides
+        self._dirs_ensured = False
+
+    @cached_property
+    def runner_dir(
+        self,
+    ) -> Path:
+        """Set the default location for the Advent of Code Runner to store
+        the various directories required.  As the config file is kept here
+        it is only set by the overrides or the environment.
+        """
+
+        if "runner_dir" in self._overrides.get("paths", {}):
+            return Path(self._overrides["paths"]["runner_dir"])
+        if RUNNER_DIR in self._env:
+            return Path(self._env[RUNNER_DIR])
+        if RUNNER_HOME in self._env:
+            return Path(self._env[RUNNER_HOME], ".config", ".aoc_runner")
+        return Path("~", ".config", ".aoc_runner").expanduser()
+
+    @cached_property
+    def config_file(
+        self,
+    ) -> Path:
+        """Set the TOML file holding the configuration"""
+
+        if RUNNER_CONFIG in self._env:
+            return Path(self._env[RUNNER_CONFIG])
+        return self.runner_dir / "config.toml"
+
+    def _read_file(
+        self,
+    ) -> dict[str, dict[str, Any]]:
+        """Read the settings from the config file if there is one"""
+
+        # Imported here as the config file is only read once
+        try:
+            import tomllib
+        except ModuleNotFoundError:  # pragma: no cover - Python 3.10
+            import tomli as tomllib
+
+        try:
+            with open(self.config_file, mode="rb") as file:
+                data = tomllib.load(file)
+        except FileNotFoundError:
+            return {}
+        except tomllib.TOMLDecodeError as excp:
+            log.error("Unable to parse %s: %s", self.config_file, excp)
+            raise AocValueError(f"Unable to parse {self.config_file}: {excp}") from excp
+        log.debug("Read configuration from %s", self.config_file)
+
+        # Relative paths are relative to the config file
+        paths = data.get("paths", {})
+        for name, value in paths.items():
+            if isinstance(value, str) and not Path(value).expanduser().is_absolute():
+                paths[name] = str(self.config_file.parent / value)
+        return data
+
+    def _read_env(
+        self,
+    ) -> dict[str, dict[str, Any]]:
+        """Read the settings from the environment"""
+
+        data: dict[str, dict[str, Any]] = {}
+        for section, cls in SECTIONS.items():
+            for field in fields(cls):
+                key = f"AOC_RUNNER_{section.upper()}_{field.name.upper()}"
+                if key in self._env:
+                    data.setdefault(section, {})[field.name] = self._env[key]
+        for key, (section, name) in ENVIRONMENT.items():
+            if key in self._env:
+                data.setdefault(section, {})[name] = self._env[key]
+        return data
+
+    @cached_property
+    def _settings(
+        self,
+    ) -> dict[str, dict[str, Any]]:
+        """Merge the layers, the later layers taking precedence"""
+
+        settings: dict[str, dict[str, Any]] = {section: {} for section in SECTIONS}
+        layers = [
+            ("config file", self._read_file()),
+            ("environment", self._read_env()),
+            ("overrides", self._overrides),
+        ]
+        for source, layer in layers:
+            for section, values in layer.items():
+                if section not in SECTIONS or not isinstance(values, Mapping):
+                    log.warning("Ignoring unknown section %s in the %s", section, source)
+                    continue
+                names = {field.name for field in fields(SECTIONS[section])}
+                for name, value in values.items():
+                    if name in names:
+                        settings[section][name] = _coerce(section, name, value)
+                    elif not (section == "paths" and name == "runner_dir"):
+                        msg = "Ignoring unknown setting %s.%s in the %s"
+                        log.warning(msg, section, name, source)
+        return settings
+
+    @cached_property
+    def paths(
+        self,
+    ) -> PathsConfig:
+        """Return the files and directories settings"""
+
+        return PathsConfig(**self._settings["paths"])
+
+    @cached_property
+    def limiter(
+        self,
+    ) -> LimiterConfig:
+        """Return the rate limiter settings"""
+
+        return LimiterConfig(**self._settings["limiter"])
+
+    @cached_property
+    def http(
+        self,
+    ) -> HttpConfig:
+        """Return the HTTP client settings"""
+
+        settings = self._settings["http"]
+        if "domain" in settings:
+            settings = settings | {"domain": settings["domain"].rstrip("/")}
+        return HttpConfig(**settings)
+
+    @cached_property
+    def cache(
+        self,
+    ) -> CacheConfig:
+        """Return the in-memory cache settings"""
+
+        return CacheConfig(**self._settings["cache"])
+
+    @cached_property
+    def parser(
+        self,
+    ) -> ParserConfig:
+        """Return the page parser settings"""
+
+        return ParserConfig(**self._settings["parser"])
+
+    @cached_property
+    def store(
+        self,
+    ) -> StoreConfig:
+        """Return the user store settings"""
+
+        return StoreConfig(**self._settings["store"])
+
+    @cached_property
+    def workers(
+        self,
+    ) -> WorkersConfig:
+        """Return the worker settings"""
+
+        return WorkersConfig(**self._settings["workers"])
+
+    @property
+    def project_home(
+        self,
+    ) -> Path:
+        """Return the home of the Advent of Code project"""
+
+        return self.paths.project_home or Path.cwd().parent
+
+    @property
+    def users_dir(
+        self,
+    ) -> Path:
+        """Return the folder where user data is cached.  This includes any
+        answers, prose, etc. that are user specific
+        """
+
+        return self.paths.users_dir or self.runner_dir / "users"
+
+    @property
+    def cache_dir(
+        self,
+    ) -> Path:
+        """Return the folder where general data is cached.  This includes
+        example data, general prose, etc.
+        """
+
+        return self.paths.cache_dir or self.runner_dir / "cache"
+
+    @property
+    def auth_dir(
+        self,
+    ) -> Path:
+        """Return the folder where the session tokens are kept"""
+
+        return self.paths.auth_dir or self.runner_dir / ".auth"
+
+    @property
+    def cassette(
+        self,
+    ) -> Path:
+        """Return the cassette used by the record and replay transports"""
+
+        return self.paths.cassette or self.runner_dir / "cassette.jsonl"
+
+    @cached_property
+    def tz(
+        self,
+    ) -> ZoneInfo:
+        """Set the time zone the Advent of Code puzzles are released in"""
+
+        return ZoneInfo("America/New_York")
+
+    def ensure_dirs(
+        self,
+    ) -> None:
+        """Create the Advent of Code Runner directories and check the project
+        home is a directory.  This is done once, before the first write to
+        any of them.
+        """
+
+        if self._dirs_ensured:
+            return
+        _ensure_path_exists(path_name=RUNNER_DIR, path=self.runner_dir, create=True)
+        _ensure_path_exists(path_name=RUNNER_HOME, path=self.project_home, create=False)
+        _ensure_path_exists(path_name=RUNNER_USERS, path=self.users_dir, create=True)
+        _ensure_path_exists(path_name=RUNNER_CACHE, path=self.cache_dir, create=True)
+        _ensure_path_exists(path_name=RUNNER_AUTH, path=self.auth_dir, create=True)
+        self._dirs_ensured = True
+
+
+# Map the module level settings to the RunnerConfig attributes
+_SETTINGS = {
+    "AOC_DOMAIN": "http.domain",
+    "AOC_RUNNER_AUTH_DIR": "auth_dir",
+    "AOC_RUNNER_CACHE_DIR": "cache_dir",
+    "AOC_RUNNER_CASSETTE": "cassette",
+    "AOC_RUNNER_DIR": "runner_dir",
+    "AOC_RUNNER_HTTP_CACHE": "http.cache",
+    "AOC_RUNNER_LIMITER": "limiter.backend",
+    "AOC_RUNNER_METRICS_LOG": "paths.metrics_log",
+    "AOC_RUNNER_PROJECT_HOME": "project_home",
+    "AOC_RUNNER_TRANSPORT": "http.transport",
+    "AOC_RUNNER_USERS_DIR": "users_dir",
+    "AOC_TZ": "tz",
+}
+_config: RunnerConfig | None = None
+
+
+def get_config() -> RunnerConfig:
+    """Return the configuration, creating it on first use"""
+
+    global _config
+    if _config is None:
+        _config = RunnerConfig()
+    return _config
+
+
+def configure(
+    overrides: Mapping[str, Mapping[str, Any]] | None = None,
+) -> RunnerConfig:
+    """Replace the configuration with one using the explicit overrides.
+    This must be called before the shared HTTP client is first used.
+    """
+
+    global _config
+    _config = RunnerConfig(overrides=overrides)
+    return _config
 
 
-# Set the default home of the Advent of Code project
-if RUNNER_HOME not in environ:
-    AOC_RUNNER_PROJECT_HOME = Path.cwd().parent
-else:
-    AOC_RUNNER_PROJECT_HOME = Path(environ.get(RUNNER_HOME))
-_ensure_path_exists(path_name=RUNNER_HOME, path=AOC_RUNNER_PROJECT_HOME, create=False)
+def reset_config() -> None:
+    """Discard the configuration so it is resolved again on next use"""
 
+    global _config
+    _config = None
 
-# Set the default folder where user data is cached.  This includes
-# any answers, prose, etc. that are user specific
-if RUNNER_USERS not in environ:
-    AOC_RUNNER_USERS_DIR = AOC_RUNNER_DIR / "users"
-else:
-    AOC_RUNNER_USERS_DIR = Path(environ.get(RUNNER_USERS))
-_ensure_path_exists(path_name=RUNNER_USERS, path=AOC_RUNNER_USERS_DIR, create=True)
 
+def __getattr__(
+    name: str,
+):
+    """Resolve the module level settings from the configuration"""
 
-# Set the default folder where general data is cached.  This includes
-# example data, general prose, etc.
-if RUNNER_CACHE not in environ:
-    AOC_RUNNER_CACHE_DIR = AOC_RUNNER_DIR / "cache"
-else:
-    AOC_RUNNER_CACHE_DIR = Path(environ.get(RUNNER_CACHE))
-_ensure_path_exists(path_name=RUNNER_CACHE, path=AOC_RUNNER_CACHE_DIR, create=True)
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    value = get_config()
+    for attribute in _SETTINGS[name].split("."):
+        value = getattr(value, attribute)
+    return value
 
-# Set the default folder where general data is cached.  This includes
-# example data, general prose, etc.
-if RUNNER_AUTH not in environ:
-    AOC_RUNNER_AUTH_DIR = AOC_RUNNER_DIR / ".auth"
-else:
-    AOC_RUNNER_AUTH_DIR = Path(environ.get(RUNNER_AUTH))
-_ensure_path_exists(path_name=RUNNER_AUTH, path=AOC_RUNNER_AUTH_DIR, create=True)
 
+def __dir__() -> list[str]:
+    """List the module attributes including the lazily resolved settings"""
 
-AOC_DOMAIN = "https://adventofcode.com"
-AOC_TZ = ZoneInfo("America/New_York")
+    return sorted(set(globals()) | set(_SETTINGS))
@@ -9,10 +9,22 @@ class AocValueError(AocRunnerException):
     """The value is not valid"""
 
 
+class CassetteMiss(AocRunnerException):
+    """No recorded interaction matches the request"""
+
+
+class CircuitOpenError(AocRunnerException):
+    """Requests are suspended after repeated failures"""
+
+
 class DeadTokenError(AocRunnerException):
     """The token is no longer valid"""
 
 
+class DownloadFailed(AocRunnerException):
+    """The server did not supply the requested file"""
+
+
 class DirectoryIsFile(AocRunnerException):
     """A file was found were a directory was expected"""
 
@@ -25,6 +37,10 @@ class NoSuchUser(AocRunnerException):
     """No valid session token was found"""
 
 
+class TokenCheckFailed(AocRunnerException):
+    """The server did not say whether the token is valid"""
+
+
 class TokenFileChanged(AocRunnerException):
     """No valid session token was found"""
 
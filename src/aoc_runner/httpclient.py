@@ -3,18 +3,128 @@ with the Advent of Code servers.
 """
 
 # System libraries
-from collections import deque
+import asyncio
+from dataclasses import dataclass
+import hashlib
+from importlib import import_module
+from io import BytesIO
 import logging
+import os
 from os import environ
+from pathlib import Path
+import tempfile
+import threading
 import time
 import urllib3
 
 # Advent of Code Runner libraries
-from .config import __version__
+from .cache import ResponseCache
+from .config import __version__, get_config
+from .exceptions import AocValueError, CircuitOpenError, DownloadFailed
+from .limiter import RateLimiter
+from .metrics import (
+    connect_timer,
+    RequestMetrics,
+    RequestTiming,
+    time_connections,
+    url_pattern,
+)
+from .retry import CircuitBreaker, RetryPolicy
+from .singleflight import SingleFlight
+from .transport import Cassette, RecordingTransport, ReplayTransport, token_hash
 
 
 log = logging.getLogger(__name__)
 USER_AGENT = f"advent-of-code-runner v{__version__} by drotthoff@gmail.com"
+CHUNK_SIZE = 64 * 1024
+
+# Retries are handled by the RetryPolicy of the HttpClient, so urllib3 is
+# only left to follow redirects
+_URLLIB3_RETRIES = urllib3.Retry(
+    total=None,
+    connect=0,
+    read=0,
+    status=0,
+    other=0,
+    redirect=10,
+    respect_retry_after_header=False,
+    raise_on_redirect=False,
+    raise_on_status=False,
+)
+
+
+def _make_pool_manager() -> urllib3.PoolManager:
+    """Create the connection pool used to reach the Advent of Code servers"""
+
+    proxy_url = environ.get("http_proxy") or environ.get("https_proxy")
+
+    if proxy_url:
+        pool_manager = urllib3.ProxyManager(proxy_url, headers={"User-Agent": USER_AGENT})
+    else:
+        pool_manager = urllib3.PoolManager(headers={"User-Agent": USER_AGENT})
+    return time_connections(pool_manager)
+
+
+def _copy_response(
+    resp: urllib3.BaseHTTPResponse,
+) -> urllib3.HTTPResponse:
+    """Return a copy of a response which has been read, so that the callers
+    sharing a coalesced request can each read the body
+    """
+
+    return urllib3.HTTPResponse(
+        body=BytesIO(resp.data or b""),
+        headers=resp.headers,
+        status=resp.status,
+        preload_content=True,
+        request_url=resp.url,
+    )
+
+
+def _read_body(
+    resp: urllib3.BaseHTTPResponse,
+) -> int:
+    """Load the response body into memory and return its size"""
+
+    return len(resp.data or b"")
+
+
+def _shared_rate_limiter() -> RateLimiter:
+    """Return the rate limiter shared by all HTTP clients"""
+
+    return import_module(".limiter", __package__).rate_limiter
+
+
+def make_transport(
+    mode: str | None = None,
+    cassette_path: Path | None = None,
+):
+    """Create the transport used to issue requests in the specified mode.
+    The configured transport and cassette are used by default.
+    """
+
+    config = get_config()
+    mode = config.http.transport if mode is None else mode
+    cassette_path = config.cassette if cassette_path is None else cassette_path
+
+    if mode == "network":
+        return _make_pool_manager()
+    if mode == "record":
+        return RecordingTransport(_make_pool_manager(), Cassette(cassette_path))
+    if mode == "replay":
+        return ReplayTransport(Cassette(cassette_path), headers={"User-Agent": USER_AGENT})
+
+    log.error("Unknown transport mode %s", mode)
+    raise AocValueError(f"Unknown transport mode {mode}")
+
+
+@dataclass(frozen=True)
+class Download:
+    """Define the file written by HttpClient.download"""
+
+    path: Path
+    size: int
+    checksum: str | None
 
 
 class HttpClient:
@@ -25,57 +135,313 @@ class HttpClient:
 
     def __init__(
         self,
+        limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        transport=None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        metrics: RequestMetrics | None = None,
     ):
-        """Initialize the HTTP Client class"""
-        proxy_url = environ.get("http_proxy") or environ.get("https_proxy")
-
-        if proxy_url:
-            self._pool_manager = urllib3.ProxyManager(
-                proxy_url, headers={"User-Agent": USER_AGENT}
+        """Initialize the HTTP Client class.  A record or replay transport
+        may be supplied in place of the default connection pool.  Anything
+        not supplied is built from the configured settings.
+        """
+        config = get_config()
+        if retry is None:
+            retry = RetryPolicy(
+                max_attempts=config.http.max_attempts,
+                backoff=config.http.backoff,
+                max_backoff=config.http.max_backoff,
             )
-        else:
-            self._pool_manager = urllib3.PoolManager(headers={"User-Agent": USER_AGENT})
-
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=config.http.failure_threshold,
+                reset_timeout=config.http.reset_timeout,
+            )
+        if metrics is None:
+            metrics = RequestMetrics(
+                capacity=config.cache.metrics_size, sink=config.paths.metrics_log
+            )
+        self._pool_manager = make_transport() if transport is None else transport
+        self._rate_limiter = _shared_rate_limiter() if limiter is None else limiter
+        self._cache = cache
+        self._retry = retry
+        self._breaker = breaker
+        self._timeout = urllib3.Timeout(
+            connect=config.http.connect_timeout, read=config.http.read_timeout
+        )
+        self._sleep = time.sleep
+        self._clock = time.perf_counter
+        self._flights = SingleFlight()
+        self.metrics = metrics
         self.req_count = {"GET": 0, "POST": 0}
-        self._max_t = 3.0
-        self._cool_off = 0.25
-        self._history = deque([time.time() - self._max_t] * 4, maxlen=4)
+        self.cache_count = {"hit": 0, "revalidated": 0, "miss": 0}
+        self.fault_count = {"retries": 0, "failures": 0, "short_circuits": 0}
 
     def _limiter(
         self,
     ):
         """Ensure that the Advent of Code servers are not accessed too fast."""
-        now = time.time()
-        t0 = self._history[0]
+        self._rate_limiter.wait()
 
-        if now - t0 < self._max_t:
-            msg = "You are being rate-limited - slow down on the requests! (delay=%.02fs)"
-            log.warning(msg, self._cool_off)
-            time.sleep(self._cool_off)
-            self._cool_off *= 2  # double it for repeat offenders
+    def _record_timing(
+        self,
+        method,
+        url,
+        status,
+        times,
+        size,
+        attempt,
+        started,
+        error=None,
+    ):
+        """Record the timing of a request attempt.  The times are when the
+        attempt started, when the limiter let it through, when the response
+        headers arrived and when the body was read.
+        """
+        start, sent, first_byte, done = times
+        self.metrics.record(
+            RequestTiming(
+                method=method,
+                url=url,
+                pattern=url_pattern(url),
+                status=status,
+                queue_wait=sent - start,
+                connect=connect_timer.elapsed,
+                ttfb=first_byte - sent,
+                total=done - start,
+                bytes=size,
+                attempt=attempt,
+                error=error,
+                started=started,
+            )
+        )
+
+    def _send(
+        self,
+        method,
+        url,
+        headers,
+        consume=None,
+        **kwargs,
+    ):
+        """Send a request, retrying idempotent requests which fail with a
+        connection error or a retryable status.  Requests fail fast with
+        CircuitOpenError while the circuit breaker is open.
+
+        The response body is read by ``consume``, which returns the number
+        of bytes read.  By default the body is loaded into memory.
+        """
+        if consume is None:
+            consume = _read_body
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self._breaker.before_request()
+            except CircuitOpenError:
+                self.fault_count["short_circuits"] += 1
+                raise
 
-        self._history.append(now)
+            started = time.time()
+            start = self._clock()
+            self._limiter()
+            sent = self._clock()
+            connect_timer.elapsed = 0.0
+            resp = None
+            try:
+                if method == "POST":
+                    resp = self._pool_manager.request_encode_body(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        retries=_URLLIB3_RETRIES,
+                        timeout=self._timeout,
+                        preload_content=False,
+                        **kwargs,
+                    )
+                else:
+                    resp = self._pool_manager.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        retries=_URLLIB3_RETRIES,
+                        timeout=self._timeout,
+                        preload_content=False,
+                        **kwargs,
+                    )
+                first_byte = self._clock()
+                size = consume(resp)
+            except urllib3.exceptions.HTTPError as excp:
+                failed = self._clock()
+                self._record_timing(
+                    method=method,
+                    url=url,
+                    status=None if resp is None else resp.status,
+                    times=(start, sent, failed, failed),
+                    size=0,
+                    attempt=attempt,
+                    started=started,
+                    error=type(excp).__name__,
+                )
+                self.req_count[method] += 1
+                self.fault_count["failures"] += 1
+                self._breaker.record_failure()
+                if not self._retry.should_retry(method=method, attempt=attempt):
+                    raise
+                delay = self._retry.delay(attempt=attempt)
+                log.warning("%s %s failed (%s), retrying in %.2fs", method, url, excp, delay)
+            except BaseException:
+                # Any other error still fails the request, which also releases
+                # the trial request of a half-open circuit
+                self.fault_count["failures"] += 1
+                self._breaker.record_failure()
+                raise
+            else:
+                self._record_timing(
+                    method=method,
+                    url=url,
+                    status=resp.status,
+                    times=(start, sent, first_byte, self._clock()),
+                    size=size,
+                    attempt=attempt,
+                    started=started,
+                )
+                self.req_count[method] += 1
+                if resp.status == 429:
+                    self._rate_limiter.throttled()
+                if not self._retry.is_failure(resp):
+                    self._breaker.record_success()
+                    return resp
+
+                self.fault_count["failures"] += 1
+                self._breaker.record_failure()
+                if not self._retry.should_retry(method=method, attempt=attempt):
+                    return resp
+                delay = self._retry.delay(attempt=attempt, resp=resp)
+                log.warning(
+                    "%s %s returned %s, retrying in %.2fs", method, url, resp.status, delay
+                )
+
+            self.fault_count["retries"] += 1
+            self._sleep(delay)
 
     def get(
         self,
         url,
         token=None,
         redirect=True,
+        user_id=None,
     ):
-        """Issue an HTTP GET request to the Advent of Code servers"""
+        """Issue an HTTP GET request to the Advent of Code servers.  Identical
+        requests issued while one is already in flight wait for, and share,
+        its response rather than issuing a request of their own.
+        """
         print(f"Running http_client.get for token {token}")
+        key = (url, token_hash(token), redirect, user_id)
+        resp, shared = self._flights.do(
+            key,
+            lambda: self._get(url=url, token=token, redirect=redirect, user_id=user_id),
+        )
+        return _copy_response(resp) if shared else resp
+
+    @property
+    def coalesced_count(
+        self,
+    ):
+        """Return the number of requests saved by sharing a response"""
+        return self._flights.saved
+
+    def _get(
+        self,
+        url,
+        token,
+        redirect,
+        user_id,
+    ):
+        """Issue the HTTP GET request.  When the response cache is enabled,
+        fresh pages are served from disk and stale pages are revalidated
+        with a conditional request.
+        """
         if token is None:
             headers = self._pool_manager.headers
         else:
             headers = self._pool_manager.headers | {"Cookie": f"session={token}"}
 
-        self._limiter()
-        resp = self._pool_manager.request(
-            method="GET", url=url, headers=headers, redirect=redirect
-        )
-        self.req_count["GET"] += 1
+        entry = None
+        if self._cache is not None:
+            entry = self._cache.lookup(url=url, token=token, user_id=user_id)
+            if entry is not None:
+                if self._cache.is_fresh(entry):
+                    self.cache_count["hit"] += 1
+                    return entry.response()
+                headers = headers | entry.conditional_headers()
+
+        resp = self._send(method="GET", url=url, headers=headers, redirect=redirect)
+
+        if self._cache is not None:
+            if resp.status == 304 and entry is not None:
+                self.cache_count["revalidated"] += 1
+                self._cache.refresh(entry=entry, response=resp)
+                return entry.response()
+            self.cache_count["miss"] += 1
+            self._cache.store(url=url, response=resp, token=token, user_id=user_id)
         return resp
 
+    def download(
+        self,
+        url,
+        path,
+        token=None,
+        checksum="sha256",
+        chunk_size=CHUNK_SIZE,
+    ):
+        """Stream the page to a file without holding it in memory.  The body
+        is written to a temporary file of its own beside the target, which
+        replaces the target once complete, and the checksum is computed as
+        it is read.  Downloads bypass the response cache.
+        """
+        log.debug("Downloading %s to %s", url, path)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".part"
+        )
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        if token is None:
+            headers = self._pool_manager.headers
+        else:
+            headers = self._pool_manager.headers | {"Cookie": f"session={token}"}
+        written = {}
+
+        def stream(resp):
+            if resp.status != 200:
+                return _read_body(resp)
+            digest = None if checksum is None else hashlib.new(checksum)
+            size = 0
+            with open(tmp_path, mode="wb") as file:
+                for chunk in resp.stream(chunk_size):
+                    file.write(chunk)
+                    size += len(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+            resp.release_conn()
+            written["size"] = size
+            written["checksum"] = None if digest is None else digest.hexdigest()
+            return size
+
+        try:
+            resp = self._send(method="GET", url=url, headers=headers, consume=stream)
+            if resp.status != 200:
+                log.error("Download of %s failed with status %s", url, resp.status)
+                raise DownloadFailed(f"Download of {url} failed with status {resp.status}")
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        return Download(path=path, size=written["size"], checksum=written["checksum"])
+
     def post(
         self,
         url,
@@ -85,17 +451,132 @@ class HttpClient:
         """Issue an HTTP POST request to the Advent of Code servers"""
         print(f"Running http_client.post for token {token}")
         headers = self._pool_manager.headers | {"Cookie": f"session={token}"}
-        self._limiter()
-        resp = self._pool_manager.request_encode_body(
+        resp = self._send(
+            method="POST",
+            url=url,
+            fields=fields,
+            headers=headers,
+            encode_multipart=False,
+        )
+        return resp
+
+
+class AsyncHttpClient:
+    """Asyncio variant of the HttpClient.  Requests are issued from a worker
+    thread so that waits on the network (and on the rate limiter, which is
+    shared with the synchronous client by default) can overlap.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None = None,
+        transport=None,
+    ):
+        """Initialize the asynchronous HTTP Client class"""
+        config = get_config()
+        self._pool_manager = make_transport() if transport is None else transport
+        self._timeout = urllib3.Timeout(
+            connect=config.http.connect_timeout, read=config.http.read_timeout
+        )
+        self._rate_limiter = _shared_rate_limiter() if limiter is None else limiter
+        self._flights = SingleFlight()
+        self.req_count = {"GET": 0, "POST": 0}
+
+    async def _limiter(
+        self,
+    ):
+        """Ensure that the Advent of Code servers are not accessed too fast."""
+        await self._rate_limiter.wait_async()
+
+    async def get(
+        self,
+        url,
+        token=None,
+        redirect=True,
+    ):
+        """Issue an HTTP GET request to the Advent of Code servers.  Identical
+        requests issued while one is already in flight share its response.
+        """
+        log.debug("Running async http_client.get for url %s", url)
+        key = (url, token_hash(token), redirect)
+        resp, shared = await self._flights.do_async(
+            key,
+            lambda: self._get(url=url, token=token, redirect=redirect),
+        )
+        return _copy_response(resp) if shared else resp
+
+    @property
+    def coalesced_count(
+        self,
+    ):
+        """Return the number of requests saved by sharing a response"""
+        return self._flights.saved
+
+    async def _get(
+        self,
+        url,
+        token,
+        redirect,
+    ):
+        """Issue the HTTP GET request"""
+        if token is None:
+            headers = self._pool_manager.headers
+        else:
+            headers = self._pool_manager.headers | {"Cookie": f"session={token}"}
+
+        await self._limiter()
+        resp = await asyncio.to_thread(
+            self._pool_manager.request,
+            method="GET",
+            url=url,
+            headers=headers,
+            redirect=redirect,
+            timeout=self._timeout,
+        )
+        self.req_count["GET"] += 1
+        if resp.status == 429:
+            await asyncio.to_thread(self._rate_limiter.throttled)
+        return resp
+
+    async def post(
+        self,
+        url,
+        token,
+        fields,
+    ):
+        """Issue an HTTP POST request to the Advent of Code servers"""
+        log.debug("Running async http_client.post for url %s", url)
+        headers = self._pool_manager.headers | {"Cookie": f"session={token}"}
+        await self._limiter()
+        resp = await asyncio.to_thread(
+            self._pool_manager.request_encode_body,
             method="POST",
             url=url,
             fields=fields,
             headers=headers,
             encode_multipart=False,
+            timeout=self._timeout,
         )
         self.req_count["POST"] += 1
+        if resp.status == 429:
+            await asyncio.to_thread(self._rate_limiter.throttled)
         return resp
 
 
-# Create an instance of the HttpClient for common use
-http_client = HttpClient()
+_http_client_lock = threading.Lock()
+
+
+def __getattr__(
+    name: str,
+):
+    """Create the instance of the HttpClient for common use on first use"""
+
+    if name != "http_client":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    global http_client
+    with _http_client_lock:
+        if "http_client" not in globals():
+            cache = ResponseCache() if get_config().http.cache else None
+            http_client = HttpClient(cache=cache)
+    return http_client
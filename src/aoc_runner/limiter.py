@@ -0,0 +1,306 @@
+"""Provide the rate limiter shared by the HTTP clients used to
+communicate with the Advent of Code servers.
+"""
+
+# System libraries
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import json
+import logging
+from pathlib import Path
+import threading
+import time
+
+# Advent of Code Runner libraries
+from .config import get_config
+from .exceptions import AocValueError
+from .utils import file_lock
+
+
+log = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Ensure that the Advent of Code servers are not accessed too fast.
+    A single instance may be shared by any number of synchronous and
+    asynchronous clients so they all draw from the same request budget.
+
+    Requests are metered with a token bucket holding up to ``burst``
+    tokens which refills at ``rate`` tokens per second.  A request that
+    finds the bucket empty reserves the next token and waits exactly
+    until it becomes available.  When the server still refuses a request
+    as too fast, reported through ``throttled``, every caller is held back
+    by a cool off which doubles for each repeat refusal and halves again
+    for every ``decay_after`` seconds without one.
+    """
+
+    def __init__(
+        self,
+        rate: float = 4 / 3.0,
+        burst: int = 4,
+        cool_off: float = 0.25,
+        max_cool_off: float = 30.0,
+        decay_after: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the rate limiter"""
+
+        if rate <= 0:
+            raise AocValueError(f"Rate must be greater than zero not {rate}")
+        if burst < 1:
+            raise AocValueError(f"Burst must be at least one not {burst}")
+
+        self._lock = threading.Lock()
+        self._rate = rate
+        self._burst = burst
+        self._base_cool_off = cool_off
+        self._max_cool_off = max_cool_off
+        self._decay_after = decay_after
+        self._clock = clock
+        self._sleep = sleep
+
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._cool_off = 0.0
+        self._last_throttled = self._updated
+
+    @contextmanager
+    def _state(
+        self,
+    ) -> Iterator[None]:
+        """Hold exclusive access to the bucket state while it is updated"""
+
+        with self._lock:
+            yield
+
+    def _refill(
+        self,
+        now: float,
+    ) -> None:
+        """Add the tokens accrued since the last update to the bucket"""
+
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(float(self._burst), self._tokens + elapsed * self._rate)
+        self._updated = now
+
+    def _decay(
+        self,
+        now: float,
+    ) -> None:
+        """Halve the cool off for every quiet period since the last throttle"""
+
+        if not self._cool_off or self._decay_after <= 0:
+            return
+
+        periods = int((now - self._last_throttled) // self._decay_after)
+        if periods > 0:
+            self._cool_off /= 2**periods
+            self._last_throttled += periods * self._decay_after
+            if self._cool_off < self._base_cool_off:
+                self._cool_off = 0.0
+
+    def _reserve(
+        self,
+    ) -> float:
+        """Reserve a token and return the number of seconds the caller
+        must wait before issuing its request
+        """
+
+        with self._state():
+            now = self._clock()
+            self._refill(now)
+            self._decay(now)
+
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            delay = -self._tokens / self._rate
+
+        log.debug("Waiting %.02fs for the rate limiter", delay)
+        return delay
+
+    def throttled(
+        self,
+    ) -> None:
+        """Record that the server refused a request as too fast.  The
+        requests which follow are held back by the cool off, which is
+        escalated for every repeat refusal.
+        """
+
+        with self._state():
+            now = self._clock()
+            self._refill(now)
+            self._decay(now)
+
+            if self._cool_off:
+                self._cool_off = min(self._cool_off * 2, self._max_cool_off)
+            else:
+                self._cool_off = self._base_cool_off
+            self._last_throttled = now
+            # Borrow the cool off from the bucket so every caller waits it out
+            self._tokens -= self._cool_off * self._rate
+            cool_off = self._cool_off
+
+        msg = "You are being rate-limited - slow down on the requests! (cool off=%.02fs)"
+        log.warning(msg, cool_off)
+
+    def wait(
+        self,
+    ) -> None:
+        """Block the calling thread until a request may be issued"""
+
+        delay = self._reserve()
+        if delay:
+            self._sleep(delay)
+
+    async def wait_async(
+        self,
+    ) -> None:
+        """Suspend the calling task until a request may be issued"""
+
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    @property
+    def cool_off(
+        self,
+    ) -> float:
+        """Return the cool off applied after the last refusal by the server"""
+
+        return self._cool_off
+
+    @property
+    def tokens(
+        self,
+    ) -> float:
+        """Return the number of tokens available as of the last request"""
+
+        return self._tokens
+
+
+class SharedRateLimiter(RateLimiter):
+    """Rate limiter whose bucket is shared by every process on the host.
+    The bucket state is kept in a small JSON file which is read and
+    rewritten under an exclusive advisory lock for every request, so all
+    processes using the same file draw from one request budget.
+
+    The wall clock is used by default as, unlike the monotonic clock, it
+    is comparable between processes across a reboot.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        clock: Callable[[], float] = time.time,
+        **kwargs,
+    ) -> None:
+        """Initialize the shared rate limiter"""
+
+        super().__init__(clock=clock, **kwargs)
+        self._path = path
+        log.debug("Shared rate limiter state kept in %s", self._path)
+
+    @contextmanager
+    def _state(
+        self,
+    ) -> Iterator[None]:
+        """Load the bucket state from the shared file, hold the file lock
+        while it is updated and write it back
+        """
+
+        with self._lock, file_lock(self._path) as file:
+            file.seek(0)
+            raw = file.read()
+            if raw:
+                try:
+                    state = json.loads(raw)
+                    self._tokens = state["tokens"]
+                    self._updated = state["updated"]
+                    self._cool_off = state["cool_off"]
+                    self._last_throttled = state["last_throttled"]
+                except (ValueError, KeyError):
+                    log.warning("Ignoring unreadable rate limiter state in %s", self._path)
+
+            try:
+                yield
+            finally:
+                state = {
+                    "tokens": self._tokens,
+                    "updated": self._updated,
+                    "cool_off": self._cool_off,
+                    "last_throttled": self._last_throttled,
+                }
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(state).encode("utf-8"))
+                file.flush()
+
+    async def wait_async(
+        self,
+    ) -> None:
+        """Suspend the calling task until a request may be issued.  The
+        reservation waits on the lock of the shared file, so it is made
+        from a worker thread rather than on the event loop.
+        """
+
+        delay = await asyncio.to_thread(self._reserve)
+        if delay:
+            await asyncio.sleep(delay)
+
+    @property
+    def path(
+        self,
+    ) -> Path:
+        """Return the path of the shared state file"""
+
+        return self._path
+
+
+def make_rate_limiter(
+    backend: str | None = None,
+) -> RateLimiter:
+    """Create the rate limiter for the requested backend, tuned by the
+    limiter settings of the configuration
+    """
+
+    config = get_config()
+    settings = config.limiter
+    backend = settings.backend if backend is None else backend
+    tuning = {
+        "rate": settings.rate,
+        "burst": settings.burst,
+        "cool_off": settings.cool_off,
+        "max_cool_off": settings.max_cool_off,
+        "decay_after": settings.decay_after,
+    }
+
+    if backend == "local":
+        return RateLimiter(**tuning)
+    if backend == "shared":
+        return SharedRateLimiter(path=config.runner_dir / "ratelimit.json", **tuning)
+
+    log.error("Unknown rate limiter backend %s", backend)
+    raise AocValueError(f"Unknown rate limiter backend {backend}")
+
+
+_rate_limiter_lock = threading.Lock()
+
+
+def __getattr__(
+    name: str,
+):
+    """Create the instance of the RateLimiter shared by all HTTP clients on
+    first use, so that it follows the configuration in effect by then
+    """
+
+    if name != "rate_limiter":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    global rate_limiter
+    with _rate_limiter_lock:
+        if "rate_limiter" not in globals():
+            rate_limiter = make_rate_limiter()
+    return rate_limiter
@@ -0,0 +1,205 @@
+"""Provide a persisted cache of the session tokens checked against the
+Advent of Code servers.  A live token is remembered with the user owning
+it and a dead token is remembered as such, each for its own time to live,
+so that repeated checks of the same token are answered locally.
+
+Tokens are never written to the cache, only a hash of them.
+"""
+
+# System libraries
+from collections.abc import Callable
+from dataclasses import dataclass
+from hashlib import sha256
+import json
+import logging
+from pathlib import Path
+import threading
+import time
+
+# Advent of Code Runner libraries
+from .utils import file_lock, write_atomic
+
+
+log = logging.getLogger(__name__)
+
+
+def _token_key(
+    token: str,
+) -> str:
+    """Return the hash identifying a token in the cache"""
+
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Liveness:
+    """Define the outcome of the last check of a token.  The owner is None
+    for a dead token.
+    """
+
+    verified: float
+    user_name: str | None = None
+    aoc_id: int | None = None
+    login_source: str | None = None
+
+    @property
+    def alive(
+        self,
+    ) -> bool:
+        """Return whether the token was found to be live"""
+
+        return self.aoc_id is not None
+
+    @property
+    def user_id(
+        self,
+    ) -> str | None:
+        """Return the user ID owning the token"""
+
+        return f"{self.login_source}.{self.aoc_id}" if self.alive else None
+
+
+class LivenessCache:
+    """Manage the cached token checks.  The file is read again whenever
+    another process replaced it, and is rewritten under a lock so that the
+    checks made by concurrent processes are all kept.  A time to live of 0
+    disables the caching of that outcome.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = 24 * 60 * 60,
+        dead_ttl: float = 60 * 60,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the liveness cache"""
+
+        self.path = path
+        self._ttl = ttl
+        self._dead_ttl = dead_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._signature: tuple | None = None
+
+    @property
+    def lock_file(
+        self,
+    ) -> Path:
+        """Return the path of the file locked while the cache is rewritten"""
+
+        return self.path.with_name(f"{self.path.name}.lock")
+
+    def _stat(
+        self,
+    ) -> tuple | None:
+        """Return the identity of the current cache file"""
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _refresh(
+        self,
+    ) -> None:
+        """Read the cache file if it changed since it was last read"""
+
+        signature = self._stat()
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self._entries = {}
+        if signature is None:
+            return
+        try:
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except ValueError:
+            log.warning("Ignoring unreadable liveness cache %s", self.path)
+
+    def _expired(
+        self,
+        entry: dict,
+        now: float,
+    ) -> bool:
+        """Return whether the cached check is too old to be used"""
+
+        ttl = self._ttl if entry.get("aoc_id") is not None else self._dead_ttl
+        return now - entry["verified"] >= ttl
+
+    def lookup(
+        self,
+        token: str,
+    ) -> Liveness | None:
+        """Return the last check of the token if it is still fresh"""
+
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(_token_key(token))
+        if entry is None or self._expired(entry, self._clock()):
+            return None
+        return Liveness(**entry)
+
+    def _update(
+        self,
+        token: str,
+        entry: dict | None,
+    ) -> None:
+        """Save, or forget when None, the check of a token and drop the
+        checks which expired
+        """
+
+        with self._lock, file_lock(self.lock_file):
+            self._refresh()
+            now = self._clock()
+            entries = {
+                key: value
+                for key, value in self._entries.items()
+                if not self._expired(value, now)
+            }
+            if entry is None:
+                entries.pop(_token_key(token), None)
+            else:
+                entries[_token_key(token)] = entry
+            write_atomic(self.path, json.dumps(entries, indent=2).encode("utf-8"))
+            self._entries = entries
+            self._signature = self._stat()
+
+    def store_live(
+        self,
+        token: str,
+        user_name: str,
+        aoc_id: int,
+        login_source: str,
+    ) -> None:
+        """Remember that the token is live and the user owning it"""
+
+        if self._ttl <= 0:
+            return
+        entry = {
+            "verified": self._clock(),
+            "user_name": user_name,
+            "aoc_id": aoc_id,
+            "login_source": login_source,
+        }
+        self._update(token=token, entry=entry)
+
+    def store_dead(
+        self,
+        token: str,
+    ) -> None:
+        """Remember that the token is dead"""
+
+        if self._dead_ttl <= 0:
+            return
+        self._update(token=token, entry={"verified": self._clock()})
+
+    def forget(
+        self,
+        token: str,
+    ) -> None:
+        """Forget the last check of the token"""
+
+        self._update(token=token, entry=None)
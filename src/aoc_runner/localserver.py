@@ -0,0 +1,498 @@
+"""Provide a local stand in for the Advent of Code servers used to load
+and latency test the runner without accessing the real site.
+
+Pages recorded in cassettes (see aoc_runner.transport) are served as
+recorded, while puzzle inputs, answer submissions and private leaderboards
+are synthesized.  Latency, dead token redirects, 429 responses and
+"answer too recently" responses may be injected.  Point the runner at the
+server by setting AOC_RUNNER_DOMAIN to its URL, for example:
+
+    python -m aoc_runner.localserver --port 8080 --latency 0.05
+    AOC_RUNNER_DOMAIN=http://127.0.0.1:8080 python my_script.py
+"""
+
+# System libraries
+import argparse
+from collections import Counter
+from dataclasses import dataclass
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+import json
+import logging
+from pathlib import Path
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs
+
+# Advent of Code Runner libraries
+from .config import get_config
+from .transport import Cassette
+
+
+log = logging.getLogger(__name__)
+RECORDED_DOMAIN = "https://adventofcode.com"
+
+INPUT_PATH = re.compile(r"^/(\d{4})/day/(\d{1,2})/input$")
+ANSWER_PATH = re.compile(r"^/(\d{4})/day/(\d{1,2})/answer$")
+LEADERBOARD_PATH = re.compile(r"^/(\d{4})/leaderboard/private/view/(\d+)\.json$")
+
+SETTINGS_PAGE = """<!DOCTYPE html>
+<html lang="en-us">
+<head><meta charset="utf-8"/><title>Settings - Advent of Code</title></head>
+<body>
+<main>
+<article><p>You can prove ownership of this account with this code:
+<code>ownerproof-{aoc_id}-{stamp}-{proof}</code></p>
+<p>How would you like to be identified?</p>
+<span>(anonymous user #{aoc_id})</span>
+<span>Link to https://github.com/{user_name}</span>
+</article>
+</main>
+</body>
+</html>
+"""
+ANSWER_PAGE = """<!DOCTYPE html>
+<html lang="en-us">
+<head><meta charset="utf-8"/><title>Day {day} - Advent of Code {year}</title></head>
+<body><main><article><p>{message}</p></article></main></body>
+</html>
+"""
+RIGHT_ANSWER = "That's the right answer!  You are one gold star closer to saving Christmas."
+WRONG_ANSWER = (
+    "That's not the right answer.  If you're stuck, make sure you're using the full input "
+    "data.  Please wait one minute before trying again."
+)
+TOO_RECENT = (
+    "You gave an answer too recently; you have to wait after submitting an answer before "
+    "trying again.  You have {left}s left to wait."
+)
+
+
+@dataclass
+class Faults:
+    """Define the faults injected into the responses of the local server.
+    Rates are the probability of the fault occurring on each request.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    dead_token_rate: float = 0.0
+    throttle_rate: float = 0.0
+    too_recent_rate: float = 0.0
+    retry_after: int = 1
+
+
+def _digest(
+    *parts,
+) -> str:
+    """Return a stable hash of the parts supplied"""
+
+    return sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def synthetic_aoc_id(
+    token: str,
+) -> int:
+    """Return the Advent of Code ID of the user synthesized for a token"""
+
+    return int(_digest("user", token)[:7], 16) + 1
+
+
+def synthetic_input(
+    token: str,
+    year: int,
+    day: int,
+) -> str:
+    """Return the puzzle input synthesized for a token"""
+
+    seed = _digest("input", token, year, day)
+    rng = random.Random(seed)
+    return "\n".join(str(rng.randint(1, 99999)) for _ in range(200)) + "\n"
+
+
+def synthetic_answer(
+    token: str,
+    year: int,
+    day: int,
+    level: int,
+) -> str:
+    """Return the correct answer synthesized for a token and puzzle part"""
+
+    return str(int(_digest("answer", token, year, day, level)[:8], 16) % 1000000)
+
+
+class LocalAocServer:
+    """Serve a local stand in for the Advent of Code servers"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        cassettes: list[Path] | None = None,
+        synthesize_users: bool = False,
+        faults: Faults | None = None,
+        answer_cool_off: float = 60.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the local server.  When no cassettes are specified
+        every cassette found in the project data directory is served.
+        """
+
+        if cassettes is None:
+            data_dir = get_config().project_home / "data"
+            cassettes = sorted(data_dir.glob("**/*.cassette.jsonl"))
+
+        self.cassette = Cassette()
+        for cassette_file in cassettes:
+            for interaction in Cassette(cassette_file):
+                self.cassette.add(interaction, save=False)
+
+        self.synthesize_users = synthesize_users
+        self.faults = Faults() if faults is None else faults
+        self.answer_cool_off = answer_cool_off
+        self.stats: Counter = Counter()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._last_wrong: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+        self._httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.aoc = self
+
+    def __enter__(
+        self,
+    ) -> "LocalAocServer":
+        """Start the server in a background thread"""
+
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        *args,
+    ) -> None:
+        """Stop the server"""
+
+        self.stop()
+
+    @property
+    def url(
+        self,
+    ) -> str:
+        """Return the base URL of the server"""
+
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(
+        self,
+    ) -> None:
+        """Start the server in a background thread"""
+
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        log.info("Local Advent of Code server listening on %s", self.url)
+
+    def serve_forever(
+        self,
+    ) -> None:
+        """Run the server in the calling thread"""
+
+        log.info("Local Advent of Code server listening on %s", self.url)
+        self._httpd.serve_forever()
+
+    def stop(
+        self,
+    ) -> None:
+        """Stop the server and release its socket"""
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _chance(
+        self,
+        rate: float,
+    ) -> bool:
+        """Return True with the probability specified"""
+
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _is_live(
+        self,
+        token: str | None,
+    ) -> bool:
+        """Return whether the session token belongs to a known user"""
+
+        if token is None:
+            return False
+        if self._chance(self.faults.dead_token_rate):
+            return False
+        if self.synthesize_users:
+            return True
+        settings = self.cassette.find(
+            method="GET", url=f"{RECORDED_DOMAIN}/settings", token=token
+        )
+        return settings is not None and settings.status == 200
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        token: str | None,
+        form: dict[str, str],
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Build the response to a request"""
+
+        if self.faults.latency or self.faults.jitter:
+            with self._lock:
+                jitter = self._rng.uniform(0, self.faults.jitter)
+            time.sleep(self.faults.latency + jitter)
+
+        if self._chance(self.faults.throttle_rate):
+            return 429, {"Retry-After": str(self.faults.retry_after)}, b"Too Many Requests"
+
+        if method == "GET" and path == "/settings" and self.synthesize_users:
+            return self._settings(token=token)
+
+        if method == "GET" and (match := INPUT_PATH.match(path)):
+            return self._input(token=token, year=int(match[1]), day=int(match[2]))
+
+        if method == "POST" and (match := ANSWER_PATH.match(path)):
+            return self._answer(token=token, year=int(match[1]), day=int(match[2]), form=form)
+
+        if method == "GET" and (match := LEADERBOARD_PATH.match(path)):
+            return self._leaderboard(token=token, year=int(match[1]), board=int(match[2]))
+
+        # The home page is recorded without a trailing slash
+        url = f"{RECORDED_DOMAIN}{path}" if path != "/" else RECORDED_DOMAIN
+        interaction = self.cassette.find(method=method, url=url, token=token)
+        if interaction is None and path == "/settings":
+            return self._dead_token()
+        if interaction is None:
+            return 404, {"Content-Type": "text/plain"}, b"404 Not Found"
+        if interaction.status == 200 and token is not None and not self._is_live(token):
+            return self._dead_token()
+        return interaction.status, dict(interaction.headers), interaction.body
+
+    @staticmethod
+    def _dead_token() -> tuple[int, dict[str, str], bytes]:
+        """Build the redirect the Advent of Code servers send for dead tokens"""
+
+        headers = {
+            "Location": "/",
+            "Set-Cookie": "session=; Expires=Thu, 01-Jan-1970 00:00:00 GMT; Path=/; HttpOnly",
+        }
+        return 302, headers, b""
+
+    def _settings(
+        self,
+        token: str | None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Build the settings page of a synthesized user"""
+
+        if not self._is_live(token):
+            return self._dead_token()
+
+        aoc_id = synthetic_aoc_id(token)
+        page = SETTINGS_PAGE.format(
+            aoc_id=aoc_id,
+            stamp=int(time.time()),
+            proof=_digest("proof", token)[:12],
+            user_name=f"user{aoc_id}",
+        )
+        return 200, {"Content-Type": "text/html"}, page.encode("utf-8")
+
+    def _input(
+        self,
+        token: str | None,
+        year: int,
+        day: int,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Build the puzzle input of a user"""
+
+        if token is None:
+            body = b"Puzzle inputs differ by user.  Please log in to get your puzzle input.\n"
+            return 400, {"Content-Type": "text/plain"}, body
+        if not self._is_live(token):
+            return 500, {"Content-Type": "text/plain"}, b"500 Internal Server Error\n"
+
+        body = synthetic_input(token=token, year=year, day=day).encode("utf-8")
+        return 200, {"Content-Type": "text/plain"}, body
+
+    def _answer(
+        self,
+        token: str | None,
+        year: int,
+        day: int,
+        form: dict[str, str],
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Check a submitted answer"""
+
+        if not self._is_live(token):
+            return self._dead_token()
+
+        now = time.monotonic()
+        with self._lock:
+            left = self.answer_cool_off - (
+                now - self._last_wrong.get(token, -self.answer_cool_off)
+            )
+        if left > 0 or self._chance(self.faults.too_recent_rate):
+            message = TOO_RECENT.format(left=max(1, int(left)))
+        elif form.get("answer") == synthetic_answer(
+            token, year, day, int(form.get("level", 1))
+        ):
+            message = RIGHT_ANSWER
+        else:
+            with self._lock:
+                self._last_wrong[token] = now
+            message = WRONG_ANSWER
+
+        page = ANSWER_PAGE.format(year=year, day=day, message=message)
+        return 200, {"Content-Type": "text/html"}, page.encode("utf-8")
+
+    def _leaderboard(
+        self,
+        token: str | None,
+        year: int,
+        board: int,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Build a private leaderboard"""
+
+        if not self._is_live(token):
+            return self._dead_token()
+
+        rng = random.Random(_digest("leaderboard", year, board))
+        members = {}
+        for member_id in [board] + [rng.randint(1, 3000000) for _ in range(9)]:
+            stars = rng.randint(0, 50)
+            members[str(member_id)] = {
+                "id": member_id,
+                "name": f"user{member_id}",
+                "stars": stars,
+                "local_score": stars * rng.randint(5, 10),
+                "global_score": 0,
+                "last_star_ts": 0,
+                "completion_day_level": {},
+            }
+        body = json.dumps({"owner_id": board, "event": str(year), "members": members})
+        return 200, {"Content-Type": "application/json"}, body.encode("utf-8")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Pass each request to the LocalAocServer which owns the HTTP server"""
+
+    protocol_version = "HTTP/1.1"
+    # Send each response in one write so keep-alive requests are not held
+    # up by Nagle's algorithm waiting on a delayed ACK
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def _respond(
+        self,
+        method: str,
+    ) -> None:
+        """Build and send the response to the request"""
+
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        token = cookie["session"].value if "session" in cookie else None
+
+        form = {}
+        if method == "POST":
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length).decode("utf-8")
+            form = {key: values[-1] for key, values in parse_qs(body).items()}
+
+        aoc = self.server.aoc
+        status, headers, body = aoc.handle(
+            method=method, path=self.path.split("?")[0], token=token, form=form
+        )
+        aoc.stats[status] += 1
+
+        self.send_response(status)
+        for key, value in headers.items():
+            if key.lower() not in ("content-length", "connection", "transfer-encoding"):
+                self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(
+        self,
+    ) -> None:
+        """Respond to an HTTP GET request"""
+
+        self._respond("GET")
+
+    def do_POST(
+        self,
+    ) -> None:
+        """Respond to an HTTP POST request"""
+
+        self._respond("POST")
+
+    def log_message(
+        self,
+        format,
+        *args,
+    ) -> None:
+        """Send the request log to the logging module rather than stderr"""
+
+        log.debug(format, *args)
+
+
+def main(
+    argv: list[str] | None = None,
+) -> None:
+    """Run the local server from the command line"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cassette", type=Path, action="append", dest="cassettes")
+    parser.add_argument("--synthesize-users", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--dead-token-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--too-recent-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = LocalAocServer(
+        host=args.host,
+        port=args.port,
+        cassettes=args.cassettes,
+        synthesize_users=args.synthesize_users,
+        faults=Faults(
+            latency=args.latency,
+            jitter=args.jitter,
+            dead_token_rate=args.dead_token_rate,
+            throttle_rate=args.throttle_rate,
+            too_recent_rate=args.too_recent_rate,
+        ),
+        seed=args.seed,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+# If run as a script, execute the main function
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Provide the timing instrumentation of the requests issued to the
+Advent of Code servers.  Every request is broken down into the time spent
+waiting on the rate limiter, connecting, waiting for the first byte of the
+response and reading the rest of it, so a slow run can be pinned on the
+limiter, the network or the server.
+"""
+
+# System libraries
+from bisect import bisect_left
+from collections import deque
+from dataclasses import asdict, dataclass
+import json
+import logging
+from pathlib import Path
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Third-party libraries
+import urllib3
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+log = logging.getLogger(__name__)
+PHASES = ("queue_wait", "connect", "ttfb", "total")
+
+# Upper bounds, in seconds, of the histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NUMERIC_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)")
+
+
+def url_pattern(
+    url: str,
+) -> str:
+    """Return the URL path with its numeric segments replaced by {n} so that
+    the requests for every year and day are aggregated together
+    """
+
+    return _NUMERIC_SEGMENT.sub("{n}", urlsplit(url).path or "/")
+
+
+@dataclass(frozen=True)
+class RequestTiming:
+    """Define the timings, in seconds, of a single request attempt.  The
+    time to first byte includes the connect time, which is zero when a
+    pooled connection was reused.
+    """
+
+    method: str
+    url: str
+    pattern: str
+    status: int | None
+    queue_wait: float
+    connect: float
+    ttfb: float
+    total: float
+    bytes: int
+    attempt: int = 1
+    error: str | None = None
+    started: float = 0.0
+
+
+class Histogram:
+    """Count the observations of a duration in fixed buckets"""
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the histogram"""
+
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(
+        self,
+        value: float,
+    ) -> None:
+        """Add an observation to the histogram"""
+
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(
+        self,
+        percent: float,
+    ) -> float:
+        """Return the upper bound of the bucket holding the percentile.  The
+        largest observation is used for the overflow bucket.
+        """
+
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[index], self.max) if index < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(
+        self,
+    ) -> dict[str, float]:
+        """Return the headline figures of the histogram"""
+
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+        }
+
+
+class RequestMetrics:
+    """Collect the timings of the requests issued by an HTTP client.  The
+    latest ``capacity`` timings are kept in a ring buffer and every timing is
+    aggregated into per URL pattern histograms.  Timings are also appended
+    to the JSON Lines ``sink`` file when one is given.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        sink: Path | None = None,
+    ) -> None:
+        """Initialize the request metrics"""
+
+        self._lock = threading.Lock()
+        self._recent: deque[RequestTiming] = deque(maxlen=capacity)
+        self._histograms: dict[str, dict[str, Histogram]] = {}
+        self._totals: dict[str, dict[str, int]] = {}
+        self._sink = sink
+
+    def record(
+        self,
+        timing: RequestTiming,
+    ) -> None:
+        """Record the timing of a request attempt"""
+
+        with self._lock:
+            self._recent.append(timing)
+            histograms = self._histograms.setdefault(
+                timing.pattern, {phase: Histogram() for phase in PHASES}
+            )
+            for phase in PHASES:
+                histograms[phase].observe(getattr(timing, phase))
+            totals = self._totals.setdefault(timing.pattern, {"bytes": 0, "errors": 0})
+            totals["bytes"] += timing.bytes
+            totals["errors"] += timing.error is not None or (timing.status or 0) >= 500
+
+            if self._sink is not None:
+                try:
+                    self._sink.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self._sink, mode="a", encoding="utf-8") as file:
+                        file.write(json.dumps(asdict(timing)) + "\n")
+                except OSError as excp:
+                    log.warning("Unable to write request timing to %s: %s", self._sink, excp)
+
+    def recent(
+        self,
+        count: int | None = None,
+    ) -> list[RequestTiming]:
+        """Return the latest timings, oldest first"""
+
+        with self._lock:
+            timings = list(self._recent)
+        return timings if count is None else timings[-count:]
+
+    def summary(
+        self,
+    ) -> dict[str, dict]:
+        """Return the aggregated timings of every URL pattern"""
+
+        with self._lock:
+            return {
+                pattern: self._totals[pattern]
+                | {phase: histogram.summary() for phase, histogram in histograms.items()}
+                for pattern, histograms in sorted(self._histograms.items())
+            }
+
+    def clear(
+        self,
+    ) -> None:
+        """Discard every timing collected so far"""
+
+        with self._lock:
+            self._recent.clear()
+            self._histograms.clear()
+            self._totals.clear()
+
+
+class _ConnectTimer(threading.local):
+    """Accumulate the time the current thread spends opening connections"""
+
+    elapsed = 0.0
+
+
+connect_timer = _ConnectTimer()
+
+
+class _TimedConnectMixin:
+    """Add the time spent opening the connection to the connect timer"""
+
+    def connect(
+        self,
+    ) -> None:
+        """Open the connection, timing how long it takes"""
+
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            connect_timer.elapsed += time.perf_counter() - start
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    """HTTP connection whose connect time is measured"""
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    """HTTPS connection whose connect time is measured"""
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool opening timed connections"""
+
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS connection pool opening timed connections"""
+
+    ConnectionCls = TimedHTTPSConnection
+
+
+def time_connections(
+    pool_manager: urllib3.PoolManager,
+) -> urllib3.PoolManager:
+    """Make the pool manager open connections whose connect time is measured"""
+
+    pool_manager.pool_classes_by_scheme = {
+        "http": TimedHTTPConnectionPool,
+        "https": TimedHTTPSConnectionPool,
+    }
+    return pool_manager
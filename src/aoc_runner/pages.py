@@ -0,0 +1,248 @@
+"""Provide lightweight extractors of the data held in known Advent of Code
+pages.  Rather than building a whole document tree, the pages are streamed
+through the standard library HTML parser which stops as soon as the data
+sought has been seen.  The same data can still be read from a Beautiful
+Soup tree, which the parser.extractors setting selects when turned off.
+"""
+
+# System libraries
+from dataclasses import dataclass
+from html.parser import HTMLParser
+import logging
+
+# Advent of Code Runner libraries
+from .config import get_config
+from .exceptions import AocValueError
+from .utils import get_soup
+
+log = logging.getLogger(__name__)
+
+_LINK_PREFIXES = {
+    "https://twitter.com/": "twitter/",
+    "https://github.com/": "github/",
+    "https://www.reddit.com/u/": "reddit/",
+}
+
+
+def _link_owner(
+    text: str,
+) -> tuple[str, str]:
+    """Return the login source and user name of a "Link to" span"""
+
+    login_source = text[8:]
+    for prefix, source in _LINK_PREFIXES.items():
+        login_source = login_source.replace(prefix, source)
+    login_source, sep, user_name = login_source.partition("/")
+    if not sep:
+        log.warning("problem in parsing %s", text)
+        return "unknown", "unknown"
+    log.debug("found %r", text)
+    return login_source, user_name
+
+
+class _StopParsing(Exception):
+    """Signal that the data sought has been found"""
+
+
+@dataclass(frozen=True)
+class SettingsInfo:
+    """Define the user details shown on the settings page"""
+
+    aoc_id: int
+    login_source: str
+    user_name: str
+
+
+class _Span:
+    """Define the text and first image of a span element"""
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the span"""
+
+        self.text: list[str] = []
+        self.img_src: str | None = None
+        self.complete = False
+
+
+class SettingsParser(HTMLParser):
+    """Extract the user details from the settings page.  The spans are
+    examined in document order as they complete, the same way as walking
+    every span of the parsed tree, and parsing stops at the ownership
+    proof code once the login source is known.
+    """
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the settings parser"""
+
+        super().__init__(convert_charrefs=True)
+        self.code: str | None = None
+        self.login_source = "unknown"
+        self.user_name = "unknown"
+        self._spans: list[_Span] = []
+        self._open_spans: list[_Span] = []
+        self._next_span = 0
+        self._code_text: list[str] | None = None
+        self._linked = False
+        self._found = False
+
+    def handle_starttag(
+        self,
+        tag: str,
+        attrs: list[tuple[str, str | None]],
+    ) -> None:
+        """Track the spans, their first image and the first code element"""
+
+        if tag == "span":
+            span = _Span()
+            self._spans.append(span)
+            self._open_spans.append(span)
+        elif tag == "img":
+            src = dict(attrs).get("src") or ""
+            for span in self._open_spans:
+                if span.img_src is None:
+                    span.img_src = src
+        elif tag == "code" and self.code is None and self._code_text is None:
+            self._code_text = []
+
+    def handle_endtag(
+        self,
+        tag: str,
+    ) -> None:
+        """Examine the completed spans and the completed code element"""
+
+        if tag == "span" and self._open_spans:
+            self._open_spans.pop().complete = True
+            self._examine_spans()
+        elif tag == "code" and self._code_text is not None:
+            self.code = "".join(self._code_text)
+            self._code_text = None
+        if self.code is not None and (self._linked or self._found):
+            raise _StopParsing
+
+    def handle_data(
+        self,
+        data: str,
+    ) -> None:
+        """Add the text to the open spans and code element"""
+
+        for span in self._open_spans:
+            span.text.append(data)
+        if self._code_text is not None:
+            self._code_text.append(data)
+
+    def _examine_spans(
+        self,
+    ) -> None:
+        """Look for the login source in the spans completed so far"""
+
+        while not self._found and self._next_span < len(self._spans):
+            span = self._spans[self._next_span]
+            if not span.complete:
+                return
+            self._next_span += 1
+            self._examine(span)
+
+    def _examine(
+        self,
+        span: _Span,
+    ) -> None:
+        """Look for the login source in a span"""
+
+        text = "".join(span.text)
+        if text.startswith("Link to "):
+            self.login_source, self.user_name = _link_owner(text)
+            self._linked = True
+        elif span.img_src is not None and "googleusercontent.com" in span.img_src:
+            log.debug("found google user content img, getting google username")
+            self.login_source, self.user_name = "google", text
+            self._found = True
+
+    def close(
+        self,
+    ) -> None:
+        """Finish the parse, examining any span left open"""
+
+        super().close()
+        for span in self._open_spans:
+            span.complete = True
+        self._examine_spans()
+
+
+def _settings_info(
+    code: str | None,
+    login_source: str,
+    user_name: str,
+) -> SettingsInfo:
+    """Return the user details with the user ID taken from the ownership
+    proof code
+    """
+
+    if code is None:
+        log.error("No ownership proof code found in the settings page")
+        raise AocValueError("No ownership proof code found in the settings page")
+    try:
+        aoc_id = int(code.split("-")[1])
+    except (IndexError, ValueError) as excp:
+        log.error("Unexpected ownership proof code %s", code)
+        raise AocValueError(f"Unexpected ownership proof code {code}") from excp
+
+    return SettingsInfo(aoc_id=aoc_id, login_source=login_source, user_name=user_name)
+
+
+def extract_settings(
+    html: bytes | str,
+) -> SettingsInfo:
+    """Return the user details shown on the settings page using the
+    streaming extractor
+    """
+
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+
+    parser = SettingsParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _StopParsing:
+        pass
+
+    return _settings_info(parser.code, parser.login_source, parser.user_name)
+
+
+def soup_settings(
+    html: bytes | str,
+    parser: str | None = None,
+) -> SettingsInfo:
+    """Return the user details shown on the settings page by walking every
+    span of the parsed tree
+    """
+
+    soup = get_soup(html, parser=parser)
+    login_source = user_name = "unknown"
+    for span in soup.find_all("span"):
+        if span.text.startswith("Link to "):
+            login_source, user_name = _link_owner(span.text)
+        elif span.img is not None:
+            if "googleusercontent.com" in span.img.attrs.get("src", ""):
+                log.debug("found google user content img, getting google username")
+                login_source, user_name = "google", span.text
+                break
+
+    code = soup.code.text if soup.code is not None else None
+    return _settings_info(code, login_source, user_name)
+
+
+def parse_settings(
+    html: bytes | str,
+) -> SettingsInfo:
+    """Return the user details shown on the settings page, using the
+    streaming extractor unless the parser.extractors setting is off
+    """
+
+    if get_config().parser.extractors:
+        return extract_settings(html)
+    return soup_settings(html)
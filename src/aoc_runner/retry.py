@@ -0,0 +1,172 @@
+"""Provide the retry policy and circuit breaker used by the HTTP client
+to ride out transient failures of the Advent of Code servers.
+"""
+
+# System libraries
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import threading
+import time
+
+# Third-party libraries
+import urllib3
+
+# Advent of Code Runner libraries
+from .exceptions import CircuitOpenError
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class RetryPolicy:
+    """Define when and how long to wait before a failed request is retried.
+    Only idempotent methods are retried.  The delay doubles with every
+    attempt and is reduced by a random jitter of up to ``jitter`` of its
+    value, unless the server supplied a Retry-After header.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 60.0
+    jitter: float = 0.5
+    retry_methods: frozenset[str] = frozenset({"GET", "HEAD"})
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    respect_retry_after: bool = True
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
+
+    def is_failure(
+        self,
+        resp: urllib3.BaseHTTPResponse,
+    ) -> bool:
+        """Return whether the response indicates the request failed"""
+
+        return resp.status in self.retry_statuses
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+    ) -> bool:
+        """Return whether a failed attempt of the request may be retried"""
+
+        return method in self.retry_methods and attempt < self.max_attempts
+
+    def delay(
+        self,
+        attempt: int,
+        resp: urllib3.BaseHTTPResponse | None = None,
+    ) -> float:
+        """Return the number of seconds to wait before the next attempt"""
+
+        if self.respect_retry_after and resp is not None:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay * (1 - self.jitter * self.rng.random())
+
+
+def parse_retry_after(
+    value: str | None,
+) -> float | None:
+    """Return the number of seconds requested by a Retry-After header"""
+
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        log.warning("Ignoring unparsable Retry-After header %r", value)
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Stop sending requests after repeated consecutive failures.  Once
+    ``failure_threshold`` requests in a row fail the circuit opens and
+    requests fail fast until ``reset_timeout`` seconds have elapsed.  A
+    single trial request is then let through; the circuit closes if it
+    succeeds and opens again if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the circuit breaker"""
+
+        self._lock = threading.Lock()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened = 0.0
+        self._state = self.CLOSED
+
+    def before_request(
+        self,
+    ) -> None:
+        """Raise CircuitOpenError if requests should not be sent"""
+
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self._reset_timeout - (self._clock() - self._opened)
+            if self._state == self.OPEN and remaining <= 0:
+                log.info("Circuit half-open, sending a trial request")
+                self._state = self.HALF_OPEN
+                return
+
+        raise CircuitOpenError(
+            f"Advent of Code requests suspended for {max(remaining, 0.0):.1f}s "
+            f"after {self._failures} consecutive failures"
+        )
+
+    def record_success(
+        self,
+    ) -> None:
+        """Record a successful request, closing the circuit"""
+
+        with self._lock:
+            if self._state != self.CLOSED:
+                log.info("Circuit closed")
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(
+        self,
+    ) -> None:
+        """Record a failed request, opening the circuit if required"""
+
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != self.OPEN:
+                    log.warning("Circuit opened after %d consecutive failures", self._failures)
+                self._state = self.OPEN
+                self._opened = self._clock()
+
+    @property
+    def state(
+        self,
+    ) -> str:
+        """Return the current state of the circuit"""
+
+        return self._state
@@ -0,0 +1,112 @@
+"""Provide the coalescing of identical requests made at the same time, so
+that concurrent callers asking for the same page share a single request
+to the Advent of Code servers.
+"""
+
+# System libraries
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+import logging
+import threading
+from typing import Any
+
+
+log = logging.getLogger(__name__)
+
+
+class _Call:
+    """Define a call in flight and the outcome shared with its followers"""
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the call"""
+
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run a function once for all the callers asking for the same key at
+    the same time.  The first caller, the leader, runs the function while
+    the followers wait for it and receive the same result or exception.
+    Nothing is retained once the leader finishes.
+    """
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the single flight group"""
+
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self.saved = 0
+
+    def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Any],
+    ) -> tuple[Any, bool]:
+        """Return the result of the function and whether it was shared
+        with another caller
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.saved += 1
+
+        if not leader:
+            log.debug("Waiting on the call in flight for %s", key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as excp:
+            call.error = excp
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+    ) -> tuple[Any, bool]:
+        """Return the result of the coroutine function and whether it was
+        shared with another task
+        """
+
+        future = self._tasks.get(key)
+        if future is not None:
+            self.saved += 1
+            log.debug("Waiting on the call in flight for %s", key)
+            return await asyncio.shield(future), True
+
+        future = self._tasks[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as excp:
+            future.set_exception(excp)
+            # Only followers retrieve the exception from the future
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._tasks[key]
@@ -0,0 +1,363 @@
+"""Provide record and replay transports for the HTTP clients.  The
+recording transport saves every request and response exchanged with the
+Advent of Code servers to a cassette, and the replay transport serves
+them back without any network access.
+
+Cassettes are JSON Lines files.  The first line is a header carrying the
+format version and every following line is one interaction.  Session
+tokens are never written to a cassette, only a short hash of them.
+"""
+
+# System libraries
+import base64
+from dataclasses import dataclass, field
+from hashlib import sha256
+from io import BytesIO
+import json
+import logging
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Third-party libraries
+import urllib3
+
+# Advent of Code Runner libraries
+from .exceptions import AocValueError, CassetteMiss
+
+
+log = logging.getLogger(__name__)
+CASSETTE_FORMAT = "aoc_runner.cassette"
+CASSETTE_VERSION = 1
+ANY_TOKEN = "*"
+_HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding"}
+
+
+def token_hash(
+    token: str | None,
+) -> str | None:
+    """Return the short hash used to identify a session token"""
+
+    if token is None:
+        return None
+    return sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def _session_token(
+    headers: dict | None,
+) -> str | None:
+    """Extract the session token from the request headers"""
+
+    cookie = (headers or {}).get("Cookie", "")
+    for part in cookie.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name == "session":
+            return value
+    return None
+
+
+def _fields_hash(
+    fields: dict | None,
+) -> str | None:
+    """Return a hash identifying the fields of a POST request"""
+
+    if not fields:
+        return None
+    return sha256(urlencode(sorted(fields.items())).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Interaction:
+    """Define a recorded request and the response it received"""
+
+    method: str
+    url: str
+    token: str | None
+    status: int
+    headers: dict[str, str] = field(hash=False)
+    body: bytes = b""
+    fields: str | None = None
+
+    @property
+    def key(
+        self,
+    ) -> tuple[str, str, str | None, str | None]:
+        """Return the key used to match requests with the interaction"""
+
+        return self.method, self.url, self.token, self.fields
+
+    def to_json(
+        self,
+    ) -> str:
+        """Serialize the interaction as a single line of JSON"""
+
+        record = {
+            "method": self.method,
+            "url": self.url,
+            "token": self.token,
+            "fields": self.fields,
+            "status": self.status,
+            "headers": self.headers,
+        }
+        try:
+            record["body"] = self.body.decode("utf-8")
+        except UnicodeDecodeError:
+            record["body_b64"] = base64.b64encode(self.body).decode("ascii")
+        return json.dumps(record, separators=(",", ":"))
+
+    @classmethod
+    def from_json(
+        cls,
+        line: str,
+    ) -> "Interaction":
+        """Rebuild an interaction from a line of JSON"""
+
+        record = json.loads(line)
+        if "body_b64" in record:
+            body = base64.b64decode(record["body_b64"])
+        else:
+            body = record.get("body", "").encode("utf-8")
+        return cls(
+            method=record["method"],
+            url=record["url"],
+            token=record.get("token"),
+            fields=record.get("fields"),
+            status=record["status"],
+            headers=record.get("headers", {}),
+            body=body,
+        )
+
+    def response(
+        self,
+        preload_content: bool = True,
+    ) -> urllib3.HTTPResponse:
+        """Build the urllib3 response for the interaction"""
+
+        return urllib3.HTTPResponse(
+            body=BytesIO(self.body),
+            headers=self.headers,
+            status=self.status,
+            preload_content=preload_content,
+            request_method=self.method,
+            request_url=self.url,
+        )
+
+
+class Cassette:
+    """Manage a set of recorded interactions.  When an interaction is
+    recorded more than once the latest recording is used.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+    ) -> None:
+        """Initialize the cassette, loading the file if it exists"""
+
+        self._path = path
+        self._interactions: dict[tuple, Interaction] = {}
+        if path is not None and path.exists():
+            self._load()
+
+    def _load(
+        self,
+    ) -> None:
+        """Load the interactions from the cassette file"""
+
+        with open(self._path, mode="r", encoding="utf-8") as file:
+            header = json.loads(file.readline() or "{}")
+            if header.get("format") != CASSETTE_FORMAT:
+                raise AocValueError(f"{self._path} is not a cassette")
+            if header.get("version") != CASSETTE_VERSION:
+                raise AocValueError(
+                    f"Cassette version {header.get('version')} of {self._path}"
+                    " is not supported"
+                )
+            for line in file:
+                if line.strip():
+                    self.add(Interaction.from_json(line), save=False)
+        log.debug("Loaded %d interactions from %s", len(self), self._path)
+
+    def __len__(
+        self,
+    ) -> int:
+        """Return the number of interactions in the cassette"""
+
+        return len(self._interactions)
+
+    def __iter__(
+        self,
+    ):
+        """Iterate over the interactions in the cassette"""
+
+        return iter(self._interactions.values())
+
+    def add(
+        self,
+        interaction: Interaction,
+        save: bool = True,
+    ) -> None:
+        """Add an interaction, appending it to the cassette file"""
+
+        self._interactions[interaction.key] = interaction
+        if save and self._path is not None:
+            new_file = not self._path.exists()
+            if new_file:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._path, mode="a", encoding="utf-8") as file:
+                if new_file:
+                    header = {"format": CASSETTE_FORMAT, "version": CASSETTE_VERSION}
+                    file.write(json.dumps(header) + "\n")
+                file.write(interaction.to_json() + "\n")
+
+    def find(
+        self,
+        method: str,
+        url: str,
+        token: str | None = None,
+        fields: dict | None = None,
+    ) -> Interaction | None:
+        """Return the interaction recorded for the request.  An interaction
+        recorded for any token is used when there is no exact match.
+        """
+
+        fields_hash = _fields_hash(fields)
+        interaction = self._interactions.get((method, url, token_hash(token), fields_hash))
+        if interaction is None and token is not None:
+            interaction = self._interactions.get((method, url, ANY_TOKEN, fields_hash))
+        return interaction
+
+    @property
+    def path(
+        self,
+    ) -> Path | None:
+        """Return the path of the cassette file"""
+
+        return self._path
+
+
+class RecordingTransport:
+    """Pass every request through to a pool manager and record the
+    interaction in a cassette
+    """
+
+    def __init__(
+        self,
+        pool_manager: urllib3.PoolManager,
+        cassette: Cassette,
+    ) -> None:
+        """Initialize the recording transport"""
+
+        self._pool_manager = pool_manager
+        self.cassette = cassette
+        self.headers = pool_manager.headers
+
+    def _record(
+        self,
+        method: str,
+        url: str,
+        headers: dict | None,
+        fields: dict | None,
+        resp: urllib3.BaseHTTPResponse,
+    ) -> Interaction:
+        """Add the interaction to the cassette"""
+
+        interaction = Interaction(
+            method=method,
+            url=url,
+            token=token_hash(_session_token(headers)),
+            fields=_fields_hash(fields),
+            status=resp.status,
+            headers={
+                key: value
+                for key, value in resp.headers.items()
+                if key.lower() not in _HOP_BY_HOP
+            },
+            body=resp.data or b"",
+        )
+        self.cassette.add(interaction)
+        log.debug("Recorded %s %s with status %s", method, url, resp.status)
+        return interaction
+
+    def request(
+        self,
+        method,
+        url,
+        headers=None,
+        **kwargs,
+    ):
+        """Issue the request and record the response.  As recording reads
+        the body, a response which was not preloaded is rebuilt from the
+        recording so that the caller can still stream it.
+        """
+
+        resp = self._pool_manager.request(method=method, url=url, headers=headers, **kwargs)
+        interaction = self._record(
+            method=method, url=url, headers=headers, fields=None, resp=resp
+        )
+        if not kwargs.get("preload_content", True):
+            return interaction.response(preload_content=False)
+        return resp
+
+    def request_encode_body(
+        self,
+        method,
+        url,
+        fields=None,
+        headers=None,
+        **kwargs,
+    ):
+        """Issue the request and record the response"""
+
+        resp = self._pool_manager.request_encode_body(
+            method=method, url=url, fields=fields, headers=headers, **kwargs
+        )
+        interaction = self._record(
+            method=method, url=url, headers=headers, fields=fields, resp=resp
+        )
+        if not kwargs.get("preload_content", True):
+            return interaction.response(preload_content=False)
+        return resp
+
+
+class ReplayTransport:
+    """Serve the responses recorded in a cassette without accessing the network"""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        headers: dict | None = None,
+    ) -> None:
+        """Initialize the replay transport"""
+
+        self.cassette = cassette
+        self.headers = {} if headers is None else headers
+
+    def request(
+        self,
+        method,
+        url,
+        headers=None,
+        fields=None,
+        **kwargs,
+    ):
+        """Return the recorded response for the request"""
+
+        interaction = self.cassette.find(
+            method=method, url=url, token=_session_token(headers), fields=fields
+        )
+        if interaction is None:
+            log.error("No recorded interaction for %s %s", method, url)
+            raise CassetteMiss(f"No recorded interaction for {method} {url}")
+        return interaction.response(preload_content=kwargs.get("preload_content", True))
+
+    def request_encode_body(
+        self,
+        method,
+        url,
+        fields=None,
+        headers=None,
+        **kwargs,
+    ):
+        """Return the recorded response for the request"""
+
+        return self.request(method=method, url=url, headers=headers, fields=fields, **kwargs)
@@ -1,12 +1,18 @@
 """Advent of Code Runner user model"""
 
 # System libraries
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import datetime
-import json
 import logging
 from os import getenv
 from pathlib import Path
+import sys
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterator
 
 # Third-party libraries
 from pydantic import (
@@ -17,28 +23,62 @@ from pydantic import (
 )
 
 # Advent of Code Runner libraries
-from .config import (
-    AOC_DOMAIN,
-    AOC_RUNNER_AUTH_DIR,
-    AOC_RUNNER_USERS_DIR,
-)
+from .config import get_config
 from .exceptions import (
     AocValueError,
     DeadTokenError,
     NoSuchUser,
-    TokenFileChanged,
+    TokenCheckFailed,
     UnknownLoginSource,
     UserAlreadyExists,
 )
-from .httpclient import http_client
-from .utils import (
-    get_soup,
-)
+from .liveness import LivenessCache
+from .pages import parse_settings
+
+if TYPE_CHECKING:
+    from .userstore import UserStore
 
 log = logging.getLogger(__name__)
 LOGIN_SOURCES = ["github", "google", "twitter", "reddit"]
 
 
+def __getattr__(
+    name: str,
+):
+    """Import the shared HTTP client on first use"""
+
+    if name != "http_client":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from .httpclient import http_client
+
+    globals()["http_client"] = http_client
+    return http_client
+
+
+def _http_client():
+    """Return the HTTP client used to reach the Advent of Code servers"""
+
+    return getattr(sys.modules[__name__], "http_client")
+
+
+_liveness: LivenessCache | None = None
+
+
+def _liveness_cache() -> LivenessCache:
+    """Return the cache of the token checks kept in the auth directory"""
+
+    global _liveness
+
+    path = get_config().auth_dir / "liveness.json"
+    if _liveness is None or _liveness.path != path:
+        config = get_config().cache
+        _liveness = LivenessCache(
+            path=path, ttl=config.liveness_ttl, dead_ttl=config.dead_token_ttl
+        )
+    return _liveness
+
+
 # @dataclass
 class UserInfo(
     BaseModel,
@@ -82,6 +122,17 @@ class UserInfo(
         return f"{self.login_source}.{self.aoc_id}"
 
 
+class TokensFile(
+    BaseModel,
+):
+    """Define the contents of the tokens.json file.  The whole file is
+    validated from, and serialized to, JSON in a single pass.
+    """
+
+    default_user: str | None = None
+    users: list[UserInfo] = []
+
+
 class User:
     """This is the main user object used to manage the connection to
     the Advent of Code server.
@@ -108,9 +159,12 @@ class User:
     def from_token(
         cls,
         token: str,
+        refresh: bool = False,
     ) -> "User":
         """Find the owner of the specified token. Raises DeadTokenError if the token is
-        expired or invalid. Returns a User object
+        expired or invalid. Returns a User object.  A recent check of the token
+        is reused unless refresh is requested.  Raises TokenCheckFailed if the
+        server gives no answer on the token, which is then not remembered.
         """
 
         # Set the user's token
@@ -118,42 +172,50 @@ class User:
             log.error("token parameter must be of str type not %s", type(token))
             raise AocValueError(f"token parameter must be of str type not {type(token)}")
 
-        url = f"{AOC_DOMAIN}/settings"
-        response = http_client.get(url, token=token, redirect=False)
-        if response.status != 200:
+        cache = _liveness_cache()
+        liveness = None if refresh else cache.lookup(token)
+        if liveness is not None:
+            if not liveness.alive:
+                log.info("Session %s was found dead recently", token)
+                raise DeadTokenError(f"The auth token ...{token[-4:]} is dead")
+            log.debug("Session %s was found live recently for %s", token, liveness.user_id)
+            return cls(
+                user_info=UserInfo(
+                    user_name=liveness.user_name,
+                    aoc_id=liveness.aoc_id,
+                    login_source=liveness.login_source,
+                    last_updated=datetime.fromtimestamp(liveness.verified),
+                    token=token,
+                )
+            )
+
+        url = f"{get_config().http.domain}/settings"
+        response = _http_client().get(url, token=token, redirect=False)
+        if response.status == 302:
             # bad tokens will 302 redirect to main page
             log.info("Session %s is dead - status_code=%s", token, response.status)
+            cache.store_dead(token)
             raise DeadTokenError(f"The auth token ...{token[-4:]} is dead")
+        if response.status != 200:
+            log.error("Unable to check session %s - status_code=%s", token, response.status)
+            raise TokenCheckFailed(
+                f"Unable to check the auth token ...{token[-4:]} - status {response.status}"
+            )
 
-        soup = get_soup(response.data)
-        login_source = "unknown"
-        user_name = "unknown"
-        userid = soup.code.text.split("-")[1]
-        for span in soup.find_all("span"):
-            if span.text.startswith("Link to "):
-                login_source = span.text[8:]
-                login_source = login_source.replace("https://twitter.com/", "twitter/")
-                login_source = login_source.replace("https://github.com/", "github/")
-                login_source = login_source.replace("https://www.reddit.com/u/", "reddit/")
-                login_source, sep, user_name = login_source.partition("/")
-                if not sep:
-                    log.warning("problem in parsing %s", span.text)
-                    login_source = user_name = "unknown"
-                log.debug("found %r", span.text)
-            elif span.img is not None:
-                if "googleusercontent.com" in span.img.attrs.get("src", ""):
-                    log.debug("found google user content img, getting google username")
-                    login_source = "google"
-                    user_name = span.text
-                    break
-
+        settings = parse_settings(response.data)
         user_info = UserInfo(
-            user_name=user_name,
-            aoc_id=int(userid),
-            login_source=login_source,
+            user_name=settings.user_name,
+            aoc_id=settings.aoc_id,
+            login_source=settings.login_source,
             last_updated=datetime.now(),
             token=token,
         )
+        cache.store_live(
+            token,
+            user_name=settings.user_name,
+            aoc_id=settings.aoc_id,
+            login_source=settings.login_source,
+        )
 
         user = User(user_info=user_info)
         log.debug(
@@ -207,9 +269,15 @@ class User:
     def memo(
         self,
     ) -> Path:
-        """Return the user's indiviaual cache directory"""
+        """Return the user's indiviaual cache directory, creating it if
+        required
+        """
 
-        return AOC_RUNNER_USERS_DIR / self.user_id
+        config = get_config()
+        config.ensure_dirs()
+        memo = config.users_dir / self.user_id
+        memo.mkdir(parents=True, exist_ok=True)
+        return memo
 
     @property
     def token(
@@ -259,35 +327,71 @@ class User:
         return user_info
 
 
+@dataclass(frozen=True)
+class TokenResult:
+    """Define the outcome of adding a token to the user list"""
+
+    ADDED = "added"
+    DUPLICATE = "duplicate"
+    DEAD = "dead"
+    CONFLICT = "conflict"
+    ERROR = "error"
+
+    token: str
+    status: str
+    user_id: str | None = None
+
+
 class UserList:
     """Managed the list of Advent of Code users known"""
 
     def __init__(
         self,
+        fsync: bool = True,
+        store: "UserStore | None" = None,
     ) -> None:
-        """Initialize the class from the source file"""
+        """Initialize the class from the store, by default the one selected
+        by the store.backend setting.  Unless fsync is disabled every save
+        is flushed to disk before it returns.
+        """
+
+        from .userstore import make_user_store
 
+        config = get_config()
+        config.ensure_dirs()
+        if store is None:
+            store = make_user_store(auth_dir=config.auth_dir, fsync=fsync)
+        self._store = store
         self._users: dict[str, User] = {}
+        self._users_view = MappingProxyType(self._users)
+        self._token_index: dict[str, str] = {}
         self._default_user: str | None = None
-        self._last_modified: float = 0
+        # The users changed since the store was read, in the order changed
+        self._changed_users: dict[str, None] = {}
+        self._synced_default: str | None = None
+        self._dirty = False
+        self._batch_depth = 0
 
         # Load the currently save state
         self._load()
         # Look for a defined default token
-        self._get_default_token()
-        # Save the current state
-        self._save()
-        # Remove the default default token file
-        if self.default_token_file.exists():
+        settled = self._get_default_token()
+        # Save the current state if it changed or was never saved
+        if self._dirty or not self._store.exists():
+            self._save()
+        # Remove the default default token file once its token was checked
+        if settled and self.default_token_file.exists():
             self.default_token_file.unlink()
             log.debug("Removed default token file %s", self.default_token_file)
         log.debug("Class UserList successfully initialized")
 
     def _get_default_token(
         self,
-    ) -> None:
+    ) -> bool:
         """Discover user's token from the environment or file. This default user is
-        used whenever a token or user id was otherwise unspecified.
+        used whenever a token or user id was otherwise unspecified.  Returns
+        False when the server could not check a new token, which is then
+        left to be checked by the next user list.
         """
 
         # Import your session id from environment variable AOC_RUNNER_SESSION
@@ -297,7 +401,7 @@ class UserList:
 
         # Or save it in a plaintext file at AOC_RUNNER_AUTH_DIR/token
         elif self.default_token_file.exists():
-            token = (AOC_RUNNER_AUTH_DIR / "token").read_text(encoding="utf-8").split()[0]
+            token = self.default_token_file.read_text(encoding="utf-8").split()[0]
             log.debug("Token loaded from default token file")
 
         # If a default token was found, make sure it is in the list of
@@ -306,21 +410,27 @@ class UserList:
             log.debug("Default token %s found", token)
             user_id = self._get_token_owner(token=token)
             if user_id is None:
-                user = User.from_token(token=token)
+                try:
+                    user = User.from_token(token=token)
+                except TokenCheckFailed as excp:
+                    log.error("Default token %s was not checked: %s", token, excp)
+                    return False
                 user_id = f"{user.login_source}.{user.aoc_id}"
                 if user_id not in self._users:
                     log.debug("Adding new user %s to %s", user_id, self.tokens_file)
-                    self._users[user_id] = user
+                    self._set_user(user_id=user_id, user=user)
                 else:
                     log.debug("Updated token for existing user %s to %s", user_id, token)
-                    self._users[user_id].token = token
+                    self._set_token(user_id=user_id, token=token)
+                self._dirty = True
 
+            if self._default_user != user_id:
                 self._default_user = user_id
-            else:
-                self._default_user = user_id
+                self._dirty = True
             log.debug("Default user set to %s", user_id)
         else:
             log.info("No default token file found")
+        return True
 
     def _get_token_owner(
         self,
@@ -328,60 +438,167 @@ class UserList:
     ) -> str | None:
         """Get the user ID associated with the supplied token"""
 
-        for user_id, user_info in self._users.items():
-            if user_info.token == token:
-                log.debug("Found token %s owned by %s", token, user_id)
-                return user_id
+        user_id = self._token_index.get(token)
+        if user_id is not None:
+            log.debug("Found token %s owned by %s", token, user_id)
+            return user_id
 
         log.info("No owner found for token %s", token)
         return None
 
-    def _load(
+    def _set_user(
         self,
+        user_id: str,
+        user: User,
     ) -> None:
-        """Load the current known users from the source file"""
+        """Add or replace a managed user, keeping the token index current"""
 
-        if self.tokens_file.exists():
-            load_state = json.loads(self.tokens_file.read_text(encoding="utf-8"))
-            self._last_modified = self.tokens_file.stat().st_mtime
-            self._users = {}
-            self._default_user = load_state["default_user"]
+        if user_id in self._users:
+            self._unindex_token(user_id=user_id)
+        self._users[user_id] = user
+        self._token_index[user.token] = user_id
+        self._changed_users[user_id] = None
 
-            for user_data in load_state["users"]:
-                user = User(user_info=UserInfo.model_validate(user_data))
-                user_id = f"{user.login_source}.{user.aoc_id}"
-                self._users[user_id] = user
-            log.debug("Loaded user list from %s", self.tokens_file)
-        else:
-            log.debug("User list not found at %s", self.tokens_file)
+    def _set_token(
+        self,
+        user_id: str,
+        token: str,
+    ) -> None:
+        """Change the token of a managed user, keeping the token index current"""
+
+        self._unindex_token(user_id=user_id)
+        self._users[user_id].token = token
+        self._token_index[token] = user_id
+        self._changed_users[user_id] = None
+
+    def _del_user(
+        self,
+        user_id: str,
+    ) -> None:
+        """Remove a managed user, keeping the token index current"""
+
+        self._unindex_token(user_id=user_id)
+        del self._users[user_id]
+        self._changed_users[user_id] = None
+
+    def _unindex_token(
+        self,
+        user_id: str,
+    ) -> None:
+        """Remove the user's current token from the token index"""
+
+        token = self._users[user_id].token
+        if self._token_index.get(token) == user_id:
+            del self._token_index[token]
+
+    def _state(
+        self,
+    ) -> tuple[str | None, dict[str, UserInfo]]:
+        """Return the default user and the information of every user"""
+
+        users = {user_id: user._user_info for user_id, user in self._users.items()}
+        return self._default_user, users
+
+    def _adopt(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+    ) -> None:
+        """Replace the users managed with those of the store, keeping the
+        user objects whose information is unchanged
+        """
+
+        current = {user_id: user for user_id, user in self._users.items()}
+        self._users.clear()
+        self._token_index.clear()
+        for user_id, user_info in users.items():
+            user = current.get(user_id)
+            if user is None or user._user_info is not user_info:
+                user = User(user_info=user_info)
+            self._users[user_id] = user
+            self._token_index[user_info.token] = user_id
+        self._default_user = default_user
+
+    def _synced(
+        self,
+    ) -> None:
+        """Record that the user list matches the store"""
+
+        self._changed_users.clear()
+        self._synced_default = self._default_user
+        self._dirty = False
+
+    def _load(
+        self,
+    ) -> None:
+        """Load the current known users from the store"""
+
+        state = self._store.load()
+        if state is not None:
+            self._adopt(*state)
+            self._synced()
 
     def _save(
         self,
     ) -> None:
-        """Save the current state of the User List to the tokens.json file"""
+        """Save the changes made to the User List to the store.  Changes
+        saved by another process since the store was read are kept, the
+        changes made here winning for the users changed by both.
+        """
+
+        default_user, users = self._state()
+        merged = self._store.save(
+            default_user=default_user,
+            users=users,
+            changed=self._changed_users,
+            default_changed=default_user != self._synced_default,
+        )
+        if merged is not None:
+            self._adopt(*merged)
+        self._synced()
+
+    def _changed(
+        self,
+    ) -> None:
+        """Record a change to the user list, saving it unless a batch is open"""
 
-        save_state = {
-            "default_user": self._default_user,
-            "users": [user.user_info.model_dump() for user in self._users.values()],
-        }
+        self._dirty = True
+        if not self._batch_depth:
+            self._save()
 
-        if (
-            self.tokens_file.exists()
-            and self._last_modified != self.tokens_file.stat().st_mtime
-        ):
-            log.error("Tokens file %s was modified since it was last read", self.tokens_file)
-            raise TokenFileChanged
+    @contextmanager
+    def batch(
+        self,
+    ) -> Iterator["UserList"]:
+        """Defer saving the changes made within the block until it exits, so
+        that any number of changes cost a single write.  Batches may be
+        nested, the changes being saved when the outermost batch exits.  If
+        the block raises the changes are discarded, the users being reloaded
+        from the store.
+        """
 
-        self.tokens_file.write_text(json.dumps(save_state, indent=2))
-        self._last_modified = self.tokens_file.stat().st_mtime
-        log.debug("Token file %s was successfully saved", self.tokens_file)
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                log.info("Discarding the changes of the failed batch")
+                self._load()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth and self._dirty:
+            self._save()
 
     def add_token(
         self,
         token: str,
         force: bool = False,
     ) -> None:
-        """Add a token to the list of managed users"""
+        """Add a token to the list of managed users.  Raises DeadTokenError
+        for a dead token and TokenCheckFailed when the server could not
+        check it.
+        """
 
         user = User.from_token(token=token)
         user_id = f"{user.login_source}.{user.aoc_id}"
@@ -402,7 +619,7 @@ class UserList:
                 )
                 raise UserAlreadyExists(f"User {user_id} already exists in tokens.json")
 
-        self._users[user_id] = user
+        self._set_user(user_id=user_id, user=user)
         self._users[user_id].last_updated = datetime.now()
         log.debug(
             "User %s with token %s added to %s",
@@ -415,7 +632,76 @@ class UserList:
             self._default_user = user_id
             log.debug("User %s set as the default user ID", user_id)
 
-        self._save()
+        self._changed()
+
+    def add_tokens(
+        self,
+        tokens: Iterable[str],
+        force: bool = False,
+        max_workers: int | None = None,
+    ) -> list[TokenResult]:
+        """Add several tokens to the list of managed users, returning the
+        outcome of each token in order.  The new tokens are validated
+        concurrently, each request still going through the rate limiter,
+        and the user list is saved once.  A token of a user already known
+        with a different token is a conflict unless forced, and a token which
+        could not be validated is an error, the other tokens still being added.
+        """
+
+        tokens = list(tokens)
+        new_tokens = [
+            token
+            for token in dict.fromkeys(tokens)
+            if self._get_token_owner(token=token) is None
+        ]
+        if max_workers is None:
+            max_workers = get_config().workers.max_workers
+
+        def validate(
+            token: str,
+        ) -> User | Exception | None:
+            """Return the owner of a live token, or the error validating it"""
+
+            try:
+                return User.from_token(token=token)
+            except DeadTokenError:
+                return None
+            except Exception as error:
+                log.error("Unable to validate token %s: %s", token, error)
+                return error
+
+        validated: dict[str, User | Exception | None] = {}
+        if new_tokens:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(new_tokens))) as pool:
+                validated = dict(zip(new_tokens, pool.map(validate, new_tokens)))
+
+        results = []
+        with self.batch():
+            for token in tokens:
+                if token not in validated:
+                    # Known before or repeated in the tokens given
+                    status = TokenResult.DUPLICATE
+                    user_id = self._get_token_owner(token=token)
+                elif (user := validated.pop(token)) is None:
+                    status = TokenResult.DEAD
+                    user_id = None
+                elif isinstance(user, Exception):
+                    status = TokenResult.ERROR
+                    user_id = None
+                elif user.user_id in self._users and not force:
+                    status = TokenResult.CONFLICT
+                    user_id = user.user_id
+                else:
+                    status = TokenResult.ADDED
+                    user_id = user.user_id
+                    self._set_user(user_id=user_id, user=user)
+                    self._users[user_id].last_updated = datetime.now()
+                    if self._default_user is None:
+                        self._default_user = user_id
+                    self._changed()
+                log.debug("Token %s %s for user %s", token, status, user_id)
+                results.append(TokenResult(token=token, status=status, user_id=user_id))
+        return results
 
     def add_user(
         self,
@@ -433,17 +719,26 @@ class UserList:
             log.error("User %s already exists in %s", user_id, self.tokens_file)
             raise UserAlreadyExists(f"User {user_id} already exists in {self.tokens_file}")
 
-        self._users[user_id] = User(user_info=user_info)
+        self._set_user(user_id=user_id, user=User(user_info=user_info))
         log.debug("User %s added to %s", user_id, self.tokens_file)
         if self._default_user is None:
             self._default_user = user_id
             log.debug("User %s set as the default user ID", user_id)
-        self._save()
+        self._changed()
 
     def get_users(
         self,
+    ) -> Mapping[str, User]:
+        """Return a read-only view of the users managed.  The view follows
+        later changes to the user list and its users must not be modified.
+        """
+
+        return self._users_view
+
+    def snapshot(
+        self,
     ) -> dict[str, User]:
-        """Return a dictionary of the users managed"""
+        """Return an independent copy of the users managed"""
 
         return deepcopy(self._users)
 
@@ -461,7 +756,7 @@ class UserList:
             )
             return
 
-        del self._users[user_id]
+        self._del_user(user_id=user_id)
         log.debug("Removed user %s from %s", user_id, self.tokens_file)
 
         # Update the default user if it was deleted
@@ -474,7 +769,7 @@ class UserList:
             else:
                 self._default_user = None
 
-        self._save()
+        self._changed()
 
     def set_default_token(
         self,
@@ -491,7 +786,7 @@ class UserList:
             return
 
         self._default_user = user_id
-        self._save()
+        self._changed()
         log.debug("Set default user to %s for token %s", user_id, token)
 
     def set_default_user(
@@ -508,7 +803,7 @@ class UserList:
             return
 
         self._default_user = user_id
-        self._save()
+        self._changed()
         log.debug("Default user set to %s", user_id)
 
     def update_token(
@@ -525,9 +820,9 @@ class UserList:
         if self._users[user_id].token == token:
             return
 
-        self._users[user_id].token = token
+        self._set_token(user_id=user_id, token=token)
         self._users[user_id].last_updated = datetime.now()
-        self._save()
+        self._changed()
         log.debug("User id %s updated to token %s", user_id, token)
 
     @property
@@ -536,7 +831,7 @@ class UserList:
     ) -> Path:
         """Return the path of the default token file"""
 
-        return AOC_RUNNER_AUTH_DIR / "token"
+        return get_config().auth_dir / "token"
 
     @property
     def default_user(
@@ -546,10 +841,18 @@ class UserList:
 
         return self._default_user
 
+    @property
+    def store(
+        self,
+    ) -> "UserStore":
+        """Return the store the users are kept in"""
+
+        return self._store
+
     @property
     def tokens_file(
         self,
     ) -> Path:
-        """Return the path of the tokens file"""
+        """Return the path of the file the users are kept in"""
 
-        return AOC_RUNNER_AUTH_DIR / "tokens.json"
+        return self._store.path
@@ -0,0 +1,733 @@
+"""Provide the storage backends of the user list.  The JSON store keeps
+every user in the tokens.json document, rewritten as a whole on every save,
+while the SQLite store keeps a row per user so that a save only writes the
+users which changed.  The journal store keeps tokens.json as a snapshot
+and appends each save to a JSON Lines journal of the changes, folding the
+journal into the snapshot once it grows past a size threshold.
+
+A store is handed the users changed since it was last loaded or saved.
+When another process changed the store in the meantime, the changes of
+both are combined, the changes being saved winning for the users both
+changed, and the combined users are returned to the user list.
+"""
+
+# System libraries
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Literal
+
+# Third-party libraries
+from pydantic import (
+    BaseModel,
+    TypeAdapter,
+    ValidationError,
+)
+
+# Advent of Code Runner libraries
+from .config import get_config
+from .exceptions import AocValueError
+from .user import TokensFile, UserInfo
+from .utils import file_lock, write_atomic
+
+log = logging.getLogger(__name__)
+
+State = tuple[str | None, dict[str, UserInfo]]
+
+_USER_INFOS = TypeAdapter(list[UserInfo])
+
+
+def _valid_default(
+    default_user: str | None,
+    users: Mapping[str, UserInfo],
+) -> str | None:
+    """Return the default user, or the first user when it no longer exists"""
+
+    if default_user in users:
+        return default_user
+    return next(iter(users), None)
+
+
+def _combine(
+    theirs_default: str | None,
+    theirs_users: dict[str, UserInfo],
+    default_user: str | None,
+    users: Mapping[str, UserInfo],
+    changed: Iterable[str],
+    default_changed: bool,
+) -> State:
+    """Apply the changes being saved to the users saved by another process"""
+
+    for user_id in changed:
+        if user_id in users:
+            theirs_users[user_id] = users[user_id]
+        else:
+            theirs_users.pop(user_id, None)
+    if default_changed:
+        theirs_default = default_user
+    return _valid_default(theirs_default, theirs_users), theirs_users
+
+
+class UserStore(ABC):
+    """Define the interface of the user list storage backends"""
+
+    path: Path
+
+    @abstractmethod
+    def exists(
+        self,
+    ) -> bool:
+        """Return whether the store was ever saved"""
+
+    @abstractmethod
+    def load(
+        self,
+    ) -> State | None:
+        """Return the default user and the information of every user, or
+        None when the store does not exist
+        """
+
+    @abstractmethod
+    def save(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+        changed: Iterable[str],
+        default_changed: bool,
+    ) -> State | None:
+        """Save the users changed, removing those no longer in users, and
+        the default user when it changed.  The combined users are returned
+        when another process changed the store since it was last read.
+        """
+
+    def close(
+        self,
+    ) -> None:
+        """Release the resources held by the store"""
+
+
+class JsonUserStore(UserStore):
+    """Keep the users in a single JSON document which is replaced
+    atomically, under an exclusive lock, on every save
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync: bool = True,
+    ) -> None:
+        """Initialize the JSON store"""
+
+        self.path = path
+        self._fsync = fsync
+        self._signature: tuple | None = None
+
+    @property
+    def lock_file(
+        self,
+    ) -> Path:
+        """Return the path of the file locked while the document is read
+        or written
+        """
+
+        return self.path.with_name(f"{self.path.name}.lock")
+
+    def _stat(
+        self,
+    ) -> tuple | None:
+        """Return the identity of the current document, which changes
+        whenever the document is replaced
+        """
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read(
+        self,
+    ) -> State:
+        """Read the default user and the information of every user"""
+
+        tokens_file = TokensFile.model_validate_json(self.path.read_bytes())
+        users = {user_info.user_id: user_info for user_info in tokens_file.users}
+        return tokens_file.default_user, users
+
+    def exists(
+        self,
+    ) -> bool:
+        """Return whether the document exists"""
+
+        return self.path.exists()
+
+    def load(
+        self,
+    ) -> State | None:
+        """Return the default user and the information of every user"""
+
+        with file_lock(self.lock_file):
+            self._signature = self._stat()
+            if self._signature is None:
+                log.debug("User list not found at %s", self.path)
+                return None
+            log.debug("Loaded user list from %s", self.path)
+            return self._read()
+
+    def save(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+        changed: Iterable[str],
+        default_changed: bool,
+    ) -> State | None:
+        """Rewrite the document with the users, combined with the changes
+        another process saved since the document was read
+        """
+
+        with file_lock(self.lock_file):
+            current = self._stat()
+            merged = None
+            if current is not None and current != self._signature:
+                merged = default_user, users = _combine(
+                    *self._read(),
+                    default_user=default_user,
+                    users=users,
+                    changed=changed,
+                    default_changed=default_changed,
+                )
+                log.info("Merged the changes made to %s by another process", self.path)
+            self._write(default_user=default_user, users=users)
+        log.debug("Token file %s was successfully saved", self.path)
+        return merged
+
+    def _write(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+    ) -> None:
+        """Replace the document with the users"""
+
+        # The users were validated when added so they are not checked again
+        tokens_file = TokensFile.model_construct(
+            default_user=default_user,
+            users=list(users.values()),
+        )
+        data = tokens_file.model_dump_json(indent=2).encode("utf-8")
+        write_atomic(self.path, data, fsync=self._fsync)
+        self._signature = self._stat()
+
+
+class JournalRecord(
+    BaseModel,
+):
+    """Define a change of the user list appended to the journal"""
+
+    op: Literal["add", "update", "remove", "set_default"]
+    user: UserInfo | None = None
+    user_id: str | None = None
+
+    def apply(
+        self,
+        default_user: str | None,
+        users: dict[str, UserInfo],
+    ) -> str | None:
+        """Apply the change to the users, returning the default user"""
+
+        if self.op == "set_default":
+            return self.user_id
+        if self.op == "remove":
+            users.pop(self.user_id, None)
+        else:
+            users[self.user.user_id] = self.user
+        return default_user
+
+
+class JournalUserStore(JsonUserStore):
+    """Keep the users in the tokens.json snapshot followed by a journal of
+    the changes saved since, so that a save appends a line per change
+    rather than rewriting every user.  Appends are made under the lock of
+    the snapshot and the journal is folded into the snapshot once it grows
+    past max_bytes.  The records are idempotent, so a journal replayed onto
+    a snapshot which already holds its changes yields the same users.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        journal: Path,
+        fsync: bool = True,
+        max_bytes: int = 1024 * 1024,
+    ) -> None:
+        """Initialize the journal store"""
+
+        super().__init__(path=path, fsync=fsync)
+        self.journal = journal
+        self._max_bytes = max_bytes
+        self._journal_id: int | None = None
+        self._offset = 0
+        self._default_user: str | None = None
+        self._known: set[str] = set()
+
+    def _journal_stat(
+        self,
+    ) -> tuple[int | None, int]:
+        """Return the identity and size of the journal, the identity
+        changing whenever the journal is folded into the snapshot
+        """
+
+        try:
+            stat = self.journal.stat()
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def _replay(
+        self,
+        users: dict[str, UserInfo],
+    ) -> None:
+        """Apply the records appended since the journal was last read.  A
+        partly written last line is left for a later read.
+        """
+
+        if self._journal_id is None:
+            return
+        with open(self.journal, mode="rb") as stream:
+            stream.seek(self._offset)
+            data = stream.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = JournalRecord.model_validate_json(line)
+            except ValidationError:
+                log.warning("Skipped a damaged record in %s", self.journal)
+                continue
+            self._default_user = record.apply(default_user=self._default_user, users=users)
+            if record.op == "remove":
+                self._known.discard(record.user_id)
+            elif record.user is not None:
+                self._known.add(record.user.user_id)
+        self._offset += end
+
+    def _read_all(
+        self,
+    ) -> State:
+        """Read the snapshot and replay the whole journal onto it"""
+
+        self._signature = self._stat()
+        default_user, users = (None, {}) if self._signature is None else self._read()
+        self._synced(default_user=default_user, users=users)
+        self._journal_id, _ = self._journal_stat()
+        self._offset = 0
+        self._replay(users=users)
+        return self._default_user, users
+
+    def _synced(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+    ) -> None:
+        """Record the users held by the snapshot and journal together"""
+
+        self._default_user = default_user
+        self._known = set(users)
+
+    def exists(
+        self,
+    ) -> bool:
+        """Return whether the snapshot or the journal exists"""
+
+        return self.path.exists() or self.journal.exists()
+
+    def load(
+        self,
+    ) -> State | None:
+        """Return the default user and the information of every user"""
+
+        with file_lock(self.lock_file):
+            if not self.exists():
+                log.debug("User list not found at %s", self.path)
+                return None
+            log.debug("Loaded user list from %s and %s", self.path, self.journal)
+            return self._read_all()
+
+    def save(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+        changed: Iterable[str],
+        default_changed: bool,
+    ) -> State | None:
+        """Append the changes to the journal, or fold them into a new
+        snapshot when the journal is full, and return the combined users
+        when another process changed the snapshot or the journal
+        """
+
+        changed = list(changed)
+        with file_lock(self.lock_file):
+            journal_id, size = self._journal_stat()
+            merged = None
+            if (
+                self._stat() != self._signature
+                or journal_id != self._journal_id
+                or size > self._offset
+            ):
+                merged = default_user, users = _combine(
+                    *self._read_all(),
+                    default_user=default_user,
+                    users=users,
+                    changed=changed,
+                    default_changed=default_changed,
+                )
+                log.info("Merged the changes made to %s by another process", self.journal)
+
+            records = []
+            for user_id in changed:
+                if user_id in users:
+                    op = "update" if user_id in self._known else "add"
+                    records.append(JournalRecord(op=op, user=users[user_id]))
+                elif user_id in self._known:
+                    records.append(JournalRecord(op="remove", user_id=user_id))
+            if default_user != self._default_user:
+                records.append(JournalRecord(op="set_default", user_id=default_user))
+            data = "".join(
+                f"{record.model_dump_json(exclude_none=True)}\n" for record in records
+            ).encode("utf-8")
+
+            if self._signature is None or size + len(data) > self._max_bytes:
+                self._compact(default_user=default_user, users=users)
+            elif data:
+                # Start on a new line should the last append have been cut short
+                if self._journal_id is not None and size > self._offset:
+                    data = b"\n" + data
+                self._append(data)
+            self._synced(default_user=default_user, users=users)
+        log.debug("Saved %d changes to %s", len(records), self.journal)
+        return merged
+
+    def _append(
+        self,
+        data: bytes,
+    ) -> None:
+        """Append the records to the journal in a single write"""
+
+        with open(self.journal, mode="ab", buffering=0) as stream:
+            stream.write(data)
+            if self._fsync:
+                os.fsync(stream.fileno())
+        self._journal_id, self._offset = self._journal_stat()
+
+    def _compact(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+    ) -> None:
+        """Fold the journal into a new snapshot and start an empty journal"""
+
+        self._write(default_user=default_user, users=users)
+        write_atomic(self.journal, b"", fsync=self._fsync)
+        self._journal_id, self._offset = self._journal_stat()
+        log.debug("Compacted %s into %s", self.journal, self.path)
+
+
+class SqliteUserStore(UserStore):
+    """Keep a row per user in an SQLite database in WAL mode, so that a
+    save only writes the users which changed and readers never block the
+    writer.  The users of an existing tokens.json document are imported
+    the first time the database is used.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            aoc_id INTEGER NOT NULL,
+            login_source TEXT NOT NULL,
+            last_updated TEXT NOT NULL,
+            token TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS settings (
+            name TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    _COLUMNS = ("user_name", "aoc_id", "login_source", "last_updated", "token")
+
+    def __init__(
+        self,
+        path: Path,
+        fsync: bool = True,
+        migrate_from: Path | None = None,
+    ) -> None:
+        """Initialize the SQLite store"""
+
+        self.path = path
+        self._fsync = fsync
+        self._migrate_from = migrate_from
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+
+    @property
+    def connection(
+        self,
+    ) -> sqlite3.Connection:
+        """Return the connection to the database, opening it on first use"""
+
+        return self._connect()
+
+    def _connect(
+        self,
+    ) -> sqlite3.Connection:
+        """Open the connection to the database unless already open, creating
+        the schema and importing the tokens.json users on first use
+        """
+
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={'FULL' if self._fsync else 'NORMAL'}")
+            connection.executescript(self._SCHEMA)
+            self._connection = connection
+            self._migrate()
+        return self._connection
+
+    def close(
+        self,
+    ) -> None:
+        """Close the connection to the database"""
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _setting(
+        self,
+        name: str,
+    ) -> str | None:
+        """Return the value of a setting held in the database"""
+
+        row = self._connection.execute(
+            "SELECT value FROM settings WHERE name = ?", (name,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _set_setting(
+        self,
+        name: str,
+        value: str | None,
+    ) -> None:
+        """Save the value of a setting held in the database"""
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)", (name, value)
+        )
+
+    def _upsert(
+        self,
+        users: Iterable[tuple[str, UserInfo]],
+    ) -> None:
+        """Insert or update the rows of the users"""
+
+        # Updated in place so that the users keep the order they were added in
+        self._connection.executemany(
+            "INSERT INTO users (user_id, user_name, aoc_id, login_source, last_updated,"
+            " token) VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (user_id) DO UPDATE SET"
+            " user_name = excluded.user_name, aoc_id = excluded.aoc_id,"
+            " login_source = excluded.login_source, last_updated = excluded.last_updated,"
+            " token = excluded.token",
+            [
+                (
+                    user_id,
+                    user_info.user_name,
+                    user_info.aoc_id,
+                    user_info.login_source,
+                    user_info.last_updated.isoformat(),
+                    user_info.token,
+                )
+                for user_id, user_info in users
+            ],
+        )
+
+    def _migrate(
+        self,
+    ) -> None:
+        """Import the users of the tokens.json document into a new database.
+        The document is left in place.
+        """
+
+        source = self._migrate_from
+        with self._transaction():
+            if self._setting("created") is not None:
+                return
+            self._set_setting("created", source.name if source is not None else "")
+            if source is None or not source.exists():
+                return
+            default_user, users = JsonUserStore(source).load() or (None, {})
+            self._upsert(users.items())
+            self._set_setting("default_user", default_user)
+        log.info("Imported %d users from %s into %s", len(users), source, self.path)
+
+    def _transaction(
+        self,
+        write: bool = True,
+    ) -> "_Transaction":
+        """Return a transaction of the database, holding its write lock
+        from the start when it is to write
+        """
+
+        return _Transaction(self._connection, mode="IMMEDIATE" if write else "DEFERRED")
+
+    def _read(
+        self,
+    ) -> State:
+        """Read the default user and the information of every user"""
+
+        rows = self._connection.execute(
+            f"SELECT user_id, {', '.join(self._COLUMNS)} FROM users ORDER BY rowid"
+        ).fetchall()
+        user_infos = _USER_INFOS.validate_python(
+            [dict(zip(self._COLUMNS, row[1:])) for row in rows]
+        )
+        users = {row[0]: user_info for row, user_info in zip(rows, user_infos)}
+        return self._setting("default_user"), users
+
+    def _version(
+        self,
+    ) -> int:
+        """Return the version of the database, which changes whenever
+        another connection commits a change
+        """
+
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def exists(
+        self,
+    ) -> bool:
+        """Return whether the database exists"""
+
+        return self.path.exists()
+
+    def load(
+        self,
+    ) -> State:
+        """Return the default user and the information of every user"""
+
+        with self._lock:
+            self._connect()
+            with self._transaction(write=False):
+                self._data_version = self._version()
+                state = self._read()
+        log.debug("Loaded user list from %s", self.path)
+        return state
+
+    def save(
+        self,
+        default_user: str | None,
+        users: Mapping[str, UserInfo],
+        changed: Iterable[str],
+        default_changed: bool,
+    ) -> State | None:
+        """Write the rows of the users changed and return the combined
+        users when another process changed the database
+        """
+
+        with self._lock:
+            self._connect()
+            with self._transaction():
+                changed = list(changed)
+                self._upsert(
+                    (user_id, users[user_id]) for user_id in changed if user_id in users
+                )
+                self._connection.executemany(
+                    "DELETE FROM users WHERE user_id = ?",
+                    [(user_id,) for user_id in changed if user_id not in users],
+                )
+                if default_changed:
+                    self._set_setting("default_user", default_user)
+
+                merged = None
+                if self._version() != self._data_version:
+                    merged = self._read()
+                    log.info("Merged the changes made to %s by another process", self.path)
+                saved_default, saved_users = merged or (self._setting("default_user"), users)
+                valid_default = _valid_default(saved_default, saved_users)
+                if valid_default != saved_default:
+                    self._set_setting("default_user", valid_default)
+                    merged = valid_default, dict(saved_users)
+                self._data_version = self._version()
+        log.debug("Saved %d changed users to %s", len(changed), self.path)
+        return merged
+
+
+class _Transaction:
+    """Hold the write lock of an SQLite database for the duration of a block,
+    committing the changes on success and rolling them back otherwise
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        mode: str = "IMMEDIATE",
+    ) -> None:
+        """Initialize the transaction"""
+
+        self._connection = connection
+        self._mode = mode
+
+    def __enter__(
+        self,
+    ) -> sqlite3.Connection:
+        """Begin the transaction"""
+
+        self._connection.execute(f"BEGIN {self._mode}")
+        return self._connection
+
+    def __exit__(
+        self,
+        exc_type,
+        exc,
+        traceback,
+    ) -> None:
+        """Commit or roll back the transaction"""
+
+        self._connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def make_user_store(
+    auth_dir: Path,
+    backend: str | None = None,
+    fsync: bool = True,
+) -> UserStore:
+    """Create the user list store for the requested backend, which defaults
+    to the store.backend setting
+    """
+
+    backend = get_config().store.backend if backend is None else backend
+    tokens_file = auth_dir / "tokens.json"
+
+    if backend == "json":
+        return JsonUserStore(path=tokens_file, fsync=fsync)
+    if backend == "journal":
+        return JournalUserStore(
+            path=tokens_file,
+            journal=auth_dir / "tokens.journal",
+            fsync=fsync,
+            max_bytes=get_config().store.journal_bytes,
+        )
+    if backend == "sqlite":
+        return SqliteUserStore(
+            path=auth_dir / "tokens.sqlite3", fsync=fsync, migrate_from=tokens_file
+        )
+
+    log.error("Unknown user store backend %s", backend)
+    raise AocValueError(f"Unknown user store backend {backend}")
@@ -1,15 +1,27 @@
 """General utilities used by Advent of Code Runner"""
 
 # System libraries
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from functools import cache
+from hashlib import sha256
+from importlib.util import find_spec
 import logging
+import os
 from pathlib import Path
+import tempfile
+import threading
+from typing import Any, BinaryIO, Iterator
 
-# Third-party libraries
-from bs4 import BeautifulSoup
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
 
 # Advent of Code Runner libraries
-from .exceptions import DirectoryIsFile
+from .exceptions import AocValueError, DirectoryIsFile
 
 log = logging.getLogger(__name__)
 
@@ -23,7 +35,6 @@ def _ensure_path_exists(
     a directory
     """
     log.debug("Setting %s to %s", path_name, path)
-    print(f"Setting {path_name} to {str(path)}")
 
     if path.exists():
         if path.is_file():
@@ -32,6 +43,61 @@ def _ensure_path_exists(
         path.mkdir(parents=True, exist_ok=True)
 
 
+@contextmanager
+def file_lock(
+    path: Path,
+) -> Iterator[BinaryIO]:
+    """Hold an exclusive advisory lock on the specified file, creating it
+    and its directory if required.  The open file is returned so that small
+    state may be kept in the lock file itself.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, mode="a+b") as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield file
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_atomic(
+    path: Path,
+    data: bytes,
+    fsync: bool = False,
+) -> None:
+    """Replace the file contents so readers never see a partial write.  With
+    fsync the data and the rename are flushed to disk before returning.
+    """
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode="wb") as file:
+            file.write(data)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
 class Color:
     """Defines a class to set colors on a terminal window"""
 
@@ -122,13 +188,189 @@ def colored(
     return f"{color_code}{txt}{Color().END}"
 
 
+# Beautiful Soup tree builders and the module each requires, fastest first
+PARSERS: dict[str, str | None] = {
+    "lxml": "lxml",
+    "html.parser": None,
+    "html5lib": "html5lib",
+}
+
+
 @cache
+def available_parsers() -> tuple[str, ...]:
+    """Return the Beautiful Soup tree builders installed, fastest first"""
+
+    return tuple(
+        parser
+        for parser, module in PARSERS.items()
+        if module is None or find_spec(module) is not None
+    )
+
+
+def resolve_parser(
+    parser: str | None = None,
+) -> str:
+    """Return the tree builder to use for the named parser, which defaults
+    to the parser.backend setting.  Auto selects the fastest installed and
+    a parser which is not installed falls back to html.parser.
+    """
+
+    if parser is None:
+        # Imported here as the configuration depends on this module
+        from .config import get_config
+
+        parser = get_config().parser.backend
+
+    if parser == "auto":
+        return available_parsers()[0]
+    if parser not in PARSERS:
+        log.error("Unknown HTML parser %s", parser)
+        raise AocValueError(f"Unknown HTML parser {parser}, expected one of {list(PARSERS)}")
+    if parser not in available_parsers():
+        log.warning("HTML parser %s is not installed, using html.parser", parser)
+        return "html.parser"
+    return parser
+
+
+@dataclass(frozen=True)
+class SoupCacheStats:
+    """Define the usage of the parsed page cache"""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    footprint: int
+
+
+class SoupCache:
+    """Keep the most recently used parsed pages.  Pages are keyed by a hash
+    of their content, so the raw pages are not retained, and the least
+    recently used pages are evicted once either the number of pages or their
+    approximate footprint exceeds its limit.  A parsed tree is estimated at
+    ``OVERHEAD`` times the size of the page.  The limits default to the
+    cache.soup_size and cache.soup_bytes settings.
+    """
+
+    OVERHEAD = 10
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        """Initialize the parsed page cache"""
+
+        self._maxsize = maxsize
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._footprint = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _limits(
+        self,
+    ) -> tuple[int, int]:
+        """Return the maximum number of pages and footprint"""
+
+        if self._maxsize is None or self._max_bytes is None:
+            # Imported here as the configuration depends on this module
+            from .config import get_config
+
+            config = get_config().cache
+            if self._maxsize is None:
+                self._maxsize = config.soup_size
+            if self._max_bytes is None:
+                self._max_bytes = config.soup_bytes
+        return self._maxsize, self._max_bytes
+
+    def get(
+        self,
+        html: str | bytes,
+        parser: str = "html.parser",
+    ) -> Any:
+        """Return the page parsed by the tree builder, parsing it on a miss"""
+
+        if isinstance(html, str):
+            digest = sha256(html.encode("utf-8", errors="surrogatepass")).digest()
+            key = (parser, "str", digest)
+        elif isinstance(html, (bytes, bytearray)):
+            key = (parser, "bytes", sha256(html).digest())
+        else:
+            raise TypeError(f"Expected the page as str or bytes not {type(html)}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # Imported here so that only callers parsing pages pay for the import
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, parser)
+        footprint = len(html) * self.OVERHEAD
+        maxsize, max_bytes = self._limits()
+        if maxsize <= 0 or footprint > max_bytes:
+            return soup
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (soup, footprint)
+                self._footprint += footprint
+            while len(self._entries) > maxsize or self._footprint > max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._footprint -= evicted
+                self._evictions += 1
+        return soup
+
+    def stats(
+        self,
+    ) -> SoupCacheStats:
+        """Return the usage of the cache"""
+
+        with self._lock:
+            return SoupCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                footprint=self._footprint,
+            )
+
+    def clear(
+        self,
+    ) -> None:
+        """Discard every parsed page and reset the usage"""
+
+        with self._lock:
+            self._entries.clear()
+            self._footprint = 0
+            self._hits = self._misses = self._evictions = 0
+
+
+soup_cache = SoupCache()
+
+
 def get_soup(
     html,
+    parser: str | None = None,
 ):
-    """Get am instance of a Beautiful Soup parsed HTML page"""
-    soup = BeautifulSoup(html, "html.parser")
-    return soup
+    """Get am instance of a Beautiful Soup parsed HTML page.  The parsed
+    pages are cached and shared, so they must not be modified.  The tree
+    builder defaults to the parser.backend setting.
+    """
+
+    if not isinstance(html, (str, bytes, bytearray)):
+        raise TypeError(f"Expected the page as str or bytes not {type(html)}")
+    return soup_cache.get(html, parser=resolve_parser(parser))
+
+
+get_soup.cache_clear = soup_cache.clear
 
 
 # if __name__ == "__main__":
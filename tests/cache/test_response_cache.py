@@ -0,0 +1,181 @@
+"""Test the Advent of Code Runner ResponseCache class"""
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.cache import ResponseCache
+from aoc_runner.config import RunnerConfig
+
+
+URL = "https://adventofcode.com/2023/day/1"
+
+
+@pytest.fixture
+def response_cache(
+    runner_cache_dir,
+    runner_users_dir,
+):
+    """Return a response cache using the temporary runner directories"""
+
+    return ResponseCache(cache_dir=runner_cache_dir, users_dir=runner_users_dir)
+
+
+@pytest.mark.parametrize(
+    "url, ttl",
+    [
+        ("https://adventofcode.com/2023/day/1/input", None),
+        ("https://adventofcode.com/2023/day/1", 0),
+        ("https://adventofcode.com/2023/leaderboard/private/view/1.json", 900),
+        ("https://adventofcode.com/2023", 300),
+        ("https://adventofcode.com/settings", 0),
+        ("https://adventofcode.com/about", 0),
+    ],
+)
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_ttl(
+    response_cache,
+    url,
+    ttl,
+):
+    """Test the TTL applied to each kind of page"""
+
+    assert response_cache.ttl(url) == ttl
+
+
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_store_lookup(
+    response_cache,
+    runner_cache_dir,
+):
+    """Test a stored response can be rebuilt from disk"""
+
+    response = urllib3.HTTPResponse(body=b"<html/>", status=200, headers={"ETag": '"v1"'})
+    response_cache.store(url=URL, response=response)
+    entry = response_cache.lookup(url=URL)
+
+    assert entry is not None
+    assert entry.body_path.parent == runner_cache_dir / "http"
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+    assert entry.response().data == b"<html/>"
+    assert entry.response().status == 200
+
+
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_config_dirs(
+    tmp_path,
+    monkeypatch,
+):
+    """Test the directories default to the configuration in effect when the
+    cache is created
+    """
+
+    overrides = {"paths": {"cache_dir": tmp_path / "cache", "users_dir": tmp_path / "users"}}
+    monkeypatch.setattr("aoc_runner.config._config", RunnerConfig(overrides=overrides))
+
+    response = urllib3.HTTPResponse(body=b"<html/>", status=200, headers={"ETag": '"v1"'})
+    response_cache = ResponseCache()
+    response_cache.store(url=URL, response=response)
+    response_cache.store(url=URL, response=response, user_id="github.1")
+
+    assert (tmp_path / "cache" / "http").is_dir()
+    assert (tmp_path / "users" / "github.1" / "http").is_dir()
+
+
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_header_case(
+    response_cache,
+):
+    """Test the headers of a reloaded entry are found regardless of case"""
+
+    response = urllib3.HTTPResponse(
+        body=b"<html/>",
+        status=200,
+        headers={"etag": '"v1"', "last-modified": "Fri, 01 Dec 2023 05:00:00 GMT"},
+    )
+    response_cache.store(url=URL, response=response)
+    entry = response_cache.lookup(url=URL)
+
+    assert entry.etag == '"v1"'
+    assert entry.last_modified == "Fri, 01 Dec 2023 05:00:00 GMT"
+    assert entry.headers["ETAG"] == '"v1"'
+
+    refreshed = urllib3.HTTPResponse(body=b"", status=304, headers={"ETag": '"v2"'})
+    response_cache.refresh(entry=entry, response=refreshed)
+    entry = response_cache.lookup(url=URL)
+    assert entry.conditional_headers()["If-None-Match"] == '"v2"'
+    assert len(entry.headers) == 2
+
+
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_user_scoped(
+    response_cache,
+    runner_users_dir,
+):
+    """Test responses requested with a token are stored with the user"""
+
+    response = urllib3.HTTPResponse(body=b"<html/>", status=200, headers={"ETag": '"v1"'})
+    response_cache.store(url=URL, response=response, token="abc", user_id="github.1")
+
+    assert response_cache.lookup(url=URL) is None
+    assert response_cache.lookup(url=URL, token="abc") is None
+    entry = response_cache.lookup(url=URL, token="abc", user_id="github.1")
+    assert entry.body_path.parent == runner_users_dir / "github.1" / "http"
+
+
+@pytest.mark.parametrize(
+    "status, headers",
+    [
+        (302, {"ETag": '"v1"'}),
+        (200, {}),
+        (200, {"ETag": '"v1"', "Cache-Control": "no-store"}),
+    ],
+)
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_not_cacheable(
+    response_cache,
+    status,
+    headers,
+):
+    """Test responses which cannot be reused are not stored"""
+
+    response = urllib3.HTTPResponse(body=b"", status=status, headers=headers)
+    assert response_cache.store(url=URL, response=response) is None
+    assert response_cache.lookup(url=URL) is None
+
+
+@pytest.mark.cache
+@pytest.mark.unit
+def test_response_cache_freshness(
+    runner_cache_dir,
+    runner_users_dir,
+):
+    """Test entries are fresh until their TTL expires"""
+
+    now = [1000.0]
+    cache = ResponseCache(
+        cache_dir=runner_cache_dir,
+        users_dir=runner_users_dir,
+        ttls=[(r"^/2023$", 60)],
+        clock=lambda: now[0],
+    )
+    url = "https://adventofcode.com/2023"
+    entry = cache.store(url=url, response=urllib3.HTTPResponse(body=b"x", status=200))
+
+    assert cache.is_fresh(entry)
+    now[0] += 61
+    assert not cache.is_fresh(entry)
+
+    cache.refresh(entry, urllib3.HTTPResponse(status=304, headers={"ETag": '"v2"'}))
+    entry = cache.lookup(url=url)
+    assert cache.is_fresh(entry)
+    assert entry.etag == '"v2"'
@@ -1,6 +1,7 @@
 """Test the Advent of Code Runner Config module"""
 
 # System Libraries
+from dataclasses import asdict
 from importlib import reload
 from pathlib import Path
 import sys
@@ -9,7 +10,8 @@ import sys
 import pytest
 
 # Advent of Code Runner libraries
-from aoc_runner.config import AOC_DOMAIN
+from aoc_runner.config import AOC_DOMAIN, HttpConfig, LimiterConfig, RunnerConfig
+from aoc_runner.exceptions import AocValueError, DirectoryIsFile
 from aoc_runner.httpclient import http_client
 from aoc_runner.utils import get_soup
 
@@ -148,3 +150,202 @@ def test_aoc_domain():
 
     assert response.status == 200
     assert soup.title.text.startswith("Advent of Code")
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_config_is_lazy(
+    monkeypatch,
+    tmp_path,
+):
+    """Test the configuration is resolved on use and creates no directories"""
+
+    runner_dir = tmp_path / "aoc_runner"
+    monkeypatch.setenv("AOC_RUNNER_DIR", str(runner_dir))
+    monkeypatch.setenv("AOC_RUNNER_PROJECT_HOME", str(tmp_path))
+    monkeypatch.delenv("AOC_RUNNER_USERS_DIR", raising=False)
+    config = reload(sys.modules["aoc_runner.config"])
+
+    try:
+        assert config._config is None
+        assert config.AOC_RUNNER_USERS_DIR == runner_dir / "users"
+        assert not runner_dir.exists()
+
+        config.get_config().ensure_dirs()
+        assert (runner_dir / "users").is_dir()
+        assert (runner_dir / ".auth").is_dir()
+        assert (runner_dir / "cache").is_dir()
+    finally:
+        monkeypatch.undo()
+        reload(config)
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_runner_config_defaults(
+    tmp_path,
+):
+    """Test a configuration built from a supplied environment"""
+
+    config = RunnerConfig(
+        env={
+            "AOC_RUNNER_DIR": str(tmp_path),
+            "AOC_RUNNER_DOMAIN": "http://127.0.0.1:8000/",
+            "AOC_RUNNER_HTTP_CACHE": "Yes",
+        }
+    )
+
+    assert config.cassette == tmp_path / "cassette.jsonl"
+    assert config.http.domain == "http://127.0.0.1:8000"
+    assert config.http.cache is True
+    assert config.paths.metrics_log is None
+    assert asdict(config.limiter) == asdict(LimiterConfig())
+    assert config.tz.key == "America/New_York"
+
+    with pytest.raises(ImportError):
+        from aoc_runner.config import AOC_RUNNER_NOTHING  # noqa: F401
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_runner_config_layers(
+    tmp_path,
+):
+    """Test the overrides beat the environment which beats the config file"""
+
+    (tmp_path / "config.toml").write_text(
+        """
+        [paths]
+        users_dir = "users-from-file"
+        cache_dir = "/var/cache/aoc"
+
+        [limiter]
+        rate = 2
+        burst = 8
+        cool_off = 1.5
+
+        [http]
+        read_timeout = 5
+
+        [workers]
+        max_workers = 16
+        """
+    )
+    config = RunnerConfig(
+        env={
+            "AOC_RUNNER_DIR": str(tmp_path),
+            "AOC_RUNNER_LIMITER_BURST": "6",
+            "AOC_RUNNER_LIMITER": "shared",
+        },
+        overrides={"limiter": {"cool_off": 0.0}, "workers": {"max_workers": 2}},
+    )
+
+    assert config.users_dir == tmp_path / "users-from-file"
+    assert config.cache_dir == Path("/var/cache/aoc")
+    assert config.auth_dir == tmp_path / ".auth"
+    expected = LimiterConfig(backend="shared", rate=2.0, burst=6, cool_off=0.0)
+    assert asdict(config.limiter) == asdict(expected)
+    assert config.http.read_timeout == 5.0
+    assert config.http.connect_timeout == HttpConfig().connect_timeout
+    assert config.workers.max_workers == 2
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_runner_config_file_read_once(
+    tmp_path,
+):
+    """Test the config file is read once and named by AOC_RUNNER_CONFIG"""
+
+    config_file = tmp_path / "runner.toml"
+    config_file.write_text("[cache]\nsoup_size = 16\n")
+    config = RunnerConfig(env={"AOC_RUNNER_CONFIG": str(config_file)})
+
+    assert config.cache.soup_size == 16
+    config_file.write_text("[cache]\nsoup_size = 32\n")
+    assert config.cache.soup_size == 16
+
+
+@pytest.mark.parametrize(
+    "content, env",
+    [
+        ("[limiter\n", {}),
+        ("[limiter]\nburst = 'many'\n", {}),
+        ("[http]\ncache = 1\n", {}),
+        ("", {"AOC_RUNNER_HTTP_CACHE": "maybe"}),
+        ("", {"AOC_RUNNER_WORKERS_MAX_WORKERS": "1.5"}),
+    ],
+)
+@pytest.mark.config
+@pytest.mark.unit
+def test_runner_config_invalid(
+    tmp_path,
+    content,
+    env,
+):
+    """Test invalid settings are rejected"""
+
+    (tmp_path / "config.toml").write_text(content)
+    config = RunnerConfig(env={"AOC_RUNNER_DIR": str(tmp_path)} | env)
+
+    with pytest.raises(AocValueError):
+        config.limiter, config.http, config.workers
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_runner_config_unknown_settings(
+    tmp_path,
+    caplog,
+):
+    """Test unknown sections and settings are ignored with a warning"""
+
+    (tmp_path / "config.toml").write_text("[colours]\nred = 1\n[http]\nspeed = 11\n")
+    config = RunnerConfig(env={"AOC_RUNNER_DIR": str(tmp_path)})
+
+    assert asdict(config.http) == asdict(HttpConfig())
+    assert "unknown section colours" in caplog.text
+    assert "unknown setting http.speed" in caplog.text
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_configure(
+    tmp_path,
+):
+    """Test the module settings follow the configured overrides"""
+
+    from aoc_runner import config
+
+    try:
+        config.configure({"paths": {"runner_dir": tmp_path}, "http": {"transport": "replay"}})
+        assert config.AOC_RUNNER_DIR == tmp_path
+        assert config.AOC_RUNNER_TRANSPORT == "replay"
+        assert config.AOC_RUNNER_USERS_DIR == tmp_path / "users"
+    finally:
+        config.reset_config()
+
+
+@pytest.mark.config
+@pytest.mark.unit
+def test_runner_config_ensure_dirs(
+    tmp_path,
+):
+    """Test the directories are created once and the project home is checked"""
+
+    config = RunnerConfig(env={"AOC_RUNNER_DIR": str(tmp_path / "runner")})
+    config.ensure_dirs()
+    for name in ("users", "cache", ".auth"):
+        assert (tmp_path / "runner" / name).is_dir()
+
+    (tmp_path / "runner" / "users").rmdir()
+    config.ensure_dirs()
+    assert not (tmp_path / "runner" / "users").exists()
+
+    project_home = tmp_path / "project"
+    project_home.write_text("not a directory")
+    config = RunnerConfig(
+        env={"AOC_RUNNER_DIR": str(tmp_path), "AOC_RUNNER_PROJECT_HOME": str(project_home)}
+    )
+    with pytest.raises(DirectoryIsFile):
+        config.ensure_dirs()
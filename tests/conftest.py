@@ -3,6 +3,9 @@
 # Pytest libraries
 import pytest
 
+# Advent of Code Runner libraries
+from aoc_runner.config import configure
+
 
 @pytest.fixture
 def runner_dir(
@@ -53,12 +56,30 @@ def runner_users_dir(
 
 
 @pytest.fixture
-def user_module_dir_patch(
+def runner_paths(
+    runner_dir,
     runner_auth_dir,
     runner_users_dir,
+):
+    """Return the paths settings placing the runner storage tree in the
+    temporary directories
+    """
+
+    return {
+        "runner_dir": runner_dir,
+        "auth_dir": runner_auth_dir,
+        "users_dir": runner_users_dir,
+    }
+
+
+@pytest.fixture
+def user_module_dir_patch(
+    runner_paths,
     monkeypatch,
 ):
-    """Monkey patch the users directories"""
+    """Configure the users directories, restoring the configuration
+    afterwards
+    """
 
-    monkeypatch.setattr("aoc_runner.user.AOC_RUNNER_AUTH_DIR", runner_auth_dir)
-    monkeypatch.setattr("aoc_runner.user.AOC_RUNNER_USERS_DIR", runner_users_dir)
+    monkeypatch.setattr("aoc_runner.config._config", None)
+    configure(overrides={"paths": runner_paths})
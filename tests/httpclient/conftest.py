@@ -0,0 +1,76 @@
+"""Common Advent of Code Runner HTTP Client fixtures"""
+
+# System libraries
+from io import BytesIO
+import time
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.httpclient import USER_AGENT
+from aoc_runner.limiter import RateLimiter
+
+
+class FakePoolManager:
+    """Stand in for urllib3.PoolManager which records the requests issued"""
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        responses: list | None = None,
+    ) -> None:
+        """Initialize the fake pool manager"""
+        self.headers = {"User-Agent": USER_AGENT}
+        self.delay = delay
+        self.responses = [] if responses is None else list(responses)
+        self.requests = []
+
+    def request(
+        self,
+        method,
+        url,
+        headers=None,
+        **kwargs,
+    ):
+        """Record the request and return an empty response"""
+        self.requests.append({"method": method, "url": url, "headers": headers} | kwargs)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.responses:
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return urllib3.HTTPResponse(
+            body=BytesIO(b"ok"),
+            status=200,
+            preload_content=kwargs.get("preload_content", True),
+        )
+
+    def request_encode_body(
+        self,
+        method,
+        url,
+        headers=None,
+        **kwargs,
+    ):
+        """Record the request and return an empty response"""
+        return self.request(method=method, url=url, headers=headers, **kwargs)
+
+
+@pytest.fixture
+def fake_pool_manager():
+    """Return a factory for fake pool managers"""
+
+    return FakePoolManager
+
+
+@pytest.fixture
+def unlimited():
+    """Return a rate limiter which never delays a request"""
+
+    return RateLimiter(rate=1000.0, burst=1000)
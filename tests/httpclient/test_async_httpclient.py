@@ -0,0 +1,101 @@
+"""Test the Advent of Code Runner AsyncHttpClient class"""
+
+# System libraries
+import asyncio
+import time
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.httpclient import AsyncHttpClient, HttpClient, USER_AGENT
+from aoc_runner.limiter import rate_limiter
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_async_client_shares_default_limiter():
+    """Test the synchronous and asynchronous clients share one limiter"""
+
+    assert AsyncHttpClient()._rate_limiter is rate_limiter
+    assert HttpClient()._rate_limiter is rate_limiter
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_async_client_get(
+    fake_pool_manager,
+    unlimited,
+):
+    """Test the AsyncHttpClient.get adds the session cookie and counts the request"""
+
+    client = AsyncHttpClient(limiter=unlimited)
+    client._pool_manager = fake_pool_manager()
+
+    resp = asyncio.run(client.get("http://aoc.test/settings", token="abc", redirect=False))
+    request = client._pool_manager.requests[0]
+
+    assert resp.status == 200
+    assert client.req_count == {"GET": 1, "POST": 0}
+    assert request["method"] == "GET"
+    assert request["redirect"] is False
+    assert request["headers"]["Cookie"] == "session=abc"
+    assert request["headers"]["User-Agent"] == USER_AGENT
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_async_client_get_no_token(
+    fake_pool_manager,
+    unlimited,
+):
+    """Test the AsyncHttpClient.get does not send a cookie without a token"""
+
+    client = AsyncHttpClient(limiter=unlimited)
+    client._pool_manager = fake_pool_manager()
+
+    asyncio.run(client.get("http://aoc.test/"))
+    assert "Cookie" not in client._pool_manager.requests[0]["headers"]
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_async_client_post(
+    fake_pool_manager,
+    unlimited,
+):
+    """Test the AsyncHttpClient.post sends the fields and counts the request"""
+
+    client = AsyncHttpClient(limiter=unlimited)
+    client._pool_manager = fake_pool_manager()
+
+    asyncio.run(client.post("http://aoc.test/answer", token="abc", fields={"level": "1"}))
+    request = client._pool_manager.requests[0]
+
+    assert client.req_count == {"GET": 0, "POST": 1}
+    assert request["method"] == "POST"
+    assert request["fields"] == {"level": "1"}
+    assert request["headers"]["Cookie"] == "session=abc"
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_async_client_overlaps_requests(
+    fake_pool_manager,
+    unlimited,
+):
+    """Test concurrent requests overlap their network waits"""
+
+    client = AsyncHttpClient(limiter=unlimited)
+    client._pool_manager = fake_pool_manager(delay=0.2)
+
+    async def fetch_all():
+        return await asyncio.gather(*(client.get(f"http://aoc.test/{n}") for n in range(4)))
+
+    start = time.perf_counter()
+    responses = asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - start
+
+    assert len(responses) == 4
+    assert client.req_count["GET"] == 4
+    assert elapsed < 0.6
@@ -0,0 +1,91 @@
+"""Test the Advent of Code Runner HttpClient response caching"""
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.cache import ResponseCache
+from aoc_runner.httpclient import HttpClient
+
+
+URL = "https://adventofcode.com/2023/day/1"
+
+
+@pytest.fixture
+def cached_client(
+    runner_cache_dir,
+    runner_users_dir,
+    unlimited,
+):
+    """Return an HTTP client with the response cache enabled"""
+
+    cache = ResponseCache(cache_dir=runner_cache_dir, users_dir=runner_users_dir)
+    return HttpClient(limiter=unlimited, cache=cache)
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_cache_revalidates(
+    cached_client,
+    fake_pool_manager,
+):
+    """Test a cached page is revalidated and a 304 is served from disk"""
+
+    cached_client._pool_manager = fake_pool_manager(
+        responses=[
+            urllib3.HTTPResponse(body=b"prose", status=200, headers={"ETag": '"v1"'}),
+            urllib3.HTTPResponse(body=b"", status=304, headers={"ETag": '"v1"'}),
+        ]
+    )
+
+    first = cached_client.get(URL, token="abc", user_id="github.1")
+    second = cached_client.get(URL, token="abc", user_id="github.1")
+    requests = cached_client._pool_manager.requests
+
+    assert first.data == b"prose"
+    assert second.data == b"prose"
+    assert second.status == 200
+    assert "If-None-Match" not in requests[0]["headers"]
+    assert requests[1]["headers"]["If-None-Match"] == '"v1"'
+    assert cached_client.cache_count == {"hit": 0, "revalidated": 1, "miss": 1}
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_cache_fresh_hit(
+    cached_client,
+    fake_pool_manager,
+):
+    """Test a page which never expires is served without a request"""
+
+    url = f"{URL}/input"
+    cached_client._pool_manager = fake_pool_manager(
+        responses=[urllib3.HTTPResponse(body=b"1\n2\n", status=200)]
+    )
+
+    cached_client.get(url, token="abc", user_id="github.1")
+    resp = cached_client.get(url, token="abc", user_id="github.1")
+
+    assert resp.data == b"1\n2\n"
+    assert cached_client.req_count["GET"] == 1
+    assert cached_client.cache_count["hit"] == 1
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_no_cache(
+    fake_pool_manager,
+    unlimited,
+):
+    """Test the cache is not used unless enabled"""
+
+    client = HttpClient(limiter=unlimited)
+    client._pool_manager = fake_pool_manager()
+
+    client.get(f"{URL}/input")
+    client.get(f"{URL}/input")
+    assert client.req_count["GET"] == 2
+    assert client.cache_count == {"hit": 0, "revalidated": 0, "miss": 0}
@@ -0,0 +1,239 @@
+"""Test the Advent of Code Runner HttpClient streaming downloads"""
+
+# System libraries
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from io import BytesIO
+import threading
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.exceptions import DownloadFailed
+from aoc_runner.httpclient import _make_pool_manager, HttpClient
+from aoc_runner.localserver import LocalAocServer, synthetic_input
+from aoc_runner.retry import RetryPolicy
+from aoc_runner.transport import Cassette, Interaction, ReplayTransport, token_hash
+
+
+URL = "https://adventofcode.com/2023/day/1/input"
+
+
+class BrokenBody(BytesIO):
+    """Response body whose connection is reset part way through"""
+
+    def read(
+        self,
+        *args,
+    ):
+        """Return the first chunk then fail"""
+        if self.tell():
+            raise ConnectionResetError("Connection reset by peer")
+        return super().read(*args)
+
+
+class MeetingBody(BytesIO):
+    """Response body which waits for the other concurrent downloads before
+    giving its first chunk, recording the partial files then present
+    """
+
+    def __init__(
+        self,
+        data,
+        barrier,
+        directory,
+        seen,
+    ):
+        """Initialize the body"""
+        super().__init__(data)
+        self.barrier = barrier
+        self.directory = directory
+        self.seen = seen
+
+    def read(
+        self,
+        *args,
+    ):
+        """Meet the other downloads before the first chunk"""
+        if not self.tell():
+            self.barrier.wait(timeout=5)
+            self.seen.update(path.name for path in self.directory.glob("*.part"))
+        return super().read(*args)
+
+
+def streamed(
+    body,
+) -> urllib3.HTTPResponse:
+    """Return a response which has not been preloaded"""
+
+    return urllib3.HTTPResponse(body=body, status=200, preload_content=False)
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_download(
+    unlimited,
+    fake_pool_manager,
+    tmp_path,
+):
+    """Test the body is streamed to the target file in chunks"""
+
+    body = bytes(range(256)) * 4096
+    client = HttpClient(
+        limiter=unlimited, transport=fake_pool_manager(responses=[streamed(BytesIO(body))])
+    )
+    target = tmp_path / "input.txt"
+    target.write_text("stale")
+
+    download = client.download(URL, target, token="abc", chunk_size=4096)
+
+    assert target.read_bytes() == body
+    assert download.path == target
+    assert download.size == len(body)
+    assert download.checksum == sha256(body).hexdigest()
+    assert list(tmp_path.iterdir()) == [target]
+    request = client._pool_manager.requests[0]
+    assert request["preload_content"] is False
+    assert request["headers"]["Cookie"] == "session=abc"
+    assert client.metrics.recent()[0].bytes == len(body)
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_download_without_checksum(
+    unlimited,
+    fake_pool_manager,
+    tmp_path,
+):
+    """Test the checksum may be skipped and the target directory is created"""
+
+    client = HttpClient(limiter=unlimited, transport=fake_pool_manager())
+
+    download = client.download(URL, tmp_path / "2023" / "input.txt", checksum=None)
+
+    assert (download.size, download.checksum) == (2, None)
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_download_failed(
+    unlimited,
+    fake_pool_manager,
+    tmp_path,
+):
+    """Test a failed download leaves the target untouched"""
+
+    client = HttpClient(
+        limiter=unlimited,
+        transport=fake_pool_manager(responses=[urllib3.HTTPResponse(body=b"", status=404)]),
+    )
+    target = tmp_path / "input.txt"
+    target.write_text("stale")
+
+    with pytest.raises(DownloadFailed):
+        client.download(URL, target)
+
+    assert target.read_text() == "stale"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_download_retried(
+    unlimited,
+    fake_pool_manager,
+    tmp_path,
+):
+    """Test a download interrupted part way through is started over"""
+
+    client = HttpClient(
+        limiter=unlimited,
+        transport=fake_pool_manager(
+            responses=[streamed(BrokenBody(b"x" * 100)), streamed(BytesIO(b"y" * 100))]
+        ),
+        retry=RetryPolicy(backoff=0.0),
+    )
+    target = tmp_path / "input.txt"
+
+    download = client.download(URL, target, chunk_size=10)
+
+    assert target.read_bytes() == b"y" * 100
+    assert download.size == 100
+    assert client.fault_count["retries"] == 1
+    assert list(tmp_path.iterdir()) == [target]
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_download_concurrent(
+    unlimited,
+    fake_pool_manager,
+    tmp_path,
+):
+    """Test concurrent downloads of one target write separate partial files"""
+
+    barrier = threading.Barrier(2)
+    seen = set()
+    bodies = [b"a" * 1000, b"b" * 1000]
+    client = HttpClient(
+        limiter=unlimited,
+        transport=fake_pool_manager(
+            responses=[streamed(MeetingBody(body, barrier, tmp_path, seen)) for body in bodies]
+        ),
+    )
+    target = tmp_path / "input.txt"
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        downloads = list(pool.map(lambda _: client.download(URL, target, chunk_size=10), "ab"))
+
+    assert len(seen) == 2
+    assert target.read_bytes() in bodies
+    assert [download.size for download in downloads] == [1000, 1000]
+    assert list(tmp_path.iterdir()) == [target]
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_download_replayed(
+    unlimited,
+    tmp_path,
+):
+    """Test a recorded page can be downloaded"""
+
+    cassette = Cassette()
+    cassette.add(
+        Interaction(
+            method="GET",
+            url=URL,
+            token=token_hash("abc"),
+            status=200,
+            headers={},
+            body=b"1\n2\n",
+        )
+    )
+    client = HttpClient(limiter=unlimited, transport=ReplayTransport(cassette))
+
+    download = client.download(URL, tmp_path / "input.txt", token="abc")
+
+    assert download.path.read_bytes() == b"1\n2\n"
+
+
+@pytest.mark.httpclient
+@pytest.mark.integration
+def test_http_client_download_network(
+    unlimited,
+    tmp_path,
+):
+    """Test a puzzle input is downloaded from the local server"""
+
+    client = HttpClient(limiter=unlimited, transport=_make_pool_manager())
+    with LocalAocServer(cassettes=[], synthesize_users=True) as server:
+        download = client.download(
+            f"{server.url}/2023/day/5/input", tmp_path / "input.txt", token="abc"
+        )
+
+    assert download.path.read_text() == synthetic_input("abc", 2023, 5)
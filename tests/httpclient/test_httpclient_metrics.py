@@ -0,0 +1,86 @@
+"""Test the Advent of Code Runner HttpClient request timings"""
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.httpclient import _make_pool_manager, HttpClient
+from aoc_runner.limiter import RateLimiter
+from aoc_runner.localserver import LocalAocServer
+from aoc_runner.retry import RetryPolicy
+
+
+URL = "https://adventofcode.com/2023/day/1/input"
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_timings(
+    fake_pool_manager,
+):
+    """Test the time spent in the limiter and on the server are separated"""
+
+    sleeps = []
+    limiter = RateLimiter(rate=1.0, burst=1, cool_off=0.0, sleep=sleeps.append)
+    client = HttpClient(limiter=limiter, transport=fake_pool_manager(delay=0.05))
+    clock = iter([0.0, 0.0, 0.05, 0.06, 1.0, 1.5, 1.6, 1.6])
+    client._clock = lambda: next(clock)
+
+    client.get(URL)
+    client.get(URL)
+
+    first, second = client.metrics.recent()
+    assert (first.queue_wait, first.ttfb, first.total) == (0.0, 0.05, 0.06)
+    assert (second.queue_wait, second.ttfb, second.total) == pytest.approx((0.5, 0.1, 0.6))
+    assert second.status == 200
+    assert second.bytes == 2
+    assert second.pattern == "/{n}/day/{n}/input"
+    assert len(sleeps) == 1
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_timings_failures(
+    unlimited,
+    fake_pool_manager,
+):
+    """Test every attempt of a retried request is timed"""
+
+    client = HttpClient(
+        limiter=unlimited,
+        transport=fake_pool_manager(
+            responses=[urllib3.exceptions.ProtocolError("Connection reset")]
+        ),
+        retry=RetryPolicy(backoff=0.0),
+    )
+    client._sleep = lambda delay: None
+
+    client.get(URL)
+
+    failed, succeeded = client.metrics.recent()
+    assert (failed.attempt, failed.status, failed.error) == (1, None, "ProtocolError")
+    assert (succeeded.attempt, succeeded.status, succeeded.error) == (2, 200, None)
+    assert client.metrics.summary()["/{n}/day/{n}/input"]["errors"] == 1
+
+
+@pytest.mark.httpclient
+@pytest.mark.integration
+def test_http_client_timings_network(
+    unlimited,
+):
+    """Test connections are timed and reused connections are not"""
+
+    client = HttpClient(limiter=unlimited, transport=_make_pool_manager())
+    with LocalAocServer(cassettes=[], synthesize_users=True) as server:
+        first = client.get(f"{server.url}/2023/day/1/input", token="abc")
+        second = client.get(f"{server.url}/2023/day/2/input", token="abc")
+
+    assert first.status == second.status == 200
+    first_timing, second_timing = client.metrics.recent()
+    assert first_timing.connect > 0
+    assert second_timing.connect == 0
+    assert first_timing.bytes == len(first.data) > 0
+    assert first_timing.ttfb <= first_timing.total
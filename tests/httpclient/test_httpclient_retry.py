@@ -0,0 +1,163 @@
+"""Test the Advent of Code Runner HttpClient retries and circuit breaker"""
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.exceptions import CircuitOpenError
+from aoc_runner.httpclient import HttpClient
+from aoc_runner.retry import CircuitBreaker, RetryPolicy
+
+
+URL = "https://adventofcode.com/2023/day/1/input"
+
+
+@pytest.fixture
+def retry_client(
+    unlimited,
+):
+    """Return an HTTP client which records its sleeps rather than sleeping"""
+
+    client = HttpClient(
+        limiter=unlimited,
+        retry=RetryPolicy(max_attempts=3, backoff=1.0, jitter=0.0),
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60.0),
+    )
+    client.sleeps = []
+    client._sleep = client.sleeps.append
+    return client
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_retries_transient_failures(
+    retry_client,
+    fake_pool_manager,
+):
+    """Test a GET is retried after a connection error and a 503"""
+
+    retry_client._pool_manager = fake_pool_manager(
+        responses=[
+            urllib3.exceptions.ProtocolError("Connection reset"),
+            urllib3.HTTPResponse(body=b"", status=503, headers={"Retry-After": "5"}),
+            urllib3.HTTPResponse(body=b"1\n", status=200),
+        ]
+    )
+
+    resp = retry_client.get(URL, token="abc")
+
+    assert resp.data == b"1\n"
+    assert retry_client.sleeps == [1.0, 5.0]
+    assert retry_client.req_count["GET"] == 3
+    assert retry_client.fault_count == {"retries": 2, "failures": 2, "short_circuits": 0}
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_retries_exhausted(
+    retry_client,
+    fake_pool_manager,
+):
+    """Test the last failing response is returned once retries run out"""
+
+    retry_client._pool_manager = fake_pool_manager(
+        responses=[urllib3.HTTPResponse(body=b"", status=502)] * 3
+    )
+
+    resp = retry_client.get(URL)
+
+    assert resp.status == 502
+    assert retry_client.sleeps == [1.0, 2.0]
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_post_not_retried(
+    retry_client,
+    fake_pool_manager,
+):
+    """Test a POST is never retried"""
+
+    retry_client._pool_manager = fake_pool_manager(
+        responses=[urllib3.exceptions.ProtocolError("Connection reset")]
+    )
+
+    with pytest.raises(urllib3.exceptions.ProtocolError):
+        retry_client.post(URL, token="abc", fields={"answer": "1"})
+    assert retry_client.sleeps == []
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_circuit_opens(
+    retry_client,
+    fake_pool_manager,
+):
+    """Test requests fail fast once the circuit breaker opens"""
+
+    retry_client._pool_manager = fake_pool_manager(
+        responses=[urllib3.HTTPResponse(body=b"", status=500)] * 3
+    )
+
+    assert retry_client.get(URL).status == 500
+    with pytest.raises(CircuitOpenError):
+        retry_client.get(URL)
+
+    assert retry_client.req_count["GET"] == 3
+    assert retry_client.fault_count["short_circuits"] == 1
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_reports_throttling(
+    retry_client,
+    fake_pool_manager,
+):
+    """Test a 429 response escalates the cool off of the rate limiter"""
+
+    retry_client._pool_manager = fake_pool_manager(
+        responses=[
+            urllib3.HTTPResponse(body=b"", status=429),
+            urllib3.HTTPResponse(body=b"1\n", status=200),
+        ]
+    )
+
+    assert retry_client.get(URL).data == b"1\n"
+    assert retry_client._rate_limiter.cool_off == pytest.approx(0.25)
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_trial_request_error(
+    retry_client,
+    fake_pool_manager,
+):
+    """Test an unexpected error in the trial request reopens the circuit
+    rather than leaving it half-open
+    """
+
+    now = [0.0]
+    retry_client._breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=60.0, clock=lambda: now[0]
+    )
+    retry_client._pool_manager = fake_pool_manager(
+        responses=[
+            urllib3.HTTPResponse(body=b"", status=500),
+            OSError("Disk full"),
+            urllib3.HTTPResponse(body=b"1\n", status=200),
+        ]
+    )
+    retry_client._retry = RetryPolicy(max_attempts=1)
+
+    assert retry_client.get(URL).status == 500
+    now[0] = 60.0
+    with pytest.raises(OSError):
+        retry_client.get(URL)
+    assert retry_client._breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 120.0
+    assert retry_client.get(URL).data == b"1\n"
+    assert retry_client._breaker.state == CircuitBreaker.CLOSED
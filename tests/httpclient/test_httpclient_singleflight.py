@@ -0,0 +1,99 @@
+"""Test the Advent of Code Runner HTTP clients coalesce identical requests"""
+
+# System libraries
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.httpclient import AsyncHttpClient, HttpClient
+
+
+URL = "https://adventofcode.com/2023/day/1/input"
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_coalesces_requests(
+    unlimited,
+    fake_pool_manager,
+):
+    """Test concurrent identical requests share a single response"""
+
+    client = HttpClient(limiter=unlimited, transport=fake_pool_manager(delay=0.2))
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(executor.map(lambda _: client.get(URL, token="abc"), range(5)))
+
+    assert [resp.data for resp in responses] == [b"ok"] * 5
+    assert len({id(resp) for resp in responses}) == 5
+    assert client.req_count["GET"] == 1
+    assert client.coalesced_count == 4
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_distinct_requests(
+    unlimited,
+    fake_pool_manager,
+):
+    """Test requests for other tokens are not coalesced"""
+
+    client = HttpClient(limiter=unlimited, transport=fake_pool_manager(delay=0.1))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda token: client.get(URL, token=token), ["a", "b", "c"]))
+    client.get(URL, token="a")
+
+    assert client.req_count["GET"] == 4
+    assert client.coalesced_count == 0
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_http_client_coalesced_failure(
+    unlimited,
+    fake_pool_manager,
+):
+    """Test a failed request fails every caller waiting on it"""
+
+    client = HttpClient(
+        limiter=unlimited,
+        transport=fake_pool_manager(
+            delay=0.2, responses=[urllib3.exceptions.ProtocolError("Connection reset")]
+        ),
+    )
+    client._retry.max_attempts = 1
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(client.get, URL) for _ in range(3)]
+    for future in futures:
+        assert isinstance(future.exception(), urllib3.exceptions.ProtocolError)
+
+    assert client.req_count["GET"] == 1
+    assert client.get(URL).data == b"ok"
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_async_http_client_coalesces_requests(
+    unlimited,
+    fake_pool_manager,
+):
+    """Test concurrent identical tasks share a single response"""
+
+    client = AsyncHttpClient(limiter=unlimited, transport=fake_pool_manager(delay=0.1))
+
+    async def fetch():
+        return await asyncio.gather(*(client.get(URL, token="abc") for _ in range(4)))
+
+    responses = asyncio.run(fetch())
+
+    assert [resp.data for resp in responses] == [b"ok"] * 4
+    assert client.req_count["GET"] == 1
+    assert client.coalesced_count == 3
@@ -0,0 +1,123 @@
+"""Test the Advent of Code Runner record and replay transports"""
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.exceptions import AocValueError, CassetteMiss
+from aoc_runner.httpclient import HttpClient, make_transport
+from aoc_runner.transport import (
+    ANY_TOKEN,
+    Cassette,
+    Interaction,
+    RecordingTransport,
+    ReplayTransport,
+)
+
+
+URL = "https://adventofcode.com/settings"
+TOKEN = "53616c7465645f5f"
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_transport_record_replay(
+    tmp_path,
+    fake_pool_manager,
+    unlimited,
+):
+    """Test recorded interactions are replayed without the network"""
+
+    cassette_file = tmp_path / "settings.cassette.jsonl"
+    pool_manager = fake_pool_manager(
+        responses=[
+            urllib3.HTTPResponse(body=b"<code>x</code>", status=200),
+            urllib3.HTTPResponse(body=b"", status=302, headers={"Location": "/2023"}),
+            urllib3.HTTPResponse(body=b"\xff\xfe", status=200),
+        ]
+    )
+    recorder = HttpClient(
+        limiter=unlimited, transport=RecordingTransport(pool_manager, Cassette(cassette_file))
+    )
+    recorder.get(URL, token=TOKEN, redirect=False)
+    recorder.get(URL, token="dead", redirect=False)
+    recorder.post(f"{URL}/answer", token=TOKEN, fields={"level": "1", "answer": "42"})
+
+    replayer = HttpClient(limiter=unlimited, transport=make_transport("replay", cassette_file))
+    assert replayer.get(URL, token=TOKEN).data == b"<code>x</code>"
+    assert replayer.get(URL, token="dead").get_redirect_location() == "/2023"
+    resp = replayer.post(f"{URL}/answer", token=TOKEN, fields={"answer": "42", "level": "1"})
+    assert resp.data == b"\xff\xfe"
+
+    with pytest.raises(CassetteMiss):
+        replayer.get(URL, token="unknown")
+    with pytest.raises(CassetteMiss):
+        replayer.post(f"{URL}/answer", token=TOKEN, fields={"level": "2", "answer": "42"})
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_transport_cassette_hides_tokens(
+    tmp_path,
+    fake_pool_manager,
+):
+    """Test session tokens are never written to a cassette"""
+
+    cassette_file = tmp_path / "settings.cassette.jsonl"
+    transport = RecordingTransport(fake_pool_manager(), Cassette(cassette_file))
+    transport.request("GET", URL, headers={"Cookie": f"session={TOKEN}"})
+
+    assert TOKEN not in cassette_file.read_text(encoding="utf-8")
+    assert len(Cassette(cassette_file)) == 1
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_transport_any_token(
+    tmp_path,
+):
+    """Test an interaction recorded for any token matches unknown tokens"""
+
+    cassette = Cassette()
+    cassette.add(Interaction("GET", URL, ANY_TOKEN, 302, {"Location": "/"}))
+    cassette.add(Interaction("GET", URL, None, 200, {}, b"anonymous"))
+    transport = ReplayTransport(cassette)
+
+    assert transport.request("GET", URL, headers={"Cookie": "session=x"}).status == 302
+    assert transport.request("GET", URL).data == b"anonymous"
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        '{"format": "other", "version": 1}',
+        '{"format": "aoc_runner.cassette", "version": 99}',
+    ],
+)
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_transport_cassette_version(
+    tmp_path,
+    header,
+):
+    """Test unknown cassette formats and versions are rejected"""
+
+    cassette_file = tmp_path / "bad.cassette.jsonl"
+    cassette_file.write_text(header + "\n", encoding="utf-8")
+
+    with pytest.raises(AocValueError):
+        Cassette(cassette_file)
+
+
+@pytest.mark.httpclient
+@pytest.mark.unit
+def test_make_transport_unknown_mode(
+    tmp_path,
+):
+    """Test an unknown transport mode is rejected"""
+
+    with pytest.raises(AocValueError):
+        make_transport("carrier-pigeon", tmp_path / "cassette.jsonl")
@@ -0,0 +1,43 @@
+"""Common Advent of Code Runner Limiter fixtures"""
+
+# Pytest libraries
+import pytest
+
+
+class FakeClock:
+    """Manually advanced clock used in place of time.monotonic"""
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the clock at an arbitrary point in time"""
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(
+        self,
+    ) -> float:
+        """Return the current time"""
+        return self.now
+
+    def advance(
+        self,
+        seconds: float,
+    ) -> None:
+        """Move the clock forward"""
+        self.now += seconds
+
+    def sleep(
+        self,
+        seconds: float,
+    ) -> None:
+        """Record the sleep and move the clock forward"""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Return a manually advanced clock"""
+
+    return FakeClock()
@@ -0,0 +1,164 @@
+"""Test the Advent of Code Runner RateLimiter class"""
+
+# System libraries
+import asyncio
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.exceptions import AocValueError
+from aoc_runner.limiter import RateLimiter
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"rate": 0},
+        {"rate": -1.0},
+        {"burst": 0},
+    ],
+)
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_invalid_parameters(
+    kwargs,
+):
+    """Test the RateLimiter rejects a non-positive rate or burst"""
+
+    with pytest.raises(AocValueError):
+        RateLimiter(**kwargs)
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_burst(
+    clock,
+):
+    """Test the RateLimiter allows a full burst without waiting"""
+
+    limiter = RateLimiter(rate=1.0, burst=4, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        limiter.wait()
+
+    assert clock.sleeps == []
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_exact_wait(
+    clock,
+):
+    """Test the RateLimiter waits exactly until the next token is available"""
+
+    limiter = RateLimiter(rate=2.0, burst=1, cool_off=0.25, clock=clock, sleep=clock.sleep)
+    limiter.wait()
+    clock.advance(0.2)
+    limiter.wait()
+
+    assert clock.sleeps == [pytest.approx(0.3)]
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_refill(
+    clock,
+):
+    """Test the RateLimiter refills the bucket over time but never beyond the burst"""
+
+    limiter = RateLimiter(rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+    limiter.wait()
+    limiter.wait()
+    clock.advance(100.0)
+    limiter.wait()
+    limiter.wait()
+
+    assert clock.sleeps == []
+    assert limiter.tokens == pytest.approx(0.0)
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_sustained_rate(
+    clock,
+):
+    """Test back to back requests are held to the rate with no cool off"""
+
+    limiter = RateLimiter(rate=4 / 3.0, burst=4, cool_off=0.25, clock=clock, sleep=clock.sleep)
+    start = clock.now
+    for _ in range(100):
+        limiter.wait()
+
+    assert clock.now - start == pytest.approx(96 * 0.75)
+    assert clock.sleeps == [pytest.approx(0.75)] * 96
+    assert limiter.cool_off == 0.0
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_cool_off_escalates(
+    clock,
+):
+    """Test the RateLimiter holds requests back by a cool off which doubles
+    for each refusal by the server
+    """
+
+    limiter = RateLimiter(
+        rate=1.0, burst=1, cool_off=0.25, max_cool_off=1.0, clock=clock, sleep=clock.sleep
+    )
+    limiter.wait()
+    limiter.throttled()
+    assert limiter.cool_off == pytest.approx(0.25)
+    assert limiter._reserve() == pytest.approx(1.25)
+
+    for _ in range(3):
+        limiter.throttled()
+    assert limiter.cool_off == pytest.approx(1.0)
+    assert limiter._reserve() == pytest.approx(1.25 + 1.0 + 0.5 + 1.0 + 1.0)
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_cool_off_decays(
+    clock,
+):
+    """Test the RateLimiter cool off halves after each quiet period"""
+
+    limiter = RateLimiter(
+        rate=10.0, burst=1, cool_off=0.25, decay_after=60.0, clock=clock, sleep=clock.sleep
+    )
+    for _ in range(3):
+        limiter.throttled()
+    assert limiter.cool_off == pytest.approx(1.0)
+
+    clock.advance(60.0)
+    limiter.wait()
+    assert limiter.cool_off == pytest.approx(0.5)
+
+    clock.advance(120.0)
+    limiter.wait()
+    assert limiter.cool_off == 0.0
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_rate_limiter_wait_async(
+    clock,
+    monkeypatch,
+):
+    """Test the RateLimiter.wait_async suspends for the computed delay"""
+
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr("aoc_runner.limiter.asyncio.sleep", fake_sleep)
+    limiter = RateLimiter(rate=4.0, burst=1, clock=clock)
+
+    async def run():
+        await limiter.wait_async()
+        await limiter.wait_async()
+
+    asyncio.run(run())
+    assert slept == [pytest.approx(0.25)]
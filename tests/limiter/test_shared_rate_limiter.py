@@ -0,0 +1,158 @@
+"""Test the Advent of Code Runner SharedRateLimiter class"""
+
+# System libraries
+import asyncio
+import multiprocessing
+import threading
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.config import RunnerConfig
+from aoc_runner.exceptions import AocValueError
+from aoc_runner.httpclient import HttpClient
+from aoc_runner.limiter import (
+    make_rate_limiter,
+    RateLimiter,
+    SharedRateLimiter,
+)
+
+
+def reserve_twice(
+    path,
+):
+    """Reserve two requests from a shared limiter in a separate process"""
+
+    limiter = SharedRateLimiter(path=path, rate=0.01, burst=4)
+    return [limiter._reserve() for _ in range(2)]
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_shared_rate_limiter_shares_budget(
+    tmp_path,
+    clock,
+):
+    """Test two SharedRateLimiters on the same file draw from one budget"""
+
+    path = tmp_path / "ratelimit.json"
+    first = SharedRateLimiter(path=path, rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+    second = SharedRateLimiter(path=path, rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+
+    first.wait()
+    second.wait()
+    assert clock.sleeps == []
+
+    first.wait()
+    assert clock.sleeps == [pytest.approx(1.0)]
+    assert path.exists()
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_shared_rate_limiter_unreadable_state(
+    tmp_path,
+    clock,
+):
+    """Test a corrupted state file is replaced by a fresh bucket"""
+
+    path = tmp_path / "ratelimit.json"
+    path.write_text("not json", encoding="utf-8")
+
+    limiter = SharedRateLimiter(path=path, rate=1.0, burst=1, clock=clock, sleep=clock.sleep)
+    limiter.wait()
+    assert clock.sleeps == []
+    assert path.read_text(encoding="utf-8").startswith("{")
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_shared_rate_limiter_wait_async(
+    tmp_path,
+    clock,
+    monkeypatch,
+):
+    """Test the shared file is locked from a worker thread rather than on
+    the event loop
+    """
+
+    slept = []
+    threads = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr("aoc_runner.limiter.asyncio.sleep", fake_sleep)
+    path = tmp_path / "ratelimit.json"
+    limiter = SharedRateLimiter(path=path, rate=4.0, burst=1, clock=clock)
+    reserve = limiter._reserve
+    monkeypatch.setattr(
+        limiter, "_reserve", lambda: threads.append(threading.get_ident()) or reserve()
+    )
+
+    async def run():
+        await limiter.wait_async()
+        await limiter.wait_async()
+
+    asyncio.run(run())
+    assert slept == [pytest.approx(0.25)]
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
+
+
+@pytest.mark.limiter
+@pytest.mark.slow
+def test_shared_rate_limiter_across_processes(
+    tmp_path,
+):
+    """Test separate processes draw from one budget"""
+
+    path = tmp_path / "ratelimit.json"
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=3) as pool:
+        results = pool.map(reserve_twice, [path] * 3)
+
+    delays = [delay for result in results for delay in result]
+    assert len(delays) == 6
+    assert delays.count(0.0) == 4
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_make_rate_limiter(
+    tmp_path,
+    monkeypatch,
+):
+    """Test the rate limiter backend selection"""
+
+    overrides = {"paths": {"runner_dir": tmp_path}, "limiter": {"burst": 7}}
+    monkeypatch.setattr("aoc_runner.config._config", RunnerConfig(overrides=overrides))
+
+    assert type(make_rate_limiter("local")) is RateLimiter
+    shared = make_rate_limiter("shared")
+    assert isinstance(shared, SharedRateLimiter)
+    assert shared.path == tmp_path / "ratelimit.json"
+    assert shared.tokens == 7
+
+    with pytest.raises(AocValueError):
+        make_rate_limiter("unknown")
+
+
+@pytest.mark.limiter
+@pytest.mark.unit
+def test_shared_rate_limiter_follows_config(
+    monkeypatch,
+):
+    """Test the limiter shared by the HTTP clients is only built on first
+    use, so it follows a configuration set after the import
+    """
+
+    monkeypatch.delattr("aoc_runner.limiter.rate_limiter", raising=False)
+    overrides = {"limiter": {"rate": 100.0, "burst": 50}}
+    monkeypatch.setattr("aoc_runner.config._config", RunnerConfig(overrides=overrides))
+
+    limiter = HttpClient()._rate_limiter
+    assert HttpClient()._rate_limiter is limiter
+    assert limiter.tokens == 50
+    assert limiter._rate == 100.0
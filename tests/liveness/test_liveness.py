@@ -0,0 +1,158 @@
+"""Test the Advent of Code Runner token liveness cache"""
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.liveness import LivenessCache
+
+
+class Clock:
+    """Provide a clock which only moves when told to"""
+
+    def __init__(
+        self,
+    ) -> None:
+        """Initialize the clock"""
+
+        self.now = 1000.0
+
+    def __call__(
+        self,
+    ) -> float:
+        """Return the current time"""
+
+        return self.now
+
+
+def cache_text(
+    cache: LivenessCache,
+) -> str:
+    """Return the contents of the cache file"""
+
+    return cache.path.read_text(encoding="utf-8")
+
+
+@pytest.fixture
+def clock():
+    """Return a manual clock"""
+
+    yield Clock()
+
+
+@pytest.fixture
+def make_cache(
+    tmp_path,
+    clock,
+):
+    """Create a factory of liveness caches sharing a file"""
+
+    def make(ttl: float = 100, dead_ttl: float = 10) -> LivenessCache:
+        """Return a liveness cache"""
+
+        return LivenessCache(
+            tmp_path / "liveness.json", ttl=ttl, dead_ttl=dead_ttl, clock=clock
+        )
+
+    return make
+
+
+@pytest.mark.liveness
+@pytest.mark.unit
+def test_liveness_live(
+    make_cache,
+    clock,
+):
+    """Test a live token is remembered with its owner until it expires"""
+
+    cache = make_cache()
+    assert cache.lookup("token") is None
+
+    cache.store_live("token", user_name="name", aoc_id=1, login_source="github")
+    liveness = cache.lookup("token")
+    assert liveness.alive
+    assert liveness.user_id == "github.1"
+    assert liveness.user_name == "name"
+    assert liveness.verified == 1000.0
+
+    clock.now += 99
+    assert cache.lookup("token") is not None
+    clock.now += 1
+    assert cache.lookup("token") is None
+
+
+@pytest.mark.liveness
+@pytest.mark.unit
+def test_liveness_dead(
+    make_cache,
+    clock,
+):
+    """Test a dead token is remembered for the shorter time to live"""
+
+    cache = make_cache()
+    cache.store_dead("token")
+
+    liveness = cache.lookup("token")
+    assert not liveness.alive
+    assert liveness.user_id is None
+
+    clock.now += 10
+    assert cache.lookup("token") is None
+
+
+@pytest.mark.liveness
+@pytest.mark.unit
+def test_liveness_disabled(
+    make_cache,
+):
+    """Test a time to live of 0 disables the caching of the outcome"""
+
+    cache = make_cache(ttl=0, dead_ttl=0)
+    cache.store_live("live", user_name="name", aoc_id=1, login_source="github")
+    cache.store_dead("dead")
+
+    assert cache.lookup("live") is None
+    assert cache.lookup("dead") is None
+    assert not cache.path.exists()
+
+
+@pytest.mark.liveness
+@pytest.mark.unit
+def test_liveness_shared(
+    make_cache,
+    clock,
+):
+    """Test the checks made by other processes are seen and kept, and that
+    expired checks and forgotten tokens are dropped from the file
+    """
+
+    first = make_cache()
+    second = make_cache()
+    first.store_dead("dead")
+    assert second.lookup("dead") is not None
+
+    clock.now += 10
+    second.store_live("live", user_name="name", aoc_id=1, login_source="github")
+    first.store_live("other", user_name="other", aoc_id=2, login_source="google")
+    assert len(first._entries) == 2
+    assert second.lookup("other").user_id == "google.2"
+
+    second.forget("other")
+    assert first.lookup("other") is None
+    assert first.lookup("live") is not None
+    assert "live" not in cache_text(first)
+
+
+@pytest.mark.liveness
+@pytest.mark.unit
+def test_liveness_unreadable(
+    make_cache,
+):
+    """Test an unreadable cache file is ignored"""
+
+    cache = make_cache()
+    cache.path.write_text("not json", encoding="utf-8")
+
+    assert cache.lookup("token") is None
+    cache.store_dead("token")
+    assert cache.lookup("token") is not None
@@ -0,0 +1,144 @@
+"""Test the Advent of Code Runner local stand in server"""
+
+# System libraries
+from pathlib import Path
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.config import configure
+from aoc_runner.httpclient import HttpClient
+from aoc_runner.limiter import RateLimiter
+from aoc_runner.localserver import (
+    Faults,
+    LocalAocServer,
+    synthetic_answer,
+    synthetic_aoc_id,
+    synthetic_input,
+)
+from aoc_runner.user import User
+
+
+VALID_TOKEN = "53616c7465645f5f9ae2b7d2af32fc2e3862adb2f08e5a4dc66b594dd1ad760543ad850fd3692a496e07e3993106607dce2a5bfa13aa311d419223b4fd12e564"
+
+
+@pytest.fixture
+def cassettes(
+    request,
+):
+    """Return the cassettes recorded for the tests"""
+
+    data_dir = Path(request.config.rootdir) / "tests" / "data"
+    return [data_dir / "user" / "settings.cassette.jsonl"]
+
+
+@pytest.fixture
+def client():
+    """Return an HTTP client which is not rate limited"""
+
+    return HttpClient(limiter=RateLimiter(rate=1000.0, burst=1000))
+
+
+@pytest.mark.localserver
+@pytest.mark.integration
+def test_local_server_recorded_settings(
+    cassettes,
+    client,
+):
+    """Test recorded pages are served and unknown tokens are redirected"""
+
+    with LocalAocServer(cassettes=cassettes) as server:
+        live = client.get(f"{server.url}/settings", token=VALID_TOKEN, redirect=False)
+        dead = client.get(f"{server.url}/settings", token="dead", redirect=False)
+        missing = client.get(f"{server.url}/nowhere", redirect=False)
+
+    assert live.status == 200
+    assert b"ownerproof-2129276" in live.data
+    assert dead.status == 302
+    assert missing.status == 404
+    assert server.stats == {200: 1, 302: 1, 404: 1}
+
+
+@pytest.mark.localserver
+@pytest.mark.integration
+def test_local_server_synthesized_user(
+    client,
+    monkeypatch,
+):
+    """Test User.from_token resolves a synthesized user"""
+
+    monkeypatch.setattr("aoc_runner.config._config", None)
+    with LocalAocServer(cassettes=[], synthesize_users=True) as server:
+        configure(overrides={"http": {"domain": server.url}})
+        monkeypatch.setattr("aoc_runner.user.http_client", client)
+        user = User.from_token(token="any-token")
+
+    assert user.aoc_id == synthetic_aoc_id("any-token")
+    assert user.login_source == "github"
+    assert user.user_name == f"user{user.aoc_id}"
+
+
+@pytest.mark.localserver
+@pytest.mark.integration
+def test_local_server_input_and_answer(
+    client,
+):
+    """Test puzzle inputs and answer submissions are synthesized"""
+
+    token = "any-token"
+    url = "/2023/day/1"
+    with LocalAocServer(cassettes=[], synthesize_users=True) as server:
+        anonymous = client.get(f"{server.url}{url}/input")
+        puzzle_input = client.get(f"{server.url}{url}/input", token=token)
+        wrong = client.post(
+            f"{server.url}{url}/answer", token=token, fields={"level": "1", "answer": "x"}
+        )
+        blocked = client.post(
+            f"{server.url}{url}/answer",
+            token=token,
+            fields={"level": "1", "answer": synthetic_answer(token, 2023, 1, 1)},
+        )
+        board = client.get(f"{server.url}/2023/leaderboard/private/view/42.json", token=token)
+
+    assert anonymous.status == 400
+    assert puzzle_input.data.decode() == synthetic_input(token, 2023, 1)
+    assert b"not the right answer" in wrong.data
+    assert b"answer too recently" in blocked.data
+    assert "42" in board.json()["members"]
+
+
+@pytest.mark.localserver
+@pytest.mark.integration
+def test_local_server_right_answer(
+    client,
+):
+    """Test the correct answer is accepted"""
+
+    token = "any-token"
+    with LocalAocServer(cassettes=[], synthesize_users=True) as server:
+        resp = client.post(
+            f"{server.url}/2023/day/2/answer",
+            token=token,
+            fields={"level": "2", "answer": synthetic_answer(token, 2023, 2, 2)},
+        )
+
+    assert b"That's the right answer" in resp.data
+
+
+@pytest.mark.localserver
+@pytest.mark.integration
+def test_local_server_faults(
+    client,
+):
+    """Test throttling and dead token faults are injected"""
+
+    faults = Faults(throttle_rate=1.0, retry_after=0)
+    with LocalAocServer(cassettes=[], synthesize_users=True, faults=faults) as server:
+        throttled = client.get(f"{server.url}/settings", token="any-token", redirect=False)
+        server.faults = Faults(dead_token_rate=1.0)
+        dead = client.get(f"{server.url}/settings", token="any-token", redirect=False)
+
+    assert throttled.status == 429
+    assert throttled.headers["Retry-After"] == "0"
+    assert dead.status == 302
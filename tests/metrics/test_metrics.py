@@ -0,0 +1,127 @@
+"""Test the Advent of Code Runner request metrics"""
+
+# System libraries
+import json
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.metrics import Histogram, RequestMetrics, RequestTiming, url_pattern
+
+
+def make_timing(
+    url: str = "https://adventofcode.com/2023/day/1/input",
+    total: float = 0.1,
+    status: int | None = 200,
+    error: str | None = None,
+) -> RequestTiming:
+    """Return the timing of a request"""
+
+    return RequestTiming(
+        method="GET",
+        url=url,
+        pattern=url_pattern(url),
+        status=status,
+        queue_wait=0.0,
+        connect=0.0,
+        ttfb=total / 2,
+        total=total,
+        bytes=10,
+        error=error,
+    )
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://adventofcode.com/2023/day/1/input", "/{n}/day/{n}/input"),
+        ("https://adventofcode.com/2023/day/25", "/{n}/day/{n}"),
+        (
+            "https://adventofcode.com/2023/leaderboard/private/view/123.json",
+            "/{n}/leaderboard/private/view/123.json",
+        ),
+        ("https://adventofcode.com/settings", "/settings"),
+        ("https://adventofcode.com", "/"),
+    ],
+)
+@pytest.mark.metrics
+@pytest.mark.unit
+def test_url_pattern(
+    url,
+    expected,
+):
+    """Test numeric path segments are replaced"""
+
+    assert url_pattern(url) == expected
+
+
+@pytest.mark.metrics
+@pytest.mark.unit
+def test_histogram():
+    """Test the histogram percentiles"""
+
+    histogram = Histogram()
+    assert histogram.summary() == {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+    for value in [0.001] * 90 + [0.3] * 9 + [45.0]:
+        histogram.observe(value)
+
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 0.005
+    assert histogram.percentile(95) == 0.5
+    assert histogram.percentile(100) == 45.0
+    assert histogram.summary()["mean"] == pytest.approx((0.09 + 2.7 + 45.0) / 100)
+
+
+@pytest.mark.metrics
+@pytest.mark.unit
+def test_request_metrics_ring_buffer():
+    """Test only the latest timings are retained while all are aggregated"""
+
+    metrics = RequestMetrics(capacity=3)
+    for day in range(1, 6):
+        metrics.record(make_timing(url=f"https://adventofcode.com/2023/day/{day}/input"))
+
+    urls = [timing.url for timing in metrics.recent()]
+    assert [url.split("/")[-2] for url in urls] == ["3", "4", "5"]
+    assert len(metrics.recent(1)) == 1
+
+    summary = metrics.summary()
+    assert list(summary) == ["/{n}/day/{n}/input"]
+    assert summary["/{n}/day/{n}/input"]["total"]["count"] == 5
+    assert summary["/{n}/day/{n}/input"]["bytes"] == 50
+
+    metrics.clear()
+    assert metrics.recent() == []
+    assert metrics.summary() == {}
+
+
+@pytest.mark.metrics
+@pytest.mark.unit
+def test_request_metrics_errors():
+    """Test failed requests are counted per pattern"""
+
+    metrics = RequestMetrics()
+    metrics.record(make_timing(status=503))
+    metrics.record(make_timing(status=None, error="ProtocolError"))
+    metrics.record(make_timing(status=404))
+
+    assert metrics.summary()["/{n}/day/{n}/input"]["errors"] == 2
+
+
+@pytest.mark.metrics
+@pytest.mark.unit
+def test_request_metrics_sink(
+    tmp_path,
+):
+    """Test timings are appended to the sink"""
+
+    sink = tmp_path / "logs" / "metrics.jsonl"
+    metrics = RequestMetrics(sink=sink)
+    metrics.record(make_timing())
+    metrics.record(make_timing(total=0.2))
+
+    lines = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert [line["total"] for line in lines] == [0.1, 0.2]
+    assert lines[0]["pattern"] == "/{n}/day/{n}/input"
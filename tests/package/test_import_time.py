@@ -0,0 +1,92 @@
+"""Test the import time budget of the Advent of Code Runner package"""
+
+# System libraries
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+# Pytest libraries
+import pytest
+
+
+# Generous budget, in seconds, for importing the package and its config
+IMPORT_BUDGET = 0.25
+
+
+def run_import(
+    request,
+    statement: str,
+) -> subprocess.CompletedProcess:
+    """Run the import statement in a fresh interpreter"""
+
+    src_dir = Path(request.config.rootdir) / "src"
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        cwd=src_dir,
+        env={key: value for key, value in os.environ.items() if key != "AOC_RUNNER_DOMAIN"},
+        text=True,
+    )
+
+
+def import_time(
+    stderr: str,
+    module: str,
+) -> float:
+    """Return the cumulative import time of the module in seconds"""
+
+    for line in stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1_000_000
+    raise AssertionError(f"{module} was not imported")
+
+
+@pytest.mark.package
+@pytest.mark.integration
+def test_package_import_is_light(
+    request,
+):
+    """Test importing the package defers the third-party libraries"""
+
+    result = run_import(
+        request,
+        "import json, sys, aoc_runner, aoc_runner.config; "
+        "heavy = ('bs4', 'pydantic', 'urllib3'); "
+        "print(json.dumps([module for module in heavy if module in sys.modules]))",
+    )
+
+    assert json.loads(result.stdout) == []
+    assert import_time(result.stderr, "aoc_runner") < IMPORT_BUDGET
+
+
+@pytest.mark.package
+@pytest.mark.integration
+def test_package_lazy_exports(
+    request,
+):
+    """Test the package exports are imported on first use"""
+
+    result = run_import(
+        request,
+        "import sys, aoc_runner; "
+        "assert 'aoc_runner.httpclient' not in sys.modules; "
+        "print(aoc_runner.AOC_DOMAIN, aoc_runner.http_client.__class__.__name__)",
+    )
+
+    assert result.stdout.split() == ["https://adventofcode.com", "HttpClient"]
+
+
+@pytest.mark.package
+@pytest.mark.unit
+def test_package_unknown_export():
+    """Test an unknown export raises AttributeError"""
+
+    import aoc_runner
+
+    with pytest.raises(AttributeError):
+        aoc_runner.not_an_export
+    assert "http_client" in dir(aoc_runner)
@@ -0,0 +1,128 @@
+"""Test the Advent of Code Runner page extractors"""
+
+# System libraries
+from pathlib import Path
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.config import RunnerConfig
+from aoc_runner.exceptions import AocValueError
+from aoc_runner.pages import SettingsInfo, extract_settings, parse_settings, soup_settings
+
+
+def page(
+    body: str,
+) -> str:
+    """Return a settings page with the body and an ownership proof code"""
+
+    code = '<span class="hidden-until-hover"><code>ownerproof-42-1706030736-abc</code></span>'
+    return f"<html><body><form>{body}</form><ul><li>{code}</li></ul></body></html>"
+
+
+@pytest.mark.parametrize("name", ["github", "google"])
+@pytest.mark.pages
+@pytest.mark.unit
+def test_parse_settings_captured(
+    request,
+    name,
+):
+    """Test the user details extracted from the captured settings pages
+    match those found by walking the parsed tree
+    """
+
+    html = (Path(request.config.rootdir) / "data" / "settings" / f"{name}.html").read_bytes()
+
+    settings = extract_settings(html)
+    assert settings == soup_settings(html)
+    assert settings.login_source == name
+    assert settings == extract_settings(html.decode("utf-8"))
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ("<span>Link to https://github.com/octo</span>", ("github", "octo")),
+        ("<span>Link to https://twitter.com/bird</span>", ("twitter", "bird")),
+        ("<span>Link to https://www.reddit.com/u/snoo</span>", ("reddit", "snoo")),
+        ("<span>Link to nowhere</span>", ("unknown", "unknown")),
+        ("<span>Link to &lt;b&gt;/x</span>", ("<b>", "x")),
+        (
+            '<span><img src="https://lh3.googleusercontent.com/a"/>G User</span>',
+            ("google", "G User"),
+        ),
+        ('<span><img src="https://avatars.githubusercontent.com/u"/>Name</span>', None),
+        (
+            '<span><img src="https://lh3.googleusercontent.com/a"/>First</span>'
+            "<span>Link to https://github.com/octo</span>",
+            ("google", "First"),
+        ),
+        (
+            "<span>Link to https://github.com/octo</span>"
+            '<span><img src="https://lh3.googleusercontent.com/a"/>Last</span>',
+            ("google", "Last"),
+        ),
+        (
+            '<span>outer <span><img src="https://lh3.googleusercontent.com/a"/>inner</span>'
+            "</span><span>Link to https://github.com/octo</span>",
+            ("google", "outer inner"),
+        ),
+        ("<span>Link <b>to</b> https://github.com/nested</span>", ("github", "nested")),
+        ("", None),
+    ],
+)
+@pytest.mark.pages
+@pytest.mark.unit
+def test_parse_settings_spans(
+    body,
+    expected,
+):
+    """Test the login source is found the same way as walking the tree"""
+
+    html = page(body)
+    settings = extract_settings(html)
+    assert settings == soup_settings(html)
+    assert settings.aoc_id == 42
+    if expected is not None:
+        assert (settings.login_source, settings.user_name) == expected
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "Status: 302\nLocation: /2023",
+        "<code>no proof here</code>",
+        "<code>ownerproof-abc-1</code>",
+    ],
+)
+@pytest.mark.parametrize("extract", [extract_settings, soup_settings])
+@pytest.mark.pages
+@pytest.mark.unit
+def test_parse_settings_no_code(
+    html,
+    extract,
+):
+    """Test a page without a valid ownership proof code is rejected"""
+
+    with pytest.raises(AocValueError):
+        extract(html)
+
+
+@pytest.mark.parametrize("extractors", [True, False])
+@pytest.mark.pages
+@pytest.mark.unit
+def test_parse_settings_config(
+    extractors,
+    monkeypatch,
+):
+    """Test the settings page is read as selected by the configuration"""
+
+    monkeypatch.setattr(
+        "aoc_runner.config._config",
+        RunnerConfig(overrides={"parser": {"extractors": extractors}}),
+    )
+    monkeypatch.setattr("aoc_runner.pages.extract_settings", lambda html: "extractor")
+    monkeypatch.setattr("aoc_runner.pages.soup_settings", lambda html: "soup")
+
+    assert parse_settings(page("")) == ("extractor" if extractors else "soup")
@@ -0,0 +1,132 @@
+"""Test the Advent of Code Runner retry policy and circuit breaker"""
+
+# System libraries
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import random
+
+# Third-party libraries
+import urllib3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.exceptions import CircuitOpenError
+from aoc_runner.retry import CircuitBreaker, parse_retry_after, RetryPolicy
+
+
+@pytest.mark.retry
+@pytest.mark.unit
+def test_retry_policy_should_retry():
+    """Test only idempotent methods are retried up to the attempt limit"""
+
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(method="GET", attempt=1)
+    assert policy.should_retry(method="GET", attempt=2)
+    assert not policy.should_retry(method="GET", attempt=3)
+    assert not policy.should_retry(method="POST", attempt=1)
+
+
+@pytest.mark.retry
+@pytest.mark.unit
+def test_retry_policy_backoff():
+    """Test the delay doubles with each attempt and is capped"""
+
+    policy = RetryPolicy(backoff=1.0, max_backoff=5.0, jitter=0.0)
+
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+
+@pytest.mark.retry
+@pytest.mark.unit
+def test_retry_policy_jitter():
+    """Test the jitter only ever shortens the delay"""
+
+    policy = RetryPolicy(backoff=1.0, jitter=0.5, rng=random.Random(1))
+    delays = [policy.delay(attempt=2) for _ in range(100)]
+
+    assert all(1.0 <= delay <= 2.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.retry
+@pytest.mark.unit
+def test_retry_policy_retry_after():
+    """Test a Retry-After header overrides the backoff"""
+
+    policy = RetryPolicy(backoff=1.0, max_backoff=30.0, jitter=0.0)
+    resp = urllib3.HTTPResponse(status=429, headers={"Retry-After": "7"})
+    assert policy.delay(attempt=1, resp=resp) == 7.0
+
+    resp = urllib3.HTTPResponse(status=429, headers={"Retry-After": "3600"})
+    assert policy.delay(attempt=1, resp=resp) == 30.0
+
+    policy.respect_retry_after = False
+    assert policy.delay(attempt=1, resp=resp) == 1.0
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("", None),
+        ("12", 12.0),
+        ("not a date", None),
+        (format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True), 0.0),
+    ],
+)
+@pytest.mark.retry
+@pytest.mark.unit
+def test_parse_retry_after(
+    value,
+    expected,
+):
+    """Test parsing of the Retry-After header"""
+
+    assert parse_retry_after(value) == expected
+
+
+@pytest.mark.retry
+@pytest.mark.unit
+def test_parse_retry_after_date():
+    """Test a Retry-After date in the future"""
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=120)
+    delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+    assert 100 < delay <= 120
+
+
+@pytest.mark.retry
+@pytest.mark.unit
+def test_circuit_breaker():
+    """Test the circuit opens after consecutive failures and recovers"""
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    now[0] = 10.0
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 20.0
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
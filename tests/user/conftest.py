@@ -2,12 +2,14 @@
 
 # System libraries
 from datetime import datetime
-import pickle
+from pathlib import Path
 
 # Pytest libraries
 import pytest
 
 # Advent of Code Runner libraries
+from aoc_runner.exceptions import CassetteMiss
+from aoc_runner.transport import Cassette, ReplayTransport
 from aoc_runner.user import LOGIN_SOURCES, UserInfo, UserList
 
 
@@ -264,33 +266,34 @@ def user_data(
     )
 
 
-@pytest.fixture
-def make_load_user_settings(
+@pytest.fixture(scope="session")
+def settings_replay(
     request,
 ):
-    """Create a factory which allows for dynamic loading of token data from file"""
-
-    def make(url: str, token: str, redirect: bool):
-        """Load the cached user setting response from the Advent of Code servers"""
-
-        file_path = request.config.rootdir / "tests" / "data" / "user"
-        file_name = file_path / f"settings_{token}.pickle"
-        # print(f"Getting mocked user settings for token {token}")
+    """Load the recorded user settings responses from the Advent of Code servers"""
 
-        if file_name.exists():
-            with open(file_name, mode="rb") as file:
-                loaded = pickle.load(file)
+    cassette_file = Path(request.config.rootdir) / "tests" / "data" / "user"
+    return ReplayTransport(Cassette(cassette_file / "settings.cassette.jsonl"))
 
-            return loaded
 
-        file_name = file_path / "settings_no_such_user.pickle"
-        if file_name.exists():
-            with open(file_name, mode="rb") as file:
-                loaded = pickle.load(file)
-
-            return loaded
+@pytest.fixture
+def make_load_user_settings(
+    settings_replay,
+):
+    """Create a factory which allows for dynamic loading of token data from file"""
 
-        raise Timeout
+    def make(url: str, token: str, redirect: bool):
+        """Replay the recorded user setting response from the Advent of Code servers"""
+
+        try:
+            return settings_replay.request(
+                method="GET",
+                url=url,
+                headers={"Cookie": f"session={token}"},
+                redirect=redirect,
+            )
+        except CassetteMiss as excp:
+            raise Timeout from excp
 
     return make
 
@@ -3,11 +3,15 @@
 # System libraries
 from datetime import datetime
 
+# Third-party libraries
+import urllib3
+
 # Pytest libraries
 import pytest
 
 # Advent of Code Runner libraries
-from aoc_runner.exceptions import AocValueError, DeadTokenError
+from aoc_runner.config import configure
+from aoc_runner.exceptions import AocValueError, DeadTokenError, TokenCheckFailed
 from aoc_runner.user import User
 
 
@@ -104,6 +108,7 @@ def test_user_getter_memo(
 
     user = User(user_info=valid_user)
     assert user.memo.parent == runner_users_dir
+    assert user.memo.is_dir()
 
 
 @pytest.mark.user
@@ -229,6 +234,96 @@ def test_user_from_token_expired(
     assert excp_str.startswith("The auth token ...")
 
 
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_from_token_cached(
+    real_token,
+    expired_token,
+    user_http_get,
+    make_load_user_settings,
+    monkeypatch,
+):
+    """Test the user.from_token method reuses the recent checks of live and
+    dead tokens unless a refresh is requested
+    """
+
+    urls = []
+
+    def get(url, token, redirect):
+        urls.append(url)
+        return make_load_user_settings(url=url, token=token, redirect=redirect)
+
+    monkeypatch.setattr("aoc_runner.user.http_client.get", get)
+    aoc_id, token = real_token
+    user = User.from_token(token=token)
+    cached = User.from_token(token=token)
+    assert cached.user_info.model_dump(exclude={"last_updated"}) == user.user_info.model_dump(
+        exclude={"last_updated"}
+    )
+    assert len(urls) == 1
+
+    for _ in range(2):
+        with pytest.raises(DeadTokenError):
+            User.from_token(token=expired_token)
+    assert len(urls) == 2
+
+    assert User.from_token(token=token, refresh=True).aoc_id == aoc_id
+    assert len(urls) == 3
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_from_token_configure(
+    user_module_dir_patch,
+    runner_paths,
+    monkeypatch,
+):
+    """Test the settings page is requested from the domain configured after
+    the user module was imported
+    """
+
+    urls = []
+
+    def get(url, token, redirect):
+        urls.append(url)
+        return urllib3.HTTPResponse(body=b"", status=302)
+
+    monkeypatch.setattr("aoc_runner.user.http_client.get", get)
+    for domain in ("http://127.0.0.1:8080", "http://127.0.0.1:9090/"):
+        configure(overrides={"paths": runner_paths, "http": {"domain": domain}})
+        with pytest.raises(DeadTokenError):
+            User.from_token(token="any-token", refresh=True)
+
+    assert urls == ["http://127.0.0.1:8080/settings", "http://127.0.0.1:9090/settings"]
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_from_token_check_failed(
+    real_token,
+    user_http_get,
+    make_load_user_settings,
+    monkeypatch,
+    status,
+):
+    """Test the user.from_token method does not remember a token as dead
+    when the server gives no answer on it
+    """
+
+    monkeypatch.setattr(
+        "aoc_runner.user.http_client.get",
+        lambda url, token, redirect: urllib3.HTTPResponse(body=b"", status=status),
+    )
+    aoc_id, token = real_token
+    for _ in range(2):
+        with pytest.raises(TokenCheckFailed):
+            User.from_token(token=token)
+
+    monkeypatch.setattr("aoc_runner.user.http_client.get", make_load_user_settings)
+    assert User.from_token(token=token).aoc_id == aoc_id
+
+
 @pytest.mark.user
 @pytest.mark.unit
 def test_user_from_token_bad_parameter(
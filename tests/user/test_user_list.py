@@ -1,20 +1,25 @@
 """Test the Advent of Code Runner User object"""
 
 # System libraries
+from datetime import datetime
+import json
 from os import environ
 from time import sleep
 
+# Third-party libraries
+import urllib3
+
 # Pytest libraries
 import pytest
 
 # Advent of Code Runner libraries
 from aoc_runner.exceptions import (
     NoSuchUser,
-    TokenFileChanged,
+    TokenCheckFailed,
     UnknownLoginSource,
     UserAlreadyExists,
 )
-from aoc_runner.user import UserList
+from aoc_runner.user import TokenResult, UserList
 
 
 @pytest.mark.debug
@@ -176,6 +181,37 @@ def test_user_list_get_default_token_both(
     assert user_list._users[user_list._default_user].aoc_id == valid_user.aoc_id
 
 
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_get_default_token_check_failed(
+    user_http_get,
+    make_load_user_settings,
+    valid_user,
+    make_default_token_file,
+    monkeypatch,
+):
+    """Test the UserList class is created when the server cannot check the
+    default token, which is kept for the next user list
+    """
+
+    token_file = make_default_token_file(token=valid_user.token)
+    monkeypatch.setattr(
+        "aoc_runner.user.http_client.get",
+        lambda url, token, redirect: urllib3.HTTPResponse(body=b"", status=503),
+    )
+
+    user_list = UserList()
+    assert user_list.default_user is None
+    assert token_file.exists()
+    with pytest.raises(TokenCheckFailed):
+        user_list.add_token(token=valid_user.token)
+
+    monkeypatch.setattr("aoc_runner.user.http_client.get", make_load_user_settings)
+    user_list = UserList()
+    assert user_list.default_user == valid_user.user_id
+    assert not token_file.exists()
+
+
 @pytest.mark.user
 @pytest.mark.unit
 def test_user_list_get_default_token_user_exists(
@@ -426,11 +462,81 @@ def test_user_list_save_file_updated(
     tokens_file.touch()
     modified_time = tokens_file.stat().st_mtime
 
-    with pytest.raises(TokenFileChanged) as excp:
-        user_list._save()
+    user_list._save()
 
     assert tokens_file.exists()
-    assert tokens_file.stat().st_mtime == modified_time
+    assert tokens_file.stat().st_mtime > modified_time
+    assert UserList().get_users() == {}
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_save_merge(
+    user_http_get,
+    valid_user,
+):
+    """Test the users added by two processes are both saved"""
+
+    first = UserList()
+    second = UserList()
+
+    first.add_user(user_info=valid_user.model_copy(update={"aoc_id": 1, "token": "t1"}))
+    second.add_user(user_info=valid_user.model_copy(update={"aoc_id": 2, "token": "t2"}))
+
+    assert sorted(second.get_users()) == ["github.1", "github.2"]
+    assert second._get_token_owner(token="t1") == "github.1"
+    user_list = UserList()
+    assert sorted(user_list.get_users()) == ["github.1", "github.2"]
+    assert user_list.default_user == "github.2"
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_save_merge_removed(
+    user_http_get,
+    valid_user,
+):
+    """Test a user removed by another process stays removed unless it
+    was changed since the file was read
+    """
+
+    user_list = UserList()
+    with user_list.batch():
+        for aoc_id in range(1, 4):
+            user_info = valid_user.model_copy(update={"aoc_id": aoc_id, "token": f"t{aoc_id}"})
+            user_list.add_user(user_info=user_info)
+
+    first = UserList()
+    second = UserList()
+    first.remove_user(user_id="github.1")
+    first.remove_user(user_id="github.2")
+    second.update_token(user_id="github.2", token="new")
+
+    user_list = UserList()
+    assert sorted(user_list.get_users()) == ["github.2", "github.3"]
+    assert user_list.get_users()["github.2"].token == "new"
+    assert user_list.default_user == "github.3"
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_save_merge_conflict(
+    user_http_get,
+    valid_user,
+):
+    """Test the change saved last wins when two processes change a user"""
+
+    user_list = UserList()
+    user_list.add_user(user_info=valid_user)
+    user_id = user_list.default_user
+
+    first = UserList()
+    second = UserList()
+    first.update_token(user_id=user_id, token="first")
+    second.update_token(user_id=user_id, token="second")
+
+    assert UserList().get_users()[user_id].token == "second"
+    assert second._get_token_owner(token="first") is None
 
 
 #
@@ -515,6 +621,110 @@ def test_user_list_add_token_user_exists_different_token_forced(
     assert user_list._users[user_list._default_user].aoc_id == valid_user.aoc_id
 
 
+#
+#  Test add_tokens method
+#
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_add_tokens(
+    user_http_get,
+    valid_user,
+    expired_user,
+    monkeypatch,
+):
+    """Test the UserList.add_tokens() method reports the outcome of every
+    token and saves the user list once
+    """
+
+    writes = []
+    monkeypatch.setattr(
+        "aoc_runner.userstore.write_atomic",
+        lambda path, data, fsync: writes.append(path) or path.write_bytes(data),
+    )
+    user_list = UserList()
+    writes.clear()
+
+    results = user_list.add_tokens(
+        tokens=[valid_user.token, expired_user.token, valid_user.token]
+    )
+
+    user_id = f"{valid_user.login_source}.{valid_user.aoc_id}"
+    assert results == [
+        TokenResult(token=valid_user.token, status=TokenResult.ADDED, user_id=user_id),
+        TokenResult(token=expired_user.token, status=TokenResult.DEAD),
+        TokenResult(token=valid_user.token, status=TokenResult.DUPLICATE, user_id=user_id),
+    ]
+    assert writes == [user_list.tokens_file]
+
+    user_list = UserList()
+    assert list(user_list.get_users()) == [user_id]
+    assert user_list.default_user == user_id
+
+    results = user_list.add_tokens(tokens=iter([valid_user.token]), max_workers=1)
+    assert results[0].status == TokenResult.DUPLICATE
+    assert user_list.add_tokens(tokens=[]) == []
+    assert writes == [user_list.tokens_file]
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_add_tokens_error(
+    user_http_get,
+    make_load_user_settings,
+    valid_user,
+    monkeypatch,
+):
+    """Test the UserList.add_tokens() method reports a token which could not
+    be validated as an error and still adds the other tokens
+    """
+
+    def get(url: str, token: str, redirect: bool):
+        """Fail the request of the unrecorded token"""
+
+        if token == "unrecorded":
+            raise TimeoutError("Read timed out")
+        return make_load_user_settings(url=url, token=token, redirect=redirect)
+
+    monkeypatch.setattr("aoc_runner.user.http_client.get", get)
+    user_id = f"{valid_user.login_source}.{valid_user.aoc_id}"
+    user_list = UserList()
+    started = datetime.now()
+
+    results = user_list.add_tokens(tokens=["unrecorded", valid_user.token])
+    assert results == [
+        TokenResult(token="unrecorded", status=TokenResult.ERROR),
+        TokenResult(token=valid_user.token, status=TokenResult.ADDED, user_id=user_id),
+    ]
+
+    user = UserList().get_users()[user_id]
+    assert user.token == valid_user.token
+    assert user.last_updated >= started
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_add_tokens_conflict(
+    user_http_get,
+    valid_user,
+):
+    """Test the UserList.add_tokens() method only replaces the token of a
+    known user when forced
+    """
+
+    user_id = f"{valid_user.login_source}.{valid_user.aoc_id}"
+    user_list = UserList()
+    user_list.add_user(user_info=valid_user.model_copy(update={"token": "old"}))
+
+    results = user_list.add_tokens(tokens=[valid_user.token])
+    assert results == [TokenResult(token=valid_user.token, status="conflict", user_id=user_id)]
+    assert UserList().get_users()[user_id].token == "old"
+
+    results = user_list.add_tokens(tokens=[valid_user.token], force=True)
+    assert results[0].status == TokenResult.ADDED
+    assert UserList().get_users()[user_id].token == valid_user.token
+    assert user_list._get_token_owner(token="old") is None
+
+
 #
 #  Test add_user method
 #
@@ -649,6 +859,51 @@ def test_user_list_get_users_defined_users(
     assert len(users) == 1
 
 
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_get_users_view(
+    user_http_get,
+    valid_user,
+):
+    """Test the UserList.get_users returns a read-only view which follows
+    the changes made to the user list, even when it is reloaded
+    """
+
+    user_id = f"{valid_user.login_source}.{valid_user.aoc_id}"
+    user_list = UserList()
+    users = user_list.get_users()
+    assert users is user_list.get_users()
+
+    user_list.add_user(user_info=valid_user)
+    assert list(users) == [user_id]
+    with pytest.raises(TypeError):
+        users["github.1"] = users[user_id]
+
+    user_list._load()
+    assert list(users) == [user_id]
+    user_list.remove_user(user_id=user_id)
+    assert len(users) == 0
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_snapshot(
+    user_http_get,
+    valid_user,
+):
+    """Test the UserList.snapshot returns an independent copy of the users"""
+
+    user_id = f"{valid_user.login_source}.{valid_user.aoc_id}"
+    user_list = UserList()
+    user_list.add_user(user_info=valid_user)
+
+    users = user_list.snapshot()
+    users[user_id].token = "changed"
+    users.clear()
+
+    assert user_list.get_users()[user_id].token == valid_user.token
+
+
 #
 #  Test remove_user method
 #
@@ -950,6 +1205,178 @@ def test_user_list_update_token_different_token(
     assert user_list._users[user_list._default_user].last_updated > last_updated
 
 
+#
+#  Test the token index
+#
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_token_index(
+    user_http_get,
+    expired_user,
+    valid_user,
+):
+    """Test the token index follows the users as they are added, have
+    their token updated, are reloaded and are removed
+    """
+
+    valid_token, expired_token = valid_user.token, expired_user.token
+    user_list = UserList()
+    user_list.add_user(user_info=valid_user.model_copy())
+    valid_user_id = f"{valid_user.login_source}.{valid_user.aoc_id}"
+    assert user_list._token_index == {valid_token: valid_user_id}
+
+    user_list.update_token(user_id=valid_user_id, token=expired_token)
+    assert user_list._get_token_owner(token=valid_token) is None
+    assert user_list._get_token_owner(token=expired_token) == valid_user_id
+
+    user_list.add_user(user_info=valid_user, force=True)
+    assert user_list._token_index == {valid_token: valid_user_id}
+
+    user_list = UserList()
+    assert user_list._token_index == {valid_token: valid_user_id}
+
+    user_list.remove_user(user_id=valid_user_id)
+    assert user_list._token_index == {}
+
+
+#
+#  Test batch method
+#
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_batch(
+    user_http_get,
+    valid_user,
+    monkeypatch,
+):
+    """Test the changes made in a batch are saved once when it exits"""
+
+    user_list = UserList()
+    writes = []
+    monkeypatch.setattr(
+        "aoc_runner.userstore.write_atomic",
+        lambda path, data, fsync: writes.append(path) or path.write_bytes(data),
+    )
+
+    with user_list.batch():
+        for aoc_id in range(1, 51):
+            user_info = valid_user.model_copy(update={"aoc_id": aoc_id, "token": f"t{aoc_id}"})
+            user_list.add_user(user_info=user_info)
+        with user_list.batch():
+            user_list.remove_user(user_id="github.1")
+        user_list.set_default_user(user_id="github.2")
+        assert writes == []
+
+    assert writes == [user_list.tokens_file]
+    user_list = UserList()
+    assert len(user_list.get_users()) == 49
+    assert user_list.default_user == "github.2"
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_batch_error(
+    user_http_get,
+    valid_user,
+):
+    """Test the changes made in a batch which raises are discarded"""
+
+    user_list = UserList()
+    user_list.add_user(user_info=valid_user)
+    modified_time = user_list.tokens_file.stat().st_mtime_ns
+
+    sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with user_list.batch():
+            user_info = valid_user.model_copy(update={"aoc_id": 2, "token": "t2"})
+            user_list.add_user(user_info=user_info)
+            user_list.remove_user(user_id=valid_user.user_id)
+            raise RuntimeError("failed batch")
+
+    assert user_list.tokens_file.stat().st_mtime_ns == modified_time
+    assert list(user_list.get_users()) == [valid_user.user_id]
+    assert user_list.default_user == valid_user.user_id
+    assert list(UserList().get_users()) == [valid_user.user_id]
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_batch_unchanged(
+    user_http_get,
+    valid_user,
+):
+    """Test an unchanged user list is not rewritten"""
+
+    user_list = UserList()
+    user_list.add_user(user_info=valid_user)
+    modified_time = user_list.tokens_file.stat().st_mtime_ns
+
+    sleep(0.01)
+    with user_list.batch():
+        user_list.add_token(token=valid_user.token)
+        user_list.set_default_user(user_id=user_list.default_user)
+    UserList()
+
+    assert user_list.tokens_file.stat().st_mtime_ns == modified_time
+
+
+@pytest.mark.parametrize("fsync", [True, False])
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_save_atomic(
+    user_http_get,
+    valid_user,
+    monkeypatch,
+    fsync,
+):
+    """Test the tokens file is replaced atomically and flushed on request"""
+
+    synced = []
+    monkeypatch.setattr("aoc_runner.utils.os.fsync", synced.append)
+    user_list = UserList(fsync=fsync)
+    synced.clear()
+
+    user_list.add_user(user_info=valid_user)
+
+    paths = sorted(path.name for path in user_list.tokens_file.parent.iterdir())
+    assert paths == ["tokens.json", "tokens.json.lock"]
+    assert bool(synced) is fsync
+
+
+@pytest.mark.user
+@pytest.mark.unit
+def test_user_list_bulk_load_save(
+    user_http_get,
+    valid_user,
+    monkeypatch,
+):
+    """Test the tokens file is validated and serialized in a single pass
+    without validating, copying or dumping each user on its own
+    """
+
+    user_list = UserList()
+    with user_list.batch():
+        for aoc_id in range(1, 4):
+            user_info = valid_user.model_copy(update={"aoc_id": aoc_id, "token": f"t{aoc_id}"})
+            user_list.add_user(user_info=user_info)
+    saved = json.loads(user_list.tokens_file.read_text(encoding="utf-8"))
+
+    def per_user(*args, **kwargs):
+        raise AssertionError("Users must not be handled one at a time")
+
+    for method in ("model_validate", "model_copy", "model_dump"):
+        monkeypatch.setattr(f"aoc_runner.user.UserInfo.{method}", per_user)
+    user_list = UserList()
+    user_list.update_token(user_id="github.2", token="new")
+
+    assert saved["default_user"] == "github.1"
+    assert saved["users"][0]["last_updated"] == valid_user.last_updated.isoformat()
+    assert list(user_list.get_users()) == ["github.1", "github.2", "github.3"]
+    assert user_list._get_token_owner(token="t3") == "github.3"
+    saved = json.loads(user_list.tokens_file.read_text(encoding="utf-8"))
+    assert [user["token"] for user in saved["users"]] == ["t1", "new", "t3"]
+
+
 #
 #  Test property getters
 #
@@ -0,0 +1,372 @@
+"""Test the Advent of Code Runner user list stores"""
+
+# System libraries
+from datetime import datetime
+import json
+import sqlite3
+
+# Pytest libraries
+import pytest
+
+# Advent of Code Runner libraries
+from aoc_runner.config import configure, RunnerConfig
+from aoc_runner.exceptions import AocValueError
+from aoc_runner.user import UserInfo, UserList
+from aoc_runner.userstore import (
+    JournalUserStore,
+    JsonUserStore,
+    SqliteUserStore,
+    UserStore,
+    make_user_store,
+)
+
+
+def make_user_info(
+    aoc_id: int,
+    token: str | None = None,
+) -> UserInfo:
+    """Return the information of a test user"""
+
+    return UserInfo(
+        user_name=f"user {aoc_id}",
+        aoc_id=aoc_id,
+        login_source="github",
+        last_updated=datetime(2024, 12, 1),
+        token=token or f"t{aoc_id}",
+    )
+
+
+@pytest.fixture
+def sqlite_store(
+    tmp_path,
+):
+    """Return an SQLite store in a scratch directory"""
+
+    store = SqliteUserStore(path=tmp_path / "tokens.sqlite3", fsync=False)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def journal_store(
+    tmp_path,
+):
+    """Return a journal store in a scratch directory"""
+
+    yield JournalUserStore(
+        path=tmp_path / "tokens.json", journal=tmp_path / "tokens.journal", fsync=False
+    )
+
+
+def journal_ops(
+    store: JournalUserStore,
+) -> list[str]:
+    """Return the operation of every record in the journal"""
+
+    lines = store.journal.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line)["op"] for line in lines]
+
+
+@pytest.fixture
+def sqlite_backend(
+    user_module_dir_patch,
+    runner_paths,
+):
+    """Select the SQLite store for the user lists created"""
+
+    configure(overrides={"paths": runner_paths, "store": {"backend": "sqlite"}})
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_make_user_store(
+    tmp_path,
+    monkeypatch,
+):
+    """Test the store backend is selected by the configuration"""
+
+    assert isinstance(make_user_store(auth_dir=tmp_path), JsonUserStore)
+    assert isinstance(make_user_store(auth_dir=tmp_path, backend="sqlite"), SqliteUserStore)
+
+    monkeypatch.setattr(
+        "aoc_runner.config._config", RunnerConfig(overrides={"store": {"backend": "sqlite"}})
+    )
+    store = make_user_store(auth_dir=tmp_path)
+    assert isinstance(store, SqliteUserStore)
+    assert store.path == tmp_path / "tokens.sqlite3"
+
+    store = make_user_store(auth_dir=tmp_path, backend="journal")
+    assert isinstance(store, JournalUserStore)
+    assert store.journal == tmp_path / "tokens.journal"
+
+    with pytest.raises(AocValueError):
+        make_user_store(auth_dir=tmp_path, backend="other")
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_sqlite_store_schema(
+    sqlite_store,
+):
+    """Test the database is in WAL mode with the users keyed by user ID"""
+
+    assert sqlite_store.load() == (None, {})
+    connection = sqlite_store.connection
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    columns = {row[1]: row[5] for row in connection.execute("PRAGMA table_info(users)")}
+    assert columns["user_id"] == 1
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_user_store_abstract():
+    """Test a store must implement the whole interface"""
+
+    class PartialStore(UserStore):
+        """Store which cannot save"""
+
+        def exists(
+            self,
+        ) -> bool:
+            """Return whether the store was ever saved"""
+
+            return False
+
+        def load(
+            self,
+        ) -> None:
+            """Return that the store does not exist"""
+
+            return None
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_sqlite_store_save(
+    sqlite_store,
+):
+    """Test only the users changed are written"""
+
+    users = {f"github.{aoc_id}": make_user_info(aoc_id) for aoc_id in range(1, 4)}
+    sqlite_store.load()
+    assert sqlite_store.save("github.1", users, changed=users, default_changed=True) is None
+
+    users["github.2"] = make_user_info(2, token="new")
+    del users["github.3"]
+    users["github.1"] = make_user_info(1, token="unsaved")
+    sqlite_store.save(
+        "github.1", users, changed=["github.2", "github.3"], default_changed=False
+    )
+
+    default_user, saved = sqlite_store.load()
+    assert default_user == "github.1"
+    assert list(saved) == ["github.1", "github.2"]
+    assert saved["github.1"].token == "t1"
+    assert saved["github.2"] == users["github.2"]
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_sqlite_store_merge(
+    sqlite_store,
+):
+    """Test the changes saved by another connection are returned"""
+
+    other = SqliteUserStore(path=sqlite_store.path, fsync=False)
+    sqlite_store.load()
+    other.load()
+
+    users = {"github.1": make_user_info(1)}
+    assert sqlite_store.save("github.1", users, changed=users, default_changed=True) is None
+    users = {"github.2": make_user_info(2)}
+    default_user, merged = other.save(None, users, changed=users, default_changed=False)
+    other.close()
+
+    assert default_user == "github.1"
+    assert list(merged) == ["github.1", "github.2"]
+    assert sqlite_store.load() == (default_user, merged)
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_sqlite_store_migrate(
+    tmp_path,
+):
+    """Test a new database imports the users of the tokens.json file"""
+
+    json_store = JsonUserStore(path=tmp_path / "tokens.json", fsync=False)
+    users = {f"github.{aoc_id}": make_user_info(aoc_id) for aoc_id in range(1, 3)}
+    json_store.save("github.2", users, changed=users, default_changed=True)
+
+    store = SqliteUserStore(path=tmp_path / "tokens.sqlite3", migrate_from=json_store.path)
+    assert store.load() == ("github.2", users)
+    store.save(None, {}, changed=users, default_changed=True)
+    store.close()
+
+    # The tokens file is left alone and only imported once
+    assert json_store.load() == ("github.2", users)
+    store = SqliteUserStore(path=tmp_path / "tokens.sqlite3", migrate_from=json_store.path)
+    assert store.load() == (None, {})
+    store.close()
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_user_list_sqlite(
+    sqlite_backend,
+    runner_auth_dir,
+):
+    """Test a user list kept in SQLite behaves as one kept in tokens.json"""
+
+    user_list = UserList(fsync=False)
+    assert isinstance(user_list.store, SqliteUserStore)
+    with user_list.batch():
+        for aoc_id in range(1, 4):
+            user_list.add_user(user_info=make_user_info(aoc_id))
+    user_list.remove_user(user_id="github.1")
+    user_list.update_token(user_id="github.2", token="new")
+
+    other = UserList(fsync=False)
+    other.add_user(user_info=make_user_info(4))
+    other.store.close()
+    user_list.set_default_user(user_id="github.3")
+    user_list.store.close()
+
+    user_list = UserList(fsync=False)
+    user_list.store.close()
+    assert list(user_list.get_users()) == ["github.2", "github.3", "github.4"]
+    assert user_list.default_user == "github.3"
+    assert user_list._get_token_owner(token="new") == "github.2"
+    assert not (runner_auth_dir / "tokens.json").exists()
+
+    connection = sqlite3.connect(runner_auth_dir / "tokens.sqlite3")
+    assert connection.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 3
+    connection.close()
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_journal_store_append(
+    journal_store,
+):
+    """Test each save appends its changes without rewriting the snapshot"""
+
+    assert journal_store.load() is None
+    journal_store.save(None, {}, changed=[], default_changed=False)
+    snapshot = journal_store.path.read_bytes()
+    assert journal_store.journal.read_bytes() == b""
+
+    users = {f"github.{aoc_id}": make_user_info(aoc_id) for aoc_id in range(1, 4)}
+    journal_store.save("github.1", users, changed=users, default_changed=True)
+    users["github.2"] = make_user_info(2, token="new")
+    del users["github.3"]
+    journal_store.save(
+        "github.2", users, changed=["github.2", "github.3"], default_changed=True
+    )
+
+    assert journal_ops(journal_store) == [
+        "add",
+        "add",
+        "add",
+        "set_default",
+        "update",
+        "remove",
+        "set_default",
+    ]
+    assert journal_store.path.read_bytes() == snapshot
+    store = JournalUserStore(path=journal_store.path, journal=journal_store.journal)
+    assert store.load() == ("github.2", users)
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_journal_store_compact(
+    tmp_path,
+):
+    """Test the journal is folded into the snapshot once it is full"""
+
+    store = JournalUserStore(
+        path=tmp_path / "tokens.json", journal=tmp_path / "tokens.journal", max_bytes=1000
+    )
+    store.save(None, {}, changed=[], default_changed=False)
+    users = {}
+    for aoc_id in range(1, 11):
+        users[f"github.{aoc_id}"] = make_user_info(aoc_id)
+        store.save("github.1", users, changed=[f"github.{aoc_id}"], default_changed=True)
+        assert store.journal.stat().st_size <= 1000
+
+    assert len(journal_ops(store)) < 10
+    assert JsonUserStore(path=store.path).load()[0] == "github.1"
+    assert store.load() == ("github.1", users)
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_journal_store_merge(
+    journal_store,
+):
+    """Test the changes appended by another process are returned"""
+
+    journal_store.save(None, {}, changed=[], default_changed=False)
+    other = JournalUserStore(path=journal_store.path, journal=journal_store.journal)
+    other.load()
+
+    users = {"github.1": make_user_info(1)}
+    assert journal_store.save("github.1", users, changed=users, default_changed=True) is None
+    users = {"github.2": make_user_info(2)}
+    default_user, merged = other.save(None, users, changed=users, default_changed=False)
+
+    assert default_user == "github.1"
+    assert list(merged) == ["github.1", "github.2"]
+    assert journal_ops(journal_store) == ["add", "set_default", "add"]
+    assert journal_store.save(default_user, merged, changed=[], default_changed=False) == (
+        default_user,
+        merged,
+    )
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_journal_store_damaged(
+    journal_store,
+):
+    """Test a record cut short is skipped and later appends are kept"""
+
+    journal_store.save(None, {}, changed=[], default_changed=False)
+    journal_store.journal.write_bytes(b'{"op": "add", "user": {"user_na')
+
+    users = {"github.1": make_user_info(1)}
+    journal_store.save("github.1", users, changed=users, default_changed=True)
+
+    store = JournalUserStore(path=journal_store.path, journal=journal_store.journal)
+    assert store.load() == ("github.1", users)
+
+
+@pytest.mark.userstore
+@pytest.mark.unit
+def test_user_list_journal(
+    user_module_dir_patch,
+    runner_paths,
+    runner_auth_dir,
+):
+    """Test a user list kept in tokens.json carries over to the journal"""
+
+    user_list = UserList(fsync=False)
+    user_list.add_user(user_info=make_user_info(1))
+
+    configure(overrides={"paths": runner_paths, "store": {"backend": "journal"}})
+    user_list = UserList(fsync=False)
+    assert isinstance(user_list.store, JournalUserStore)
+    assert list(user_list.get_users()) == ["github.1"]
+    with user_list.batch():
+        user_list.add_user(user_info=make_user_info(2))
+        user_list.set_default_user(user_id="github.2")
+    user_list.remove_user(user_id="github.1")
+
+    assert journal_ops(user_list.store) == ["add", "set_default", "remove"]
+    user_list = UserList(fsync=False)
+    assert list(user_list.get_users()) == ["github.2"]
+    assert user_list.default_user == "github.2"
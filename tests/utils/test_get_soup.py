@@ -7,7 +7,16 @@ from bs4 import BeautifulSoup
 import pytest
 
 # Advent of Code Runner libraries
-from aoc_runner.utils import get_soup
+from aoc_runner.config import RunnerConfig
+from aoc_runner.exceptions import AocValueError
+from aoc_runner.utils import (
+    SoupCache,
+    SoupCacheStats,
+    available_parsers,
+    get_soup,
+    resolve_parser,
+    soup_cache,
+)
 
 
 @pytest.mark.utils
@@ -26,3 +35,124 @@ def test_get_soup_no_input():
 
     with pytest.raises(TypeError):
         _ = get_soup(None)
+
+
+@pytest.mark.utils
+@pytest.mark.unit
+def test_get_soup_cached():
+    """Test the get_soup function shares the parsed page until cleared"""
+
+    get_soup.cache_clear()
+    soup = get_soup(b"<p>cached</p>")
+
+    assert get_soup(b"<p>cached</p>") is soup
+    assert get_soup("<p>cached</p>") is not soup
+    assert soup_cache.stats() == SoupCacheStats(
+        hits=1, misses=2, evictions=0, entries=2, footprint=26 * SoupCache.OVERHEAD
+    )
+
+    get_soup.cache_clear()
+    assert get_soup(b"<p>cached</p>") is not soup
+    assert soup_cache.stats().misses == 1
+
+
+@pytest.mark.utils
+@pytest.mark.unit
+def test_soup_cache_maxsize():
+    """Test the least recently used page is evicted beyond the page limit"""
+
+    cache = SoupCache(maxsize=2, max_bytes=10**6)
+    first = cache.get("<p>1</p>")
+    cache.get("<p>2</p>")
+    assert cache.get("<p>1</p>") is first
+    cache.get("<p>3</p>")
+
+    assert cache.get("<p>1</p>") is first
+    assert cache.stats() == SoupCacheStats(
+        hits=2, misses=3, evictions=1, entries=2, footprint=16 * SoupCache.OVERHEAD
+    )
+    cache.get("<p>2</p>")
+    assert cache.stats().misses == 4
+
+
+@pytest.mark.utils
+@pytest.mark.unit
+def test_soup_cache_max_bytes():
+    """Test pages are evicted beyond the footprint limit and that a page too
+    large for the cache is parsed but never kept
+    """
+
+    cache = SoupCache(maxsize=100, max_bytes=25 * SoupCache.OVERHEAD)
+    cache.get("<p>1</p>")
+    cache.get("<p>2</p>")
+    cache.get("<p>3</p>")
+    assert cache.stats().entries == 3
+
+    cache.get("<p>4</p>")
+    assert cache.stats().entries == 3
+    assert cache.stats().evictions == 1
+
+    large = "<p>" + "x" * 100 + "</p>"
+    assert cache.get(large).p.text == "x" * 100
+    assert cache.stats().entries == 3
+    assert cache.get(large) is not cache.get(large)
+
+
+@pytest.mark.utils
+@pytest.mark.unit
+def test_soup_cache_config(
+    monkeypatch,
+):
+    """Test the limits of the cache default to the configuration"""
+
+    monkeypatch.setattr(
+        "aoc_runner.config._config",
+        RunnerConfig(overrides={"cache": {"soup_size": 1, "soup_bytes": 1000}}),
+    )
+    cache = SoupCache()
+    first = cache.get("<p>1</p>")
+    cache.get("<p>2</p>")
+
+    assert cache.get("<p>1</p>") is not first
+    assert cache.stats().entries == 1
+
+
+@pytest.mark.utils
+@pytest.mark.unit
+def test_resolve_parser(
+    monkeypatch,
+):
+    """Test the tree builder is taken from the configuration, that auto
+    selects the fastest installed and that missing builders fall back
+    """
+
+    monkeypatch.setattr("aoc_runner.utils.available_parsers", lambda: ("html.parser",))
+    assert resolve_parser() == "html.parser"
+    assert resolve_parser("auto") == "html.parser"
+    assert resolve_parser("lxml") == "html.parser"
+
+    monkeypatch.setattr(
+        "aoc_runner.utils.available_parsers", lambda: ("lxml", "html.parser", "html5lib")
+    )
+    assert resolve_parser("auto") == "lxml"
+    assert resolve_parser("html5lib") == "html5lib"
+    monkeypatch.setattr(
+        "aoc_runner.config._config", RunnerConfig(overrides={"parser": {"backend": "lxml"}})
+    )
+    assert resolve_parser() == "lxml"
+
+    with pytest.raises(AocValueError):
+        resolve_parser("regex")
+
+
+@pytest.mark.utils
+@pytest.mark.unit
+def test_get_soup_parser():
+    """Test the pages parsed by different tree builders are cached apart"""
+
+    assert "html.parser" in available_parsers()
+    get_soup.cache_clear()
+    soup = get_soup("<p>parser</p>", parser="html.parser")
+
+    assert get_soup("<p>parser</p>") is soup
+    assert [key[0] for key in soup_cache._entries] == ["html.parser"]
@@ -2,11 +2,11 @@
 
 # System libraries
 from pathlib import Path
-import pickle
 
 # Advent of Code Runner libraries
-from aoc_runner.httpclient import http_client
+from aoc_runner.httpclient import HttpClient, make_transport
 from aoc_runner.config import AOC_DOMAIN, AOC_RUNNER_PROJECT_HOME
+from aoc_runner.transport import Cassette
 
 
 print(f"CWD: {Path().cwd()}")
@@ -26,13 +26,15 @@ url = f"{AOC_DOMAIN}"
 source = 'home'
 
 html_file_name = data_path / f"{source}.html"
-pickle_file_name = data_path / f"{source}.pickle"
+transport = make_transport(mode="record", cassette_path=data_path / f"{source}.cassette.jsonl")
+cassette = transport.cassette
 
-if pickle_file_name.exists():
+if cassette.find(method="GET", url=url) is not None:
     print(f"Cached Advent of Code home page already exists")
 else:
+    # Record the response for a latter replay
+    http_client = HttpClient(transport=transport)
     response = http_client.get(url=url, token=None, redirect=False)
-    response._pool = None
 
     with open(html_file_name, mode="w", encoding="utf-8") as file:
         if response.status == 200:
@@ -40,16 +42,9 @@ else:
         else:
             file.write(f"Status: {response.status}\nLocation: {response.get_redirect_location()}")
 
-    # Pickle the response for a latter reload
-    with open(pickle_file_name, mode="wb") as file:
-        pickle.dump(response, file)
-
-    with open(pickle_file_name, mode="rb") as file:
-        loaded = pickle.load(file)
-
+    loaded = Cassette(cassette.path).find(method="GET", url=url).response()
     if (
             loaded.data == response.data
-            and loaded.headers == response.headers
             and loaded.status == response.status
     ):
         print("Advent of Code home page cached")
@@ -3,11 +3,11 @@
 # System libraries
 from os import getenv
 from pathlib import Path
-import pickle
 
 # Advent of Code Runner libraries
 from aoc_runner.config import AOC_DOMAIN, AOC_RUNNER_PROJECT_HOME
-from aoc_runner.httpclient import http_client
+from aoc_runner.httpclient import HttpClient, make_transport
+from aoc_runner.transport import Cassette
 
 
 url = f"{AOC_DOMAIN}/settings"
@@ -30,16 +30,18 @@ if not data_path.exists():
 elif data_path.is_file():
     raise ValueError(f"Data path is file not directory: {str(data_path)}")
 
+# Record the responses for a latter replay
+transport = make_transport(mode="record", cassette_path=data_path / "settings.cassette.jsonl")
+cassette = transport.cassette
+http_client = HttpClient(transport=transport)
 
 for source, token in tokens.items():
     html_file_name = data_path / f"{source}.html"
-    pickle_file_name = data_path / f"{source}.pickle"
-    if pickle_file_name.exists() and html_file_name.exists():
+    if cassette.find(method="GET", url=url, token=token) and html_file_name.exists():
         print(f"Cached user settings response for {source} already exists")
         continue
 
     response = http_client.get(url=url, token=token, redirect=False)
-    response._pool = None
 
     with open(html_file_name, mode="w", encoding="utf-8") as file:
         if response.status == 200:
@@ -47,16 +49,9 @@ for source, token in tokens.items():
         else:
             file.write(f"Status: {response.status}\nLocation: {response.get_redirect_location()}")
 
-    # Pickle the response for a latter reload
-    with open(pickle_file_name, mode="wb") as file:
-        pickle.dump(response, file)
-
-    with open(pickle_file_name, mode="rb") as file:
-        loaded = pickle.load(file)
-
+    loaded = Cassette(cassette.path).find(method="GET", url=url, token=token).response()
     if (
             loaded.data == response.data
-            and loaded.headers == response.headers
             and loaded.status == response.status
     ):
         print(f"User settings for {source} cached")
@@ -0,0 +1,80 @@
+"""Benchmark the HTML parser backends over the captured pages in data/,
+reporting the parse time and peak memory of every installed Beautiful Soup
+tree builder and, for the settings pages, of the streaming extractor
+"""
+
+# System libraries
+import argparse
+from pathlib import Path
+import time
+import tracemalloc
+
+# Third-party libraries
+from bs4 import BeautifulSoup
+
+# Advent of Code Runner libraries
+from aoc_runner.pages import extract_settings, soup_settings
+from aoc_runner.utils import available_parsers
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def measure(
+    count: int,
+    func,
+) -> tuple[float, int]:
+    """Return the time per call and the peak memory allocated by a call"""
+
+    # Warm up so that the imports and caches do not count towards the peak
+    func()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count, peak
+
+
+def report(
+    label: str,
+    per_call: float,
+    peak: int,
+) -> None:
+    """Print the measurements of a backend"""
+
+    print(f"  {label:<24} {per_call * 1e6:10.1f} us {peak / 1024:10.1f} KiB peak")
+
+
+def main():
+    """Run the benchmark over every captured page"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"Installed tree builders: {', '.join(available_parsers())}")
+    for path in sorted(DATA_DIR.glob("*/*.html")):
+        html = path.read_bytes()
+        if b"<html" not in html:
+            continue
+        print(f"{path.relative_to(DATA_DIR)} ({len(html)} bytes)")
+
+        for backend in available_parsers():
+            report(
+                f"tree {backend}",
+                *measure(args.count, lambda backend=backend: BeautifulSoup(html, backend)),
+            )
+
+        if path.parent.name == "settings":
+            settings = extract_settings(html)
+            for backend in available_parsers():
+                assert soup_settings(html, parser=backend) == settings, (path, backend)
+            report("extractor", *measure(args.count, lambda: extract_settings(html)))
+
+
+# If run as a script, execute the main function
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the runner end-to-end against the local Advent of Code server"""
+
+# System libraries
+import argparse
+from os import environ
+from pathlib import Path
+import tempfile
+import time
+
+# Point the runner at a scratch directory and the local server before
+# any of the runner modules are imported
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="aoc_runner_bench_"))
+environ["AOC_RUNNER_DIR"] = str(SCRATCH_DIR)
+environ["AOC_RUNNER_PROJECT_HOME"] = str(Path(__file__).resolve().parents[1])
+environ.setdefault("AOC_RUNNER_DOMAIN", "http://127.0.0.1:8765")
+
+# Advent of Code Runner libraries
+from aoc_runner.config import AOC_DOMAIN  # noqa: E402
+from aoc_runner.httpclient import http_client  # noqa: E402
+from aoc_runner.limiter import RateLimiter  # noqa: E402
+from aoc_runner.localserver import Faults, LocalAocServer  # noqa: E402
+from aoc_runner.user import User, UserList  # noqa: E402
+
+
+def timed(
+    label: str,
+    count: int,
+    func,
+) -> None:
+    """Run the function count times and report the throughput"""
+
+    start = time.perf_counter()
+    for n in range(count):
+        func(n)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>6} calls {elapsed:8.3f}s {count / elapsed:10.1f}/s")
+
+
+def main():
+    """Run each of the benchmarks"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    host, port = AOC_DOMAIN.rsplit(":", 1)
+    server = LocalAocServer(
+        host=host.split("//")[1],
+        port=int(port),
+        synthesize_users=True,
+        faults=Faults(latency=args.latency),
+    )
+    # Measure the client rather than the production request budget
+    http_client._rate_limiter = RateLimiter(rate=1e9, burst=10**9)
+
+    with server:
+        timed("HttpClient.get /", args.requests, lambda n: http_client.get(f"{AOC_DOMAIN}/"))
+        timed(
+            "User.from_token",
+            args.users,
+            lambda n: User.from_token(token=f"bench-token-{n}"),
+        )
+        user_list = UserList()
+        timed(
+            "UserList.add_token",
+            args.users,
+            lambda n: user_list.add_token(token=f"bench-token-{n}"),
+        )
+        print(f"Server responses by status: {dict(server.stats)}")
+
+
+# If run as a script, execute the main function
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark loading and saving a tokens.json file holding many users,
+comparing the per-user validation and serialization with the single pass
+used by UserList
+"""
+
+# System libraries
+import argparse
+from datetime import datetime
+import json
+from os import environ
+from pathlib import Path
+import tempfile
+import time
+
+# Advent of Code Runner libraries
+from aoc_runner.user import User, UserInfo, UserList
+
+
+def per_user_load(
+    path: Path,
+) -> dict[str, User]:
+    """Load the users validating each of them on its own"""
+
+    load_state = json.loads(path.read_text(encoding="utf-8"))
+    users = {}
+    for user_data in load_state["users"]:
+        user = User(user_info=UserInfo.model_validate(user_data))
+        users[user.user_id] = user
+    return users
+
+
+def per_user_save(
+    path: Path,
+    users: dict[str, User],
+) -> None:
+    """Save the users copying and serializing each of them on its own"""
+
+    save_state = {
+        "default_user": next(iter(users)),
+        "users": [user.user_info.model_dump() for user in users.values()],
+    }
+    path.write_bytes(json.dumps(save_state, indent=2).encode("utf-8"))
+
+
+def timed(
+    label: str,
+    count: int,
+    func,
+) -> float:
+    """Run the function count times, report and return the time per call"""
+
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    per_call = (time.perf_counter() - start) / count
+    print(f"  {label:<20} {per_call * 1e3:10.1f} ms")
+    return per_call
+
+
+def main():
+    """Run the benchmark"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--count", type=int, default=5)
+    args = parser.parse_args()
+
+    # Point the runner at a scratch directory, removed once done, before the
+    # configuration is first read
+    with tempfile.TemporaryDirectory(prefix="aoc_runner_bench_") as scratch_dir:
+        environ["AOC_RUNNER_DIR"] = scratch_dir
+        environ.pop("AOC_RUNNER_SESSION", None)
+        run(args=args, scratch_dir=Path(scratch_dir))
+
+
+def run(
+    args: argparse.Namespace,
+    scratch_dir: Path,
+) -> None:
+    """Time the user list against the per user load and save"""
+
+    user_list = UserList(fsync=False)
+    with user_list.batch():
+        for aoc_id in range(1, args.users + 1):
+            user_info = UserInfo(
+                user_name=f"user {aoc_id}",
+                aoc_id=aoc_id,
+                login_source="github",
+                last_updated=datetime.now(),
+                token=f"{aoc_id:0128x}",
+            )
+            user_list.add_user(user_info=user_info)
+    tokens_file = user_list.tokens_file
+    print(f"{args.users} users, {tokens_file.stat().st_size} bytes")
+
+    users = per_user_load(tokens_file)
+    assert [user.user_info for user in users.values()] == [
+        user.user_info for user in user_list.get_users().values()
+    ]
+    per_user_file = scratch_dir / "per_user.json"
+
+    print("Load")
+    old = timed("per user", args.count, lambda: per_user_load(tokens_file))
+    new = timed("UserList", args.count, user_list._load)
+    print(f"  {'speedup':<20} {old / new:10.1f}x")
+
+    print("Save")
+    old = timed("per user", args.count, lambda: per_user_save(per_user_file, users))
+    new = timed("UserList", args.count, user_list._save)
+    print(f"  {'speedup':<20} {old / new:10.1f}x")
+
+
+# If run as a script, execute the main function
+if __name__ == "__main__":
+    main()